@@ -1,6 +1,11 @@
 #개선안 제안 에이전트
-from typing import Dict, List, Any
-from langchain_openai import ChatOpenAI
+from typing import Dict, List, Any, Optional
+from tools.llm_cache import with_cache
+from tools.llm_trace import traced, llm_template
+from tools.llm_client_pool import create_chat_llm
+from tools.structured_output import StructuredOutput
+from tools.task_graph import run_task_graph, arun_task_graph
+from tools.prompt_context import render_context, prompt_stage, SERVICE_SUMMARY_FIELDS, RISK_SUMMARY_FIELDS
 import json
 
 # 프롬프트 임포트
@@ -18,12 +23,34 @@ class Recommender:
     AI 서비스의 윤리적 리스크를 개선하기 위한 권고안을 제시하는 에이전트
     """
 
-    def __init__(self, model_name="gpt-4o-mini"):
-        # LLM 모델 초기화
-        self.llm = ChatOpenAI(model=model_name, temperature=0.2)
+    # 단계별 응답 구조 (초기 권고안은 측면별 목록, 이후 단계는 우선순위별 목록)
+    INITIAL_SCHEMA = {"bias": list, "privacy": list, "transparency": list, "accountability": list}
+    PRIORITIZATION_SCHEMA = {"high_priority": list, "medium_priority": list, "low_priority": list}
+    COMPLEXITY_SCHEMA = {"implementation_complexity": dict}
+    FINAL_SCHEMA = {
+        "high_priority": list,
+        "medium_priority": list,
+        "low_priority": list,
+        "implementation_complexity": dict,
+        "expected_impact": dict,
+        "best_practices": dict,
+        "roadmap": (dict, list)
+    }
+
+    def __init__(self, model_name="gpt-4o-mini", max_concurrency=8, llm_cache=None, client_pool=None):
+        # LLM 모델 초기화 (llm_cache가 있으면 같은 프롬프트의 응답을 재사용, 호출마다 토큰·지연 시간 추적)
+        self.llm = traced(with_cache(create_chat_llm(model_name, 0.2, client_pool), llm_cache))
         # 윤리적 측면 정의
         self.ethical_aspects = ["bias", "privacy", "transparency", "accountability"]
+        # 서로 의존하지 않는 LLM 요청을 동시에 실행할 최대 수 (기본값: 4개 측면 × 모범 사례/맞춤 전략)
+        self.max_concurrency = max_concurrency
+        # JSON을 기대하는 단계는 JSON 모드로 요청하고, 잘못된 항목만 다시 요청
+        self.initial_output = StructuredOutput(self.INITIAL_SCHEMA)
+        self.prioritization_output = StructuredOutput(self.PRIORITIZATION_SCHEMA)
+        self.complexity_output = StructuredOutput(self.COMPLEXITY_SCHEMA)
+        self.final_output = StructuredOutput(self.FINAL_SCHEMA)
 
+    @llm_template("INITIAL_RECOMMENDATIONS_PROMPT")
     def generate_initial_recommendations(self, service_analysis: Dict[str, Any], 
                                       risk_assessment: Dict[str, Any], 
                                       domain_info: str, domain_focus: str) -> Dict[str, Any]:
@@ -39,45 +66,46 @@ class Recommender:
         Returns:
             초기 권고안 목록
         """
-        # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        risk_assessment_str = json.dumps(risk_assessment, ensure_ascii=False, indent=2)
-        
         # 초기 권고안 생성 요청
-        response = self.llm.invoke(
-            INITIAL_RECOMMENDATIONS_PROMPT.format(
-                service_analysis=service_analysis_str,
-                risk_assessment=risk_assessment_str,
-                domain_info=domain_info,
-                domain_focus=domain_focus
-            )
-        )
+        result, content = self.initial_output.invoke(self.llm, self._initial_recommendations_prompt(
+            service_analysis, risk_assessment, domain_info, domain_focus
+        ))
+        return self._parse_initial_recommendations(result, content)
+
+    @llm_template("INITIAL_RECOMMENDATIONS_PROMPT")
+    async def agenerate_initial_recommendations(self, service_analysis: Dict[str, Any],
+                                                risk_assessment: Dict[str, Any],
+                                                domain_info: str, domain_focus: str) -> Dict[str, Any]:
+        """generate_initial_recommendations의 비동기 버전"""
+        result, content = await self.initial_output.ainvoke(self.llm, self._initial_recommendations_prompt(
+            service_analysis, risk_assessment, domain_info, domain_focus
+        ))
+        return self._parse_initial_recommendations(result, content)
+
+    def _initial_recommendations_prompt(self, service_analysis: Dict[str, Any], risk_assessment: Dict[str, Any],
+                                        domain_info: str, domain_focus: str) -> str:
+        """초기 권고안 생성 프롬프트 작성"""
+        # 입력 정보 문자열화 (리스크 평가는 측면별 점수와 근거만)
+        service_analysis_str = render_context(service_analysis)
+        risk_assessment_str = render_context(risk_assessment, RISK_SUMMARY_FIELDS)
         
-        try:
-            # JSON 형식 응답 추출 시도
-            content = response.content
-            start_idx = content.find("{")
-            end_idx = content.rfind("}") + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx]
-                result = json.loads(json_str)
-            else:
-                # 구조화되지 않은 경우 텍스트 형태로 저장
-                result = {
-                    "recommendations_text": content,
-                    "structured": False
-                }
-                
-            return result
-            
-        except json.JSONDecodeError:
-            # JSON 파싱 실패 시 텍스트 형태로 저장
+        return INITIAL_RECOMMENDATIONS_PROMPT.format(
+            service_analysis=service_analysis_str,
+            risk_assessment=risk_assessment_str,
+            domain_info=domain_info,
+            domain_focus=domain_focus
+        )
+
+    def _parse_initial_recommendations(self, result: Optional[Dict[str, Any]], content: str) -> Dict[str, Any]:
+        """초기 권고안 응답 처리 (복구 후에도 JSON이 없으면 텍스트 형태로 저장)"""
+        if result is None:
             return {
-                "recommendations_text": response.content,
+                "recommendations_text": content,
                 "structured": False
             }
+        return result
 
+    @llm_template("PRIORITIZATION_PROMPT")
     def prioritize_recommendations(self, service_analysis: Dict[str, Any], 
                                 risk_assessment: Dict[str, Any], 
                                 initial_recommendations: Dict[str, Any]) -> Dict[str, Any]:
@@ -86,49 +114,48 @@ class Recommender:
         Returns:
             우선순위가 부여된 권고안
         """
+        # 우선순위 설정 요청
+        result, content = self.prioritization_output.invoke(self.llm, self._prioritization_prompt(
+            service_analysis, risk_assessment, initial_recommendations
+        ))
+        return self._parse_prioritization(result, content)
+
+    @llm_template("PRIORITIZATION_PROMPT")
+    async def aprioritize_recommendations(self, service_analysis: Dict[str, Any],
+                                          risk_assessment: Dict[str, Any],
+                                          initial_recommendations: Dict[str, Any]) -> Dict[str, Any]:
+        """prioritize_recommendations의 비동기 버전"""
+        result, content = await self.prioritization_output.ainvoke(self.llm, self._prioritization_prompt(
+            service_analysis, risk_assessment, initial_recommendations
+        ))
+        return self._parse_prioritization(result, content)
+
+    def _prioritization_prompt(self, service_analysis: Dict[str, Any], risk_assessment: Dict[str, Any],
+                               initial_recommendations: Dict[str, Any]) -> str:
+        """우선순위 설정 프롬프트 작성"""
         # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        risk_assessment_str = json.dumps(risk_assessment, ensure_ascii=False, indent=2)
-        initial_recommendations_str = json.dumps(initial_recommendations, ensure_ascii=False, indent=2)
+        service_analysis_str = render_context(service_analysis, SERVICE_SUMMARY_FIELDS)
+        risk_assessment_str = render_context(risk_assessment, RISK_SUMMARY_FIELDS)
+        initial_recommendations_str = render_context(initial_recommendations, max_tokens=2500)
         
-        # 우선순위 설정 요청
-        response = self.llm.invoke(
-            PRIORITIZATION_PROMPT.format(
-                service_analysis=service_analysis_str,
-                risk_assessment=risk_assessment_str,
-                initial_recommendations=initial_recommendations_str #initial_recommendations: 초기 권고안
-            )
+        return PRIORITIZATION_PROMPT.format(
+            service_analysis=service_analysis_str,
+            risk_assessment=risk_assessment_str,
+            initial_recommendations=initial_recommendations_str #initial_recommendations: 초기 권고안
         )
-        
-        try:
-            # JSON 형식 응답 추출 시도
-            content = response.content
-            start_idx = content.find("{")
-            end_idx = content.rfind("}") + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx]
-                result = json.loads(json_str)
-            else:
-                # 구조화되지 않은 경우
-                result = {
-                    "high_priority": [],
-                    "medium_priority": [],
-                    "low_priority": [],
-                    "prioritization_text": content
-                }
-                
-            return result
-            
-        except json.JSONDecodeError:
-            # 파싱 실패 시
+
+    def _parse_prioritization(self, result: Optional[Dict[str, Any]], content: str) -> Dict[str, Any]:
+        """우선순위 설정 응답 처리 (복구 후에도 JSON이 없으면 빈 우선순위 목록)"""
+        if result is None:
             return {
                 "high_priority": [],
                 "medium_priority": [],
                 "low_priority": [],
-                "prioritization_text": response.content
+                "prioritization_text": content
             }
+        return result
 
+    @llm_template("IMPLEMENTATION_COMPLEXITY_PROMPT")
     def evaluate_implementation_complexity(self, service_analysis: Dict[str, Any], 
                                          prioritized_recommendations: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -138,43 +165,51 @@ class Recommender:
         Returns:
             구현 복잡도가 평가된 권고안
         """
-        # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        prioritized_recommendations_str = json.dumps(prioritized_recommendations, ensure_ascii=False, indent=2)
-        
         # 구현 복잡도 평가 요청
-        response = self.llm.invoke(
-            IMPLEMENTATION_COMPLEXITY_PROMPT.format(
-                service_analysis=service_analysis_str,
-                prioritized_recommendations=prioritized_recommendations_str
-            )
+        result, content = self.complexity_output.invoke(
+            self.llm, self._complexity_prompt(service_analysis, prioritized_recommendations)
         )
+        return self._parse_complexity(result, content)
+
+    @llm_template("IMPLEMENTATION_COMPLEXITY_PROMPT")
+    async def aevaluate_implementation_complexity(self, service_analysis: Dict[str, Any],
+                                                  prioritized_recommendations: Dict[str, Any]) -> Dict[str, Any]:
+        """evaluate_implementation_complexity의 비동기 버전"""
+        result, content = await self.complexity_output.ainvoke(
+            self.llm, self._complexity_prompt(service_analysis, prioritized_recommendations)
+        )
+        return self._parse_complexity(result, content)
+
+    def _complexity_prompt(self, service_analysis: Dict[str, Any], prioritized_recommendations: Dict[str, Any]) -> str:
+        """구현 복잡도 평가 프롬프트 작성"""
+        # 입력 정보 문자열화
+        service_analysis_str = render_context(service_analysis, SERVICE_SUMMARY_FIELDS)
+        prioritized_recommendations_str = render_context(prioritized_recommendations, max_tokens=2500)
         
-        try:
-            # JSON 형식 응답 추출 시도
-            content = response.content
-            start_idx = content.find("{")
-            end_idx = content.rfind("}") + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx]
-                result = json.loads(json_str)
-            else:
-                # 구조화되지 않은 경우
-                result = {
-                    "implementation_complexity": {},
-                    "complexity_text": content
-                }
-                
-            return result
-            
-        except json.JSONDecodeError:
-            # 파싱 실패 시
+        return IMPLEMENTATION_COMPLEXITY_PROMPT.format(
+            service_analysis=service_analysis_str,
+            prioritized_recommendations=prioritized_recommendations_str
+        )
+
+    def _parse_complexity(self, result: Optional[Dict[str, Any]], content: str) -> Dict[str, Any]:
+        """구현 복잡도 평가 응답 처리 (복구 후에도 JSON이 없으면 텍스트 형태로 저장)"""
+        if result is None:
             return {
                 "implementation_complexity": {},
-                "complexity_text": response.content
+                "complexity_text": content
             }
+        return result
+
+    def _aspect_korean(self, aspect: str) -> str:
+        """윤리적 측면 한글화"""
+        return {
+            "bias": "편향성",
+            "privacy": "프라이버시",
+            "transparency": "투명성",
+            "accountability": "책임성"
+        }.get(aspect, aspect)
 
+    @llm_template("BEST_PRACTICES_PROMPT")
     def get_best_practices(self, service_analysis: Dict[str, Any], aspect: str, 
                          score: int, domain_info: str) -> Dict[str, Any]:
         """
@@ -182,26 +217,8 @@ class Recommender:
         Returns:
             모범 사례 정보
         """
-        # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        
-        # 윤리적 측면 한글화
-        aspect_korean = {
-            "bias": "편향성",
-            "privacy": "프라이버시",
-            "transparency": "투명성",
-            "accountability": "책임성"
-        }.get(aspect, aspect)
-        
         # 모범 사례 요청
-        response = self.llm.invoke(
-            BEST_PRACTICES_PROMPT.format(
-                domain_info=domain_info,
-                aspect=aspect_korean,
-                service_analysis=service_analysis_str,
-                score=score
-            )
-        )
+        response = self.llm.invoke(self._best_practices_prompt(service_analysis, aspect, score, domain_info))
         
         # 결과 반환
         return {
@@ -209,6 +226,30 @@ class Recommender:
             "best_practices": response.content
         }
 
+    @llm_template("BEST_PRACTICES_PROMPT")
+    async def aget_best_practices(self, service_analysis: Dict[str, Any], aspect: str,
+                                  score: int, domain_info: str) -> Dict[str, Any]:
+        """get_best_practices의 비동기 버전"""
+        response = await self.llm.ainvoke(self._best_practices_prompt(service_analysis, aspect, score, domain_info))
+        return {
+            "aspect": aspect,
+            "best_practices": response.content
+        }
+
+    def _best_practices_prompt(self, service_analysis: Dict[str, Any], aspect: str,
+                               score: int, domain_info: str) -> str:
+        """모범 사례 프롬프트 작성"""
+        # 입력 정보 문자열화 (측면별 작업이 같은 문자열을 공유)
+        service_analysis_str = render_context(service_analysis, SERVICE_SUMMARY_FIELDS)
+        
+        return BEST_PRACTICES_PROMPT.format(
+            domain_info=domain_info,
+            aspect=self._aspect_korean(aspect),
+            service_analysis=service_analysis_str,
+            score=score
+        )
+
+    @llm_template("AREA_SPECIFIC_STRATEGY_PROMPT")
     def create_area_specific_strategy(self, service_analysis: Dict[str, Any], 
                                    aspect: str, risk_details: str, 
                                    domain_info: str) -> Dict[str, Any]:
@@ -217,26 +258,8 @@ class Recommender:
         Returns:
             맞춤형 개선 전략
         """
-        # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        
-        # 윤리적 측면 한글화
-        aspect_korean = {
-            "bias": "편향성",
-            "privacy": "프라이버시",
-            "transparency": "투명성",
-            "accountability": "책임성"
-        }.get(aspect, aspect)
-        
         # 맞춤형 전략 요청
-        response = self.llm.invoke(
-            AREA_SPECIFIC_STRATEGY_PROMPT.format(
-                domain_info=domain_info,
-                aspect=aspect_korean,
-                service_analysis=service_analysis_str,
-                risk_details=risk_details
-            )
-        )
+        response = self.llm.invoke(self._strategy_prompt(service_analysis, aspect, risk_details, domain_info))
         
         # 결과 반환
         return {
@@ -244,6 +267,31 @@ class Recommender:
             "specific_strategy": response.content
         }
 
+    @llm_template("AREA_SPECIFIC_STRATEGY_PROMPT")
+    async def acreate_area_specific_strategy(self, service_analysis: Dict[str, Any],
+                                             aspect: str, risk_details: str,
+                                             domain_info: str) -> Dict[str, Any]:
+        """create_area_specific_strategy의 비동기 버전"""
+        response = await self.llm.ainvoke(self._strategy_prompt(service_analysis, aspect, risk_details, domain_info))
+        return {
+            "aspect": aspect,
+            "specific_strategy": response.content
+        }
+
+    def _strategy_prompt(self, service_analysis: Dict[str, Any], aspect: str,
+                         risk_details: str, domain_info: str) -> str:
+        """맞춤형 개선 전략 프롬프트 작성"""
+        # 입력 정보 문자열화 (측면별 작업이 같은 문자열을 공유)
+        service_analysis_str = render_context(service_analysis, SERVICE_SUMMARY_FIELDS)
+        
+        return AREA_SPECIFIC_STRATEGY_PROMPT.format(
+            domain_info=domain_info,
+            aspect=self._aspect_korean(aspect),
+            service_analysis=service_analysis_str,
+            risk_details=risk_details
+        )
+
+    @llm_template("FINAL_RECOMMENDATIONS_PROMPT")
     def generate_final_recommendations(self, service_analysis: Dict[str, Any], 
                                     risk_assessment: Dict[str, Any],
                                     prioritized_recommendations: Dict[str, Any],
@@ -255,51 +303,53 @@ class Recommender:
         Returns:
             최종 권고안 보고서
         """
-        # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        risk_assessment_str = json.dumps(risk_assessment, ensure_ascii=False, indent=2)
-        prioritized_recommendations_str = json.dumps(prioritized_recommendations, ensure_ascii=False, indent=2)
-        implementation_complexity_str = json.dumps(implementation_complexity, ensure_ascii=False, indent=2)
-        best_practices_str = json.dumps(best_practices, ensure_ascii=False, indent=2)
-        
         # 최종 권고안 생성 요청
-        response = self.llm.invoke(
-            FINAL_RECOMMENDATIONS_PROMPT.format(
-                service_analysis=service_analysis_str,
-                risk_assessment=risk_assessment_str,
-                prioritized_recommendations=prioritized_recommendations_str,
-                implementation_complexity=implementation_complexity_str,
-                best_practices=best_practices_str,
-                domain_info=domain_info,
-                domain_focus=domain_focus
-            )
-        )
+        result, content = self.final_output.invoke(self.llm, self._final_recommendations_prompt(
+            service_analysis, risk_assessment, prioritized_recommendations,
+            implementation_complexity, best_practices, domain_info, domain_focus
+        ))
+        return self._parse_final_recommendations(result, content)
+
+    @llm_template("FINAL_RECOMMENDATIONS_PROMPT")
+    async def agenerate_final_recommendations(self, service_analysis: Dict[str, Any],
+                                              risk_assessment: Dict[str, Any],
+                                              prioritized_recommendations: Dict[str, Any],
+                                              implementation_complexity: Dict[str, Any],
+                                              best_practices: List[Dict[str, Any]],
+                                              domain_info: str, domain_focus: str) -> Dict[str, Any]:
+        """generate_final_recommendations의 비동기 버전"""
+        result, content = await self.final_output.ainvoke(self.llm, self._final_recommendations_prompt(
+            service_analysis, risk_assessment, prioritized_recommendations,
+            implementation_complexity, best_practices, domain_info, domain_focus
+        ))
+        return self._parse_final_recommendations(result, content)
+
+    def _final_recommendations_prompt(self, service_analysis: Dict[str, Any], risk_assessment: Dict[str, Any],
+                                      prioritized_recommendations: Dict[str, Any],
+                                      implementation_complexity: Dict[str, Any],
+                                      best_practices: List[Dict[str, Any]],
+                                      domain_info: str, domain_focus: str) -> str:
+        """최종 권고안 프롬프트 작성"""
+        # 입력 정보 문자열화 (모범 사례는 측면별 긴 텍스트이므로 예산을 더 배정)
+        service_analysis_str = render_context(service_analysis, SERVICE_SUMMARY_FIELDS)
+        risk_assessment_str = render_context(risk_assessment, RISK_SUMMARY_FIELDS)
+        prioritized_recommendations_str = render_context(prioritized_recommendations, max_tokens=2500)
+        implementation_complexity_str = render_context(implementation_complexity)
+        best_practices_str = render_context(best_practices, max_tokens=3000)
         
-        try:
-            # JSON 형식 응답 추출 시도
-            content = response.content
-            start_idx = content.find("{")
-            end_idx = content.rfind("}") + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx]
-                result = json.loads(json_str)
-            else:
-                # 구조화되지 않은 경우
-                result = {
-                    "high_priority": [],
-                    "medium_priority": [],
-                    "low_priority": [],
-                    "implementation_complexity": {},
-                    "expected_impact": {},
-                    "best_practices": {},
-                    "recommendations_text": content
-                }
-                
-            return result
-            
-        except json.JSONDecodeError:
-            # 파싱 실패 시
+        return FINAL_RECOMMENDATIONS_PROMPT.format(
+            service_analysis=service_analysis_str,
+            risk_assessment=risk_assessment_str,
+            prioritized_recommendations=prioritized_recommendations_str,
+            implementation_complexity=implementation_complexity_str,
+            best_practices=best_practices_str,
+            domain_info=domain_info,
+            domain_focus=domain_focus
+        )
+
+    def _parse_final_recommendations(self, result: Optional[Dict[str, Any]], content: str) -> Dict[str, Any]:
+        """최종 권고안 응답 처리 (복구 후에도 JSON이 없으면 텍스트 형태로 저장)"""
+        if result is None:
             return {
                 "high_priority": [],
                 "medium_priority": [],
@@ -307,15 +357,77 @@ class Recommender:
                 "implementation_complexity": {},
                 "expected_impact": {},
                 "best_practices": {},
-                "recommendations_text": response.content
+                "recommendations_text": content
             }
+        return result
+
+    def _best_practice_task(self, service_analysis: Dict[str, Any], aspect: str, score: int, domain_info: str,
+                            asynchronous: bool = False):
+        """작업 그래프에서 실행할 모범 사례 수집 작업 생성 (asynchronous이면 코루틴 함수)"""
+        collect = self.aget_best_practices if asynchronous else self.get_best_practices
+        return lambda results: collect(service_analysis, aspect, score, domain_info)
+
+    def _strategy_task(self, service_analysis: Dict[str, Any], aspect: str, risk_details: str, domain_info: str,
+                       asynchronous: bool = False):
+        """작업 그래프에서 실행할 맞춤형 개선 전략 작업 생성 (asynchronous이면 코루틴 함수)"""
+        create = self.acreate_area_specific_strategy if asynchronous else self.create_area_specific_strategy
+        return lambda results: create(service_analysis, aspect, risk_details, domain_info)
 
+    @prompt_stage
     def recommend(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         전체 권고안 생성 프로세스 실행
         Returns:
             업데이트된 시스템 상태
         """
+        context = self._prepare_recommendation(state)
+        if context is None:
+            return state
+        service_analysis, risk_assessment, domain_info, domain_focus = context
+        
+        # 1~4. 초기 권고안/우선순위/구현 복잡도와 영역별 모범 사례를 작업 그래프로 실행
+        tasks, best_practice_tasks = self._recommendation_tasks(context)
+        results = run_task_graph(tasks, max_workers=self.max_concurrency)
+        prioritized_recommendations = self._report_prioritized(results["prioritized"])
+        
+        # 5. 최종 권고안 생성
+        print("\n📝 최종 개선 권고안 보고서 생성 중...")
+        final_recommendations = self.generate_final_recommendations(
+            service_analysis, risk_assessment,
+            prioritized_recommendations, results["complexity"],
+            [results[name] for name in best_practice_tasks], domain_info, domain_focus
+        )
+        
+        return self._finish_recommendation(state, final_recommendations)
+
+    @prompt_stage
+    async def arecommend(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """recommend의 비동기 버전 (LangGraph ainvoke용 노드)"""
+        context = self._prepare_recommendation(state)
+        if context is None:
+            return state
+        service_analysis, risk_assessment, domain_info, domain_focus = context
+        
+        tasks, best_practice_tasks = self._recommendation_tasks(context, asynchronous=True)
+        results = await arun_task_graph(tasks, max_workers=self.max_concurrency)
+        prioritized_recommendations = self._report_prioritized(results["prioritized"])
+        
+        print("\n📝 최종 개선 권고안 보고서 생성 중...")
+        final_recommendations = await self.agenerate_final_recommendations(
+            service_analysis, risk_assessment,
+            prioritized_recommendations, results["complexity"],
+            [results[name] for name in best_practice_tasks], domain_info, domain_focus
+        )
+        
+        return self._finish_recommendation(state, final_recommendations)
+
+    def _prepare_recommendation(self, state: Dict[str, Any]) -> Optional[tuple]:
+        """
+        상태에서 권고안 생성에 필요한 정보 추출
+        
+        Returns:
+            (서비스 분석 정보, 리스크 평가 결과, 도메인 정보, 중점 분석 요소) (정보가 부족하면 None)
+        """
         # 상태에서 필요한 정보 추출
         service_analysis = state.get("service_analysis", {})
         risk_assessment = state.get("risk_assessment", {})
@@ -326,24 +438,74 @@ class Recommender:
         # 서비스 정보와 리스크 평가 결과가 충분한지 확인
         if not service_analysis or not risk_assessment or not service_name:
             print("⚠️ 서비스 분석 또는 리스크 평가 정보가 부족합니다.")
-            return state
+            return None
         
         print(f"\n🔍 '{service_name}' 서비스의 윤리적 개선 권고안 생성을 시작합니다...")
         print(f"📊 도메인: {domain_info} | 중점 분석 요소: {domain_focus}")
+        return service_analysis, risk_assessment, domain_info, domain_focus
+
+    def _recommendation_tasks(self, context: tuple, asynchronous: bool = False):
+        """
+        권고안 생성 작업 그래프 구성
+        - 초기 권고안 → 우선순위 설정 → 구현 복잡도 평가 (순서대로 의존)
+        - 높은 리스크 영역별 모범 사례/맞춤형 전략 (리스크 평가에만 의존하므로 위 작업과 동시에 실행)
         
-        # 1. 초기 권고안 생성
-        print("\n🧐 초기 개선 권고안 생성 중...")
-        initial_recommendations = self.generate_initial_recommendations(
-            service_analysis, risk_assessment, domain_info, domain_focus
-        )
+        Returns:
+            (작업 그래프, 보고서에 들어갈 모범 사례 작업 이름 순서)
+        """
+        service_analysis, risk_assessment, domain_info, domain_focus = context
+        if asynchronous:
+            initial, prioritize, complexity = (
+                self.agenerate_initial_recommendations, self.aprioritize_recommendations,
+                self.aevaluate_implementation_complexity
+            )
+        else:
+            initial, prioritize, complexity = (
+                self.generate_initial_recommendations, self.prioritize_recommendations,
+                self.evaluate_implementation_complexity
+            )
         
-        # 2. 권고안 우선순위 설정
-        print("\n📋 권고안 우선순위 설정 중...")
-        prioritized_recommendations = self.prioritize_recommendations(
-            service_analysis, risk_assessment, initial_recommendations
-        )
+        # 높은 리스크 영역 식별 (점수 7 이상)
+        risk_areas = risk_assessment.get("risk_areas", {})
+        high_risk_areas = [
+            aspect for aspect in self.ethical_aspects
+            if aspect in risk_areas and risk_areas[aspect].get("score", 0) >= 7
+        ]
+        
+        tasks = {
+            "initial": (lambda results: initial(
+                service_analysis, risk_assessment, domain_info, domain_focus
+            ), []),
+            "prioritized": (lambda results: prioritize(
+                service_analysis, risk_assessment, results["initial"]
+            ), ["initial"]),
+            "complexity": (lambda results: complexity(
+                service_analysis, results["prioritized"]
+            ), ["prioritized"])
+        }
+        
+        # 보고서에 들어갈 모범 사례 순서 (영역별 모범 사례 → 맞춤형 전략)
+        best_practice_tasks = []
+        for aspect in high_risk_areas:
+            best_practice_tasks.append(f"best_practice:{aspect}")
+            tasks[f"best_practice:{aspect}"] = (self._best_practice_task(
+                service_analysis, aspect, risk_areas[aspect].get("score", 0), domain_info, asynchronous
+            ), [])
+            if "details" in risk_areas[aspect]:
+                best_practice_tasks.append(f"strategy:{aspect}")
+                tasks[f"strategy:{aspect}"] = (self._strategy_task(
+                    service_analysis, aspect, risk_areas[aspect]["details"], domain_info, asynchronous
+                ), [])
         
-        # 권고안 결과 초기 출력
+        print("\n🧐 초기 개선 권고안 생성 → 우선순위 설정 → 구현 복잡도 평가 진행 중...")
+        if high_risk_areas:
+            print("📚 주요 리스크 영역에 대한 모범 사례를 동시에 수집 중...")
+            for aspect in high_risk_areas:
+                print(f"- {aspect.capitalize()} 모범 사례 조사...")
+        return tasks, best_practice_tasks
+
+    def _report_prioritized(self, prioritized_recommendations: Dict[str, Any]) -> Dict[str, Any]:
+        """우선순위가 부여된 권고안 중 높은 우선순위 항목 출력"""
         if "high_priority" in prioritized_recommendations and prioritized_recommendations["high_priority"]:
             print("\n⚠️ 높은 우선순위 권고안:")
             for i, rec in enumerate(prioritized_recommendations["high_priority"], 1):
@@ -351,48 +513,10 @@ class Recommender:
                     print(f"  {i}. {rec['recommendation']}")
                 elif isinstance(rec, str):
                     print(f"  {i}. {rec}")
-        
-        # 3. 구현 복잡도 평가
-        print("\n🔄 권고안 구현 복잡도 평가 중...")
-        implementation_complexity = self.evaluate_implementation_complexity(
-            service_analysis, prioritized_recommendations
-        )
-        
-        # 4. 주요 리스크 영역에 대한 모범 사례 수집
-        best_practices = []
-        high_risk_areas = []
-        
-        # 높은 리스크 영역 식별 (점수 7 이상)
-        risk_areas = risk_assessment.get("risk_areas", {})
-        for aspect in self.ethical_aspects:
-            if aspect in risk_areas and risk_areas[aspect].get("score", 0) >= 7:
-                high_risk_areas.append(aspect)
-        
-        if high_risk_areas:
-            print("\n📚 주요 리스크 영역에 대한 모범 사례 수집 중...")
-            
-            for aspect in high_risk_areas:
-                print(f"- {aspect.capitalize()} 모범 사례 조사...")
-                score = risk_areas[aspect].get("score", 0)
-                best_practice = self.get_best_practices(service_analysis, aspect, score, domain_info)
-                best_practices.append(best_practice)
-                
-                # 추가로 맞춤형 개선 전략 생성
-                if aspect in risk_areas and "details" in risk_areas[aspect]:
-                    risk_details = risk_areas[aspect]["details"]
-                    specific_strategy = self.create_area_specific_strategy(
-                        service_analysis, aspect, risk_details, domain_info
-                    )
-                    best_practices.append(specific_strategy)
-        
-        # 5. 최종 권고안 생성
-        print("\n📝 최종 개선 권고안 보고서 생성 중...")
-        final_recommendations = self.generate_final_recommendations(
-            service_analysis, risk_assessment,
-            prioritized_recommendations, implementation_complexity,
-            best_practices, domain_info, domain_focus
-        )
-        
+        return prioritized_recommendations
+
+    def _finish_recommendation(self, state: Dict[str, Any], final_recommendations: Dict[str, Any]) -> Dict[str, Any]:
+        """최종 권고안을 정리하여 상태에 저장"""
         # 최종 권고안 저장
         recommendations = {
             "high_priority": final_recommendations.get("high_priority", []),
@@ -1,8 +1,17 @@
 #리포트 작성 에이전트
-from typing import Dict, List, Any
-from langchain_openai import ChatOpenAI
-import json
+from typing import Dict, List, Any, Optional
+from tools.llm_cache import with_cache
+from tools.llm_trace import traced, llm_template
+from tools.structured_output import StructuredOutput
+from tools.llm_client_pool import create_chat_llm
+from tools.task_graph import run_task_graph, arun_task_graph
+from tools.report_formatter import ReportFormatter
+from tools.prompt_context import (
+    render_context, prompt_stage, SERVICE_SUMMARY_FIELDS, RISK_SUMMARY_FIELDS, RECOMMENDATION_SUMMARY_FIELDS
+)
+import asyncio
 import os
+import time
 import datetime
 
 # 프롬프트 임포트
@@ -16,7 +25,8 @@ from prompts.report_generation import (
     RECOMMENDATIONS_SECTION_PROMPT,
     CONCLUSION_SECTION_PROMPT,
     VISUALIZATION_SUGGESTIONS_PROMPT,
-    FINAL_REPORT_ASSEMBLY_PROMPT
+    FINAL_REPORT_ASSEMBLY_PROMPT,
+    REPORT_TRANSITIONS_PROMPT
 )
 
 class ReportGenerator:
@@ -24,10 +34,33 @@ class ReportGenerator:
     AI 서비스의 윤리적 리스크 진단 결과를 종합적인 보고서로 작성하는 에이전트
     """
 
-    def __init__(self, model_name="gpt-4o-mini"):
-        # LLM 모델 초기화 - 보고서 작성은 창의성이 약간 필요하므로 온도 조정
-        self.llm = ChatOpenAI(model=model_name, temperature=0.3)
+    # 최종 보고서 조립 방식
+    # - "local": 템플릿에 섹션을 채워 로컬에서 조립 (LLM 호출 없음)
+    # - "local_transitions": 로컬 조립 + 섹션 간 연결 문장만 짧은 LLM 호출로 생성
+    # - "llm": 모든 섹션을 LLM에 다시 보내 조립 (FINAL_REPORT_ASSEMBLY_PROMPT)
+    ASSEMBLY_MODES = ("local", "local_transitions", "llm")
+    
+    # 로컬 조립 시 보고서에 들어가는 섹션 순서
+    REPORT_SECTIONS = [
+        "executive_summary", "introduction", "service_overview", "risk_assessment_section",
+        "compliance_section", "recommendations_section", "conclusion", "visualization_suggestions"
+    ]
+    
+    def __init__(self, model_name="gpt-4o-mini", max_concurrency=9, assembly_mode="local",
+                 template_path=None, llm_cache=None, client_pool=None, output_dir="outputs/reports"):
+        # LLM 모델 초기화 - 보고서 작성은 창의성이 약간 필요하므로 온도 조정 (llm_cache가 있으면 응답 재사용, 호출마다 토큰·지연 시간 추적)
+        self.llm = traced(with_cache(create_chat_llm(model_name, 0.3, client_pool), llm_cache))
+        # 서로 의존하지 않는 섹션을 동시에 작성할 최대 LLM 요청 수 (기본값: 독립 섹션 9개 모두 동시 실행)
+        self.max_concurrency = max_concurrency
+        if assembly_mode not in self.ASSEMBLY_MODES:
+            raise ValueError(f"지원하지 않는 조립 방식입니다: {assembly_mode} (지원: {', '.join(self.ASSEMBLY_MODES)})")
+        self.assembly_mode = assembly_mode
+        self.template_path = template_path
+        self.formatter = ReportFormatter()
+        # 마크다운/PDF 보고서 저장 디렉토리
+        self.output_dir = output_dir
 
+    @llm_template("REPORT_STRUCTURE_PROMPT")
     def create_report_structure(self, service_analysis: Dict[str, Any],
                               risk_assessment: Dict[str, Any],
                               recommendations: Dict[str, Any],
@@ -45,27 +78,48 @@ class ReportGenerator:
         Returns:
             보고서 구조
         """
-        # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        risk_assessment_str = json.dumps(risk_assessment, ensure_ascii=False, indent=2)
-        recommendations_str = json.dumps(recommendations, ensure_ascii=False, indent=2)
-        
         # 보고서 구조 요청
-        response = self.llm.invoke(
-            REPORT_STRUCTURE_PROMPT.format(
-                service_analysis=service_analysis_str,
-                risk_assessment=risk_assessment_str,
-                recommendations=recommendations_str,
-                domain_info=domain_info,
-                domain_focus=domain_focus
-            )
-        )
+        response = self.llm.invoke(self._report_structure_prompt(
+            service_analysis, risk_assessment, recommendations, domain_info, domain_focus
+        ))
         
         # 구조 반환 (텍스트 형태로)
         return {
             "structure": response.content
         }
 
+    @llm_template("REPORT_STRUCTURE_PROMPT")
+    async def acreate_report_structure(self, service_analysis: Dict[str, Any],
+                                     risk_assessment: Dict[str, Any],
+                                     recommendations: Dict[str, Any],
+                                     domain_info: str, domain_focus: str) -> Dict[str, Any]:
+        """create_report_structure의 비동기 버전"""
+        response = await self.llm.ainvoke(self._report_structure_prompt(
+            service_analysis, risk_assessment, recommendations, domain_info, domain_focus
+        ))
+        return {
+            "structure": response.content
+        }
+
+    def _report_structure_prompt(self, service_analysis: Dict[str, Any],
+                              risk_assessment: Dict[str, Any],
+                              recommendations: Dict[str, Any],
+                              domain_info: str, domain_focus: str) -> str:
+        """보고서 구조 설계 프롬프트 작성"""
+        # 입력 정보 문자열화 (구조 설계에는 요약 필드만 필요)
+        service_analysis_str = render_context(service_analysis, SERVICE_SUMMARY_FIELDS)
+        risk_assessment_str = render_context(risk_assessment, RISK_SUMMARY_FIELDS)
+        recommendations_str = render_context(recommendations, RECOMMENDATION_SUMMARY_FIELDS)
+        
+        return REPORT_STRUCTURE_PROMPT.format(
+            service_analysis=service_analysis_str,
+            risk_assessment=risk_assessment_str,
+            recommendations=recommendations_str,
+            domain_info=domain_info,
+            domain_focus=domain_focus
+        )
+
+    @llm_template("EXECUTIVE_SUMMARY_PROMPT")
     def generate_executive_summary(self, service_name: str, service_analysis: Dict[str, Any],
                                 risk_assessment: Dict[str, Any], recommendations: Dict[str, Any],
                                 domain_info: str, domain_focus: str) -> str:
@@ -83,25 +137,42 @@ class ReportGenerator:
         Returns:
             보고서 요약문
         """
-        # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        risk_assessment_str = json.dumps(risk_assessment, ensure_ascii=False, indent=2)
-        recommendations_str = json.dumps(recommendations, ensure_ascii=False, indent=2)
-        
         # 요약 생성 요청
-        response = self.llm.invoke(
-            EXECUTIVE_SUMMARY_PROMPT.format(
-                service_name=service_name,
-                service_analysis=service_analysis_str,
-                risk_assessment=risk_assessment_str,
-                recommendations=recommendations_str,
-                domain_info=domain_info,
-                domain_focus=domain_focus
-            )
-        )
+        response = self.llm.invoke(self._executive_summary_prompt(
+            service_name, service_analysis, risk_assessment, recommendations, domain_info, domain_focus
+        ))
         
         return response.content
 
+    @llm_template("EXECUTIVE_SUMMARY_PROMPT")
+    async def agenerate_executive_summary(self, service_name: str, service_analysis: Dict[str, Any],
+                                       risk_assessment: Dict[str, Any], recommendations: Dict[str, Any],
+                                       domain_info: str, domain_focus: str) -> str:
+        """generate_executive_summary의 비동기 버전"""
+        response = await self.llm.ainvoke(self._executive_summary_prompt(
+            service_name, service_analysis, risk_assessment, recommendations, domain_info, domain_focus
+        ))
+        return response.content
+
+    def _executive_summary_prompt(self, service_name: str, service_analysis: Dict[str, Any],
+                                risk_assessment: Dict[str, Any], recommendations: Dict[str, Any],
+                                domain_info: str, domain_focus: str) -> str:
+        """보고서 요약 프롬프트 작성"""
+        # 입력 정보 문자열화
+        service_analysis_str = render_context(service_analysis, SERVICE_SUMMARY_FIELDS)
+        risk_assessment_str = render_context(risk_assessment, RISK_SUMMARY_FIELDS)
+        recommendations_str = render_context(recommendations, RECOMMENDATION_SUMMARY_FIELDS)
+        
+        return EXECUTIVE_SUMMARY_PROMPT.format(
+            service_name=service_name,
+            service_analysis=service_analysis_str,
+            risk_assessment=risk_assessment_str,
+            recommendations=recommendations_str,
+            domain_info=domain_info,
+            domain_focus=domain_focus
+        )
+
+    @llm_template("INTRODUCTION_SECTION_PROMPT")
     def generate_introduction(self, service_name: str, service_analysis: Dict[str, Any],
                            domain_info: str, domain_focus: str) -> str:
         """
@@ -109,21 +180,36 @@ class ReportGenerator:
         Returns:
             서론 섹션 내용
         """
-        # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        
         # 서론 생성 요청
-        response = self.llm.invoke(
-            INTRODUCTION_SECTION_PROMPT.format(
-                service_name=service_name,
-                service_analysis=service_analysis_str,
-                domain_info=domain_info,
-                domain_focus=domain_focus
-            )
-        )
+        response = self.llm.invoke(self._introduction_prompt(
+            service_name, service_analysis, domain_info, domain_focus
+        ))
         
         return response.content
 
+    @llm_template("INTRODUCTION_SECTION_PROMPT")
+    async def agenerate_introduction(self, service_name: str, service_analysis: Dict[str, Any],
+                                  domain_info: str, domain_focus: str) -> str:
+        """generate_introduction의 비동기 버전"""
+        response = await self.llm.ainvoke(self._introduction_prompt(
+            service_name, service_analysis, domain_info, domain_focus
+        ))
+        return response.content
+
+    def _introduction_prompt(self, service_name: str, service_analysis: Dict[str, Any],
+                           domain_info: str, domain_focus: str) -> str:
+        """서론 섹션 프롬프트 작성"""
+        # 입력 정보 문자열화
+        service_analysis_str = render_context(service_analysis, SERVICE_SUMMARY_FIELDS)
+        
+        return INTRODUCTION_SECTION_PROMPT.format(
+            service_name=service_name,
+            service_analysis=service_analysis_str,
+            domain_info=domain_info,
+            domain_focus=domain_focus
+        )
+
+    @llm_template("SERVICE_OVERVIEW_SECTION_PROMPT")
     def generate_service_overview(self, service_name: str, service_analysis: Dict[str, Any],
                               domain_info: str, domain_focus: str) -> str:
         """
@@ -131,21 +217,36 @@ class ReportGenerator:
         Returns:
             서비스 개요 섹션 내용
         """
-        # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        
         # 서비스 개요 생성 요청
-        response = self.llm.invoke(
-            SERVICE_OVERVIEW_SECTION_PROMPT.format(
-                service_name=service_name,
-                service_analysis=service_analysis_str,
-                domain_info=domain_info,
-                domain_focus=domain_focus
-            )
-        )
+        response = self.llm.invoke(self._service_overview_prompt(
+            service_name, service_analysis, domain_info, domain_focus
+        ))
         
         return response.content
 
+    @llm_template("SERVICE_OVERVIEW_SECTION_PROMPT")
+    async def agenerate_service_overview(self, service_name: str, service_analysis: Dict[str, Any],
+                                     domain_info: str, domain_focus: str) -> str:
+        """generate_service_overview의 비동기 버전"""
+        response = await self.llm.ainvoke(self._service_overview_prompt(
+            service_name, service_analysis, domain_info, domain_focus
+        ))
+        return response.content
+
+    def _service_overview_prompt(self, service_name: str, service_analysis: Dict[str, Any],
+                              domain_info: str, domain_focus: str) -> str:
+        """서비스 개요 섹션 프롬프트 작성"""
+        # 입력 정보 문자열화 (서비스 개요는 도메인 특화 정보까지 포함한 전체)
+        service_analysis_str = render_context(service_analysis)
+        
+        return SERVICE_OVERVIEW_SECTION_PROMPT.format(
+            service_name=service_name,
+            service_analysis=service_analysis_str,
+            domain_info=domain_info,
+            domain_focus=domain_focus
+        )
+
+    @llm_template("RISK_ASSESSMENT_SECTION_PROMPT")
     def generate_risk_assessment_section(self, service_name: str, service_analysis: Dict[str, Any],
                                      risk_assessment: Dict[str, Any], domain_info: str,
                                      domain_focus: str) -> str:
@@ -154,9 +255,32 @@ class ReportGenerator:
         Returns:
             리스크 평가 섹션 내용
         """
-        # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        risk_assessment_str = json.dumps(risk_assessment, ensure_ascii=False, indent=2)
+        # 리스크 평가 섹션 생성 요청
+        response = self.llm.invoke(self._risk_assessment_section_prompt(
+            service_name, service_analysis, risk_assessment, domain_info, domain_focus
+        ))
+        
+        return response.content
+
+    @llm_template("RISK_ASSESSMENT_SECTION_PROMPT")
+    async def agenerate_risk_assessment_section(self, service_name: str, service_analysis: Dict[str, Any],
+                                            risk_assessment: Dict[str, Any], domain_info: str,
+                                            domain_focus: str) -> str:
+        """generate_risk_assessment_section의 비동기 버전"""
+        response = await self.llm.ainvoke(self._risk_assessment_section_prompt(
+            service_name, service_analysis, risk_assessment, domain_info, domain_focus
+        ))
+        return response.content
+
+    def _risk_assessment_section_prompt(self, service_name: str, service_analysis: Dict[str, Any],
+                                     risk_assessment: Dict[str, Any], domain_info: str,
+                                     domain_focus: str) -> str:
+        """리스크 평가 섹션 프롬프트 작성"""
+        # 입력 정보 문자열화 (리스크 평가 섹션에는 심층 분석 결과까지 포함)
+        service_analysis_str = render_context(service_analysis, SERVICE_SUMMARY_FIELDS)
+        risk_assessment_str = render_context(
+            risk_assessment, RISK_SUMMARY_FIELDS + ("deep_dive_analyses",), max_tokens=3000
+        )
         
         # 리스크 점수 추출 (기본값 0 사용)
         risk_areas = risk_assessment.get("risk_areas", {})
@@ -165,23 +289,19 @@ class ReportGenerator:
         transparency_score = risk_areas.get("transparency", {}).get("score", 0)
         accountability_score = risk_areas.get("accountability", {}).get("score", 0)
         
-        # 리스크 평가 섹션 생성 요청
-        response = self.llm.invoke(
-            RISK_ASSESSMENT_SECTION_PROMPT.format(
-                service_name=service_name,
-                service_analysis=service_analysis_str,
-                risk_assessment=risk_assessment_str,
-                domain_info=domain_info,
-                domain_focus=domain_focus,
-                bias_score=bias_score,
-                privacy_score=privacy_score,
-                transparency_score=transparency_score,
-                accountability_score=accountability_score
-            )
+        return RISK_ASSESSMENT_SECTION_PROMPT.format(
+            service_name=service_name,
+            service_analysis=service_analysis_str,
+            risk_assessment=risk_assessment_str,
+            domain_info=domain_info,
+            domain_focus=domain_focus,
+            bias_score=bias_score,
+            privacy_score=privacy_score,
+            transparency_score=transparency_score,
+            accountability_score=accountability_score
         )
-        
-        return response.content
 
+    @llm_template("COMPLIANCE_SECTION_PROMPT")
     def generate_compliance_section(self, service_name: str, risk_assessment: Dict[str, Any],
                                 domain_info: str) -> str:
         """
@@ -189,23 +309,37 @@ class ReportGenerator:
         Returns:
             규정 준수 상태 섹션 내용
         """
-        # 입력 정보 문자열화
-        risk_assessment_str = json.dumps(risk_assessment, ensure_ascii=False, indent=2)
-        compliance_status_str = json.dumps(risk_assessment.get("compliance_status", {}), 
-                                          ensure_ascii=False, indent=2)
-        
         # 규정 준수 섹션 생성 요청
-        response = self.llm.invoke(
-            COMPLIANCE_SECTION_PROMPT.format(
-                service_name=service_name,
-                risk_assessment=risk_assessment_str,
-                compliance_status=compliance_status_str,
-                domain_info=domain_info
-            )
-        )
+        response = self.llm.invoke(self._compliance_section_prompt(
+            service_name, risk_assessment, domain_info
+        ))
         
         return response.content
 
+    @llm_template("COMPLIANCE_SECTION_PROMPT")
+    async def agenerate_compliance_section(self, service_name: str, risk_assessment: Dict[str, Any],
+                                       domain_info: str) -> str:
+        """generate_compliance_section의 비동기 버전"""
+        response = await self.llm.ainvoke(self._compliance_section_prompt(
+            service_name, risk_assessment, domain_info
+        ))
+        return response.content
+
+    def _compliance_section_prompt(self, service_name: str, risk_assessment: Dict[str, Any],
+                                domain_info: str) -> str:
+        """규정 준수 상태 섹션 프롬프트 작성"""
+        # 입력 정보 문자열화 (준수 상태는 별도로 전달하므로 리스크 평가에서는 제외)
+        risk_assessment_str = render_context(risk_assessment, RISK_SUMMARY_FIELDS)
+        compliance_status_str = render_context(risk_assessment.get("compliance_status", {}))
+        
+        return COMPLIANCE_SECTION_PROMPT.format(
+            service_name=service_name,
+            risk_assessment=risk_assessment_str,
+            compliance_status=compliance_status_str,
+            domain_info=domain_info
+        )
+
+    @llm_template("RECOMMENDATIONS_SECTION_PROMPT")
     def generate_recommendations_section(self, service_name: str, service_analysis: Dict[str, Any],
                                      risk_assessment: Dict[str, Any], recommendations: Dict[str, Any],
                                      domain_info: str, domain_focus: str) -> str:
@@ -214,25 +348,42 @@ class ReportGenerator:
         Returns:
             권고안 섹션 내용
         """
-        # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        risk_assessment_str = json.dumps(risk_assessment, ensure_ascii=False, indent=2)
-        recommendations_str = json.dumps(recommendations, ensure_ascii=False, indent=2)
-        
         # 권고안 섹션 생성 요청
-        response = self.llm.invoke(
-            RECOMMENDATIONS_SECTION_PROMPT.format(
-                service_name=service_name,
-                service_analysis=service_analysis_str,
-                risk_assessment=risk_assessment_str,
-                recommendations=recommendations_str,
-                domain_info=domain_info,
-                domain_focus=domain_focus
-            )
-        )
+        response = self.llm.invoke(self._recommendations_section_prompt(
+            service_name, service_analysis, risk_assessment, recommendations, domain_info, domain_focus
+        ))
         
         return response.content
 
+    @llm_template("RECOMMENDATIONS_SECTION_PROMPT")
+    async def agenerate_recommendations_section(self, service_name: str, service_analysis: Dict[str, Any],
+                                            risk_assessment: Dict[str, Any], recommendations: Dict[str, Any],
+                                            domain_info: str, domain_focus: str) -> str:
+        """generate_recommendations_section의 비동기 버전"""
+        response = await self.llm.ainvoke(self._recommendations_section_prompt(
+            service_name, service_analysis, risk_assessment, recommendations, domain_info, domain_focus
+        ))
+        return response.content
+
+    def _recommendations_section_prompt(self, service_name: str, service_analysis: Dict[str, Any],
+                                     risk_assessment: Dict[str, Any], recommendations: Dict[str, Any],
+                                     domain_info: str, domain_focus: str) -> str:
+        """개선 권고안 섹션 프롬프트 작성"""
+        # 입력 정보 문자열화 (권고안 섹션에는 권고안 전체)
+        service_analysis_str = render_context(service_analysis, SERVICE_SUMMARY_FIELDS)
+        risk_assessment_str = render_context(risk_assessment, RISK_SUMMARY_FIELDS)
+        recommendations_str = render_context(recommendations, max_tokens=3000)
+        
+        return RECOMMENDATIONS_SECTION_PROMPT.format(
+            service_name=service_name,
+            service_analysis=service_analysis_str,
+            risk_assessment=risk_assessment_str,
+            recommendations=recommendations_str,
+            domain_info=domain_info,
+            domain_focus=domain_focus
+        )
+
+    @llm_template("CONCLUSION_SECTION_PROMPT")
     def generate_conclusion(self, service_name: str, risk_assessment: Dict[str, Any],
                          recommendations: Dict[str, Any], domain_info: str,
                          domain_focus: str) -> str:
@@ -241,23 +392,40 @@ class ReportGenerator:
         Returns:
             결론 섹션 내용
         """
-        # 입력 정보 문자열화
-        risk_assessment_str = json.dumps(risk_assessment, ensure_ascii=False, indent=2)
-        recommendations_str = json.dumps(recommendations, ensure_ascii=False, indent=2)
-        
         # 결론 생성 요청
-        response = self.llm.invoke(
-            CONCLUSION_SECTION_PROMPT.format(
-                service_name=service_name,
-                risk_assessment=risk_assessment_str,
-                recommendations=recommendations_str,
-                domain_info=domain_info,
-                domain_focus=domain_focus
-            )
-        )
+        response = self.llm.invoke(self._conclusion_prompt(
+            service_name, risk_assessment, recommendations, domain_info, domain_focus
+        ))
         
         return response.content
 
+    @llm_template("CONCLUSION_SECTION_PROMPT")
+    async def agenerate_conclusion(self, service_name: str, risk_assessment: Dict[str, Any],
+                                recommendations: Dict[str, Any], domain_info: str,
+                                domain_focus: str) -> str:
+        """generate_conclusion의 비동기 버전"""
+        response = await self.llm.ainvoke(self._conclusion_prompt(
+            service_name, risk_assessment, recommendations, domain_info, domain_focus
+        ))
+        return response.content
+
+    def _conclusion_prompt(self, service_name: str, risk_assessment: Dict[str, Any],
+                         recommendations: Dict[str, Any], domain_info: str,
+                         domain_focus: str) -> str:
+        """결론 섹션 프롬프트 작성"""
+        # 입력 정보 문자열화
+        risk_assessment_str = render_context(risk_assessment, RISK_SUMMARY_FIELDS)
+        recommendations_str = render_context(recommendations, RECOMMENDATION_SUMMARY_FIELDS)
+        
+        return CONCLUSION_SECTION_PROMPT.format(
+            service_name=service_name,
+            risk_assessment=risk_assessment_str,
+            recommendations=recommendations_str,
+            domain_info=domain_info,
+            domain_focus=domain_focus
+        )
+
+    @llm_template("VISUALIZATION_SUGGESTIONS_PROMPT")
     def suggest_visualizations(self, service_name: str, risk_assessment: Dict[str, Any],
                             recommendations: Dict[str, Any], domain_info: str) -> str:
         """
@@ -265,22 +433,37 @@ class ReportGenerator:
         Returns:
             시각화 제안 내용
         """
-        # 입력 정보 문자열화
-        risk_assessment_str = json.dumps(risk_assessment, ensure_ascii=False, indent=2)
-        recommendations_str = json.dumps(recommendations, ensure_ascii=False, indent=2)
-        
         # 시각화 제안 요청
-        response = self.llm.invoke(
-            VISUALIZATION_SUGGESTIONS_PROMPT.format(
-                service_name=service_name,
-                risk_assessment=risk_assessment_str,
-                recommendations=recommendations_str,
-                domain_info=domain_info
-            )
-        )
+        response = self.llm.invoke(self._visualizations_prompt(
+            service_name, risk_assessment, recommendations, domain_info
+        ))
         
         return response.content
 
+    @llm_template("VISUALIZATION_SUGGESTIONS_PROMPT")
+    async def asuggest_visualizations(self, service_name: str, risk_assessment: Dict[str, Any],
+                                   recommendations: Dict[str, Any], domain_info: str) -> str:
+        """suggest_visualizations의 비동기 버전"""
+        response = await self.llm.ainvoke(self._visualizations_prompt(
+            service_name, risk_assessment, recommendations, domain_info
+        ))
+        return response.content
+
+    def _visualizations_prompt(self, service_name: str, risk_assessment: Dict[str, Any],
+                            recommendations: Dict[str, Any], domain_info: str) -> str:
+        """시각화 제안 프롬프트 작성"""
+        # 입력 정보 문자열화
+        risk_assessment_str = render_context(risk_assessment, RISK_SUMMARY_FIELDS)
+        recommendations_str = render_context(recommendations, RECOMMENDATION_SUMMARY_FIELDS + ("roadmap",))
+        
+        return VISUALIZATION_SUGGESTIONS_PROMPT.format(
+            service_name=service_name,
+            risk_assessment=risk_assessment_str,
+            recommendations=recommendations_str,
+            domain_info=domain_info
+        )
+
+    @llm_template("FINAL_REPORT_ASSEMBLY_PROMPT")
     def assemble_final_report(self, service_name: str, executive_summary: str, introduction: str,
                            service_overview: str, risk_assessment_section: str,
                            compliance_section: str, recommendations_section: str,
@@ -291,22 +474,126 @@ class ReportGenerator:
             최종 보고서 내용
         """
         # 최종 보고서 조립 요청
-        response = self.llm.invoke(
-            FINAL_REPORT_ASSEMBLY_PROMPT.format(
-                service_name=service_name,
-                executive_summary=executive_summary,
-                introduction=introduction,
-                service_overview=service_overview,
-                risk_assessment_section=risk_assessment_section,
-                compliance_section=compliance_section,
-                recommendations_section=recommendations_section,
-                conclusion=conclusion,
-                visualization_suggestions=visualization_suggestions
-            )
-        )
+        response = self.llm.invoke(self._assembly_prompt(
+            service_name, executive_summary, introduction, service_overview, risk_assessment_section,
+            compliance_section, recommendations_section, conclusion, visualization_suggestions
+        ))
         
         return response.content
 
+    @llm_template("FINAL_REPORT_ASSEMBLY_PROMPT")
+    async def aassemble_final_report(self, service_name: str, executive_summary: str, introduction: str,
+                                     service_overview: str, risk_assessment_section: str,
+                                     compliance_section: str, recommendations_section: str,
+                                     conclusion: str, visualization_suggestions: str) -> str:
+        """assemble_final_report의 비동기 버전"""
+        response = await self.llm.ainvoke(self._assembly_prompt(
+            service_name, executive_summary, introduction, service_overview, risk_assessment_section,
+            compliance_section, recommendations_section, conclusion, visualization_suggestions
+        ))
+        return response.content
+
+    def _assembly_prompt(self, service_name: str, executive_summary: str, introduction: str,
+                           service_overview: str, risk_assessment_section: str,
+                           compliance_section: str, recommendations_section: str,
+                           conclusion: str, visualization_suggestions: str) -> str:
+        """최종 보고서 조립 프롬프트 작성"""
+        return FINAL_REPORT_ASSEMBLY_PROMPT.format(
+            service_name=service_name,
+            executive_summary=executive_summary,
+            introduction=introduction,
+            service_overview=service_overview,
+            risk_assessment_section=risk_assessment_section,
+            compliance_section=compliance_section,
+            recommendations_section=recommendations_section,
+            conclusion=conclusion,
+            visualization_suggestions=visualization_suggestions
+        )
+
+    def assemble_report_locally(self, service_name: str, domain_info: str, domain_focus: str,
+                                sections: Dict[str, str], risk_assessment: Dict[str, Any],
+                                recommendations: Dict[str, Any], with_transitions: bool = False) -> str:
+        """
+        작성된 섹션을 보고서 템플릿에 채워 최종 보고서 조립 (LLM 재작성 없음)
+        
+        Args:
+            sections: 섹션 이름 → 섹션 내용
+            with_transitions: True이면 섹션 간 연결 문장만 LLM으로 생성하여 추가
+            
+        Returns:
+            최종 보고서 내용
+        """
+        transitions = self.generate_transitions(service_name, sections) if with_transitions else None
+        return self._fill_template(service_name, domain_info, domain_focus, sections,
+                                   risk_assessment, recommendations, transitions)
+
+    async def aassemble_report_locally(self, service_name: str, domain_info: str, domain_focus: str,
+                                       sections: Dict[str, str], risk_assessment: Dict[str, Any],
+                                       recommendations: Dict[str, Any], with_transitions: bool = False) -> str:
+        """assemble_report_locally의 비동기 버전"""
+        transitions = await self.agenerate_transitions(service_name, sections) if with_transitions else None
+        return self._fill_template(service_name, domain_info, domain_focus, sections,
+                                   risk_assessment, recommendations, transitions)
+
+    def _fill_template(self, service_name: str, domain_info: str, domain_focus: str,
+                       sections: Dict[str, str], risk_assessment: Dict[str, Any],
+                       recommendations: Dict[str, Any], transitions: Optional[Dict[str, str]]) -> str:
+        """섹션과 연결 문장을 보고서 템플릿에 채움"""
+        content = self.formatter.build_report_content(
+            service_name, domain_info, domain_focus, sections,
+            risk_assessment, recommendations, transitions
+        )
+        return self.formatter.format_markdown(content, self.template_path)
+
+    @llm_template("REPORT_TRANSITIONS_PROMPT")
+    def generate_transitions(self, service_name: str, sections: Dict[str, str],
+                             opening_chars: int = 200) -> Dict[str, str]:
+        """
+        섹션 도입부만 보고 섹션 간 연결 문장 생성 (전체 섹션을 다시 보내지 않는 짧은 LLM 호출)
+        Returns:
+            섹션 이름 → 연결 문장 (실패 시 빈 딕셔너리)
+        """
+        try:
+            transitions, _ = self._transitions_output(sections).invoke(
+                self.llm, self._transitions_prompt(service_name, sections, opening_chars)
+            )
+            return self._parse_transitions(transitions)
+        except Exception as e:
+            print(f"⚠️ 연결 문장 생성 실패, 연결 문장 없이 조립합니다: {str(e)}")
+            return {}
+
+    @llm_template("REPORT_TRANSITIONS_PROMPT")
+    async def agenerate_transitions(self, service_name: str, sections: Dict[str, str],
+                                    opening_chars: int = 200) -> Dict[str, str]:
+        """generate_transitions의 비동기 버전"""
+        try:
+            transitions, _ = await self._transitions_output(sections).ainvoke(
+                self.llm, self._transitions_prompt(service_name, sections, opening_chars)
+            )
+            return self._parse_transitions(transitions)
+        except Exception as e:
+            print(f"⚠️ 연결 문장 생성 실패, 연결 문장 없이 조립합니다: {str(e)}")
+            return {}
+
+    def _transitions_prompt(self, service_name: str, sections: Dict[str, str], opening_chars: int) -> str:
+        """섹션 도입부로 연결 문장 프롬프트 작성"""
+        section_openings = "\n\n".join(
+            f"[{name}]\n{ReportFormatter.normalize_section(sections.get(name, ''))[:opening_chars]}"
+            for name in self.REPORT_SECTIONS if sections.get(name)
+        )
+        return REPORT_TRANSITIONS_PROMPT.format(
+            service_name=service_name,
+            section_openings=section_openings
+        )
+
+    def _transitions_output(self, sections: Dict[str, str]) -> StructuredOutput:
+        """작성된 섹션마다 연결 문장(문자열)을 요구하는 구조화 응답 요청기"""
+        return StructuredOutput({name: str for name in self.REPORT_SECTIONS if sections.get(name)})
+
+    def _parse_transitions(self, transitions: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """연결 문장 응답(JSON)에서 보고서 섹션에 해당하는 항목만 추출"""
+        return {name: str(text) for name, text in (transitions or {}).items() if name in self.REPORT_SECTIONS}
+
     def save_report_to_file(self, report_content: str, service_name: str) -> str:
         """
         생성된 보고서를 파일로 저장  및 PDF저장
@@ -314,7 +601,7 @@ class ReportGenerator:
             저장된 파일 경로
         """
         # 출력 디렉토리 확인 및 생성
-        output_dir = "outputs/reports"
+        output_dir = self.output_dir
         os.makedirs(output_dir, exist_ok=True)
         
         # 타임스탬프 생성 (현재 날짜/시간 포함)
@@ -322,14 +609,21 @@ class ReportGenerator:
         service_name_safe = service_name.replace(' ', '_')
         
          # 마크다운 파일 저장
-        md_filename = f"{service_name_safe}_{timestamp}.md"
-        md_filepath = os.path.join(output_dir, md_filename)
-        
-        with open(md_filepath, "w", encoding="utf-8") as f:
-            f.write(report_content)
-        
+        # (일괄 진단에서 같은 서비스가 같은 초에 저장되어도 덮어쓰지 않도록 번호 추가)
+        base_name = f"{service_name_safe}_{timestamp}"
+        suffix = 1
+        while True:
+            md_filename = f"{base_name}.md" if suffix == 1 else f"{base_name}_{suffix}.md"
+            md_filepath = os.path.join(output_dir, md_filename)
+            try:
+                with open(md_filepath, "x", encoding="utf-8") as f:
+                    f.write(report_content)
+                break
+            except FileExistsError:
+                suffix += 1
+
         # PDF 파일 생성
-        pdf_filename = f"{service_name_safe}_{timestamp}.pdf"
+        pdf_filename = md_filename[:-len(".md")] + ".pdf"
         pdf_filepath = os.path.join(output_dir, pdf_filename)
     
         try:
@@ -385,6 +679,107 @@ class ReportGenerator:
         return md_filepath
                         
 
+    def _timed_task(self, label: str, func):
+        """작업 시작/완료 로그와 소요 시간을 출력하도록 감싼 작업 함수 반환"""
+        def run(results: Dict[str, Any]):
+            print(f"{label} 중...")
+            started_at = time.perf_counter()
+            result = func(results)
+            print(f"  ✔ {label} 완료 ({time.perf_counter() - started_at:.1f}초)")
+            return result
+        return run
+
+    def _atimed_task(self, label: str, func):
+        """_timed_task의 비동기 버전 (func는 코루틴 함수)"""
+        async def run(results: Dict[str, Any]):
+            print(f"{label} 중...")
+            started_at = time.perf_counter()
+            result = await func(results)
+            print(f"  ✔ {label} 완료 ({time.perf_counter() - started_at:.1f}초)")
+            return result
+        return run
+
+    def _section_calls(self, service_name: str, service_analysis: Dict[str, Any],
+                       risk_assessment: Dict[str, Any], recommendations: Dict[str, Any],
+                       domain_info: str, domain_focus: str) -> Dict[str, tuple]:
+        """
+        보고서 섹션별 (로그 라벨, 작성 메서드, 비동기 작성 메서드, 인자)
+        (구조 설계·요약·각 섹션·시각화 제안은 이미 계산된 상태에만 의존하므로 모두 동시에 작성 가능)
+        """
+        return {
+            "report_structure": ("📋 보고서 구조 설계", self.create_report_structure, self.acreate_report_structure, (
+                service_analysis, risk_assessment, recommendations, domain_info, domain_focus
+            )),
+            "executive_summary": ("✍️ 보고서 요약(Executive Summary) 작성", self.generate_executive_summary,
+                                  self.agenerate_executive_summary, (
+                service_name, service_analysis, risk_assessment,
+                recommendations, domain_info, domain_focus
+            )),
+            "introduction": ("✍️ 서론 섹션 작성", self.generate_introduction, self.agenerate_introduction, (
+                service_name, service_analysis, domain_info, domain_focus
+            )),
+            "service_overview": ("✍️ 서비스 개요 섹션 작성", self.generate_service_overview,
+                                 self.agenerate_service_overview, (
+                service_name, service_analysis, domain_info, domain_focus
+            )),
+            "risk_assessment_section": ("✍️ 리스크 평가 섹션 작성", self.generate_risk_assessment_section,
+                                        self.agenerate_risk_assessment_section, (
+                service_name, service_analysis, risk_assessment, domain_info, domain_focus
+            )),
+            "compliance_section": ("✍️ 규정 준수 상태 섹션 작성", self.generate_compliance_section,
+                                   self.agenerate_compliance_section, (
+                service_name, risk_assessment, domain_info
+            )),
+            "recommendations_section": ("✍️ 개선 권고안 섹션 작성", self.generate_recommendations_section,
+                                        self.agenerate_recommendations_section, (
+                service_name, service_analysis, risk_assessment,
+                recommendations, domain_info, domain_focus
+            )),
+            "conclusion": ("✍️ 결론 섹션 작성", self.generate_conclusion, self.agenerate_conclusion, (
+                service_name, risk_assessment, recommendations, domain_info, domain_focus
+            )),
+            "visualization_suggestions": ("🎨 시각화 요소 제안", self.suggest_visualizations,
+                                          self.asuggest_visualizations, (
+                service_name, risk_assessment, recommendations, domain_info
+            ))
+        }
+
+    def _report_tasks(self, context: tuple, asynchronous: bool = False) -> Dict[str, Any]:
+        """
+        섹션 작성과 최종 조립 작업 그래프 구성
+        (섹션은 모두 동시에 작성하고, 최종 조립만 모든 섹션이 끝난 뒤 실행)
+        """
+        service_name, service_analysis, risk_assessment, recommendations, domain_info, domain_focus = context
+        section_calls = self._section_calls(
+            service_name, service_analysis, risk_assessment, recommendations, domain_info, domain_focus
+        )
+        timed = self._atimed_task if asynchronous else self._timed_task
+        tasks = {}
+        for name, (label, write, awrite, args) in section_calls.items():
+            # 섹션 작업은 작성 메서드를 그대로 호출 (기본 인자로 반복 변수를 고정)
+            method = awrite if asynchronous else write
+            tasks[name] = (timed(label, lambda results, method=method, args=args: method(*args)), [])
+        
+        assembly_inputs = self.REPORT_SECTIONS
+        with_transitions = self.assembly_mode == "local_transitions"
+        if self.assembly_mode == "llm":
+            assemble_final = self.aassemble_final_report if asynchronous else self.assemble_final_report
+            assemble = lambda results: assemble_final(
+                service_name, *[results[name] for name in assembly_inputs]
+            )
+        else:
+            local = self.aassemble_report_locally if asynchronous else self.assemble_report_locally
+            assemble = lambda results: local(
+                service_name, domain_info, domain_focus,
+                {name: results[name] for name in assembly_inputs},
+                risk_assessment, recommendations, with_transitions=with_transitions
+            )
+        tasks["final_report"] = (timed("📄 최종 보고서 조립", assemble), assembly_inputs)
+        
+        print(f"\n📋 보고서 섹션 {len(section_calls)}개를 동시에 작성합니다 (최대 동시 요청 {self.max_concurrency}개)...")
+        return tasks
+
+    @prompt_stage
     def generate(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         전체 보고서 생성 프로세스 실행
@@ -395,6 +790,48 @@ class ReportGenerator:
         Returns:
             업데이트된 시스템 상태
         """
+        context = self._prepare_report(state)
+        if context is None:
+            return state
+        
+        # 1~5. 섹션 작성과 최종 조립을 작업 그래프로 실행
+        tasks = self._report_tasks(context)
+        started_at = time.perf_counter()
+        sections = run_task_graph(tasks, max_workers=self.max_concurrency)
+        print(f"⏱️ 보고서 작성 소요 시간: {time.perf_counter() - started_at:.1f}초")
+        
+        # 6. 보고서 저장
+        print("💾 보고서 파일 저장 중...")
+        report_filepath = self.save_report_to_file(sections["final_report"], context[0])
+        
+        return self._finish_report(state, sections, report_filepath)
+
+    @prompt_stage
+    async def agenerate(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """generate의 비동기 버전 (LangGraph ainvoke용 노드)"""
+        context = self._prepare_report(state)
+        if context is None:
+            return state
+        
+        tasks = self._report_tasks(context, asynchronous=True)
+        started_at = time.perf_counter()
+        sections = await arun_task_graph(tasks, max_workers=self.max_concurrency)
+        print(f"⏱️ 보고서 작성 소요 시간: {time.perf_counter() - started_at:.1f}초")
+        
+        # 파일 저장과 PDF 변환은 동기 작업이므로 스레드에서 실행
+        print("💾 보고서 파일 저장 중...")
+        report_filepath = await asyncio.to_thread(self.save_report_to_file, sections["final_report"], context[0])
+        
+        return self._finish_report(state, sections, report_filepath)
+
+    def _prepare_report(self, state: Dict[str, Any]) -> Optional[tuple]:
+        """
+        상태에서 보고서 생성에 필요한 정보 추출
+        
+        Returns:
+            (서비스 이름, 서비스 분석 정보, 리스크 평가 결과, 개선 권고안, 도메인 정보, 중점 분석 요소)
+            (정보가 부족하면 None)
+        """
         # 상태에서 필요한 정보 추출
         service_analysis = state.get("service_analysis", {})
         risk_assessment = state.get("risk_assessment", {})
@@ -406,90 +843,30 @@ class ReportGenerator:
         # 필요한 정보가 충분한지 확인
         if not service_analysis or not risk_assessment or not recommendations:
             print("⚠️ 보고서 생성에 필요한 정보가 부족합니다.")
-            return state
+            return None
         
         print(f"\n📝 '{service_name}' 서비스에 대한 윤리 리스크 진단 보고서 생성을 시작합니다...")
         print(f"📊 도메인: {domain_info} | 중점 분석 요소: {domain_focus}")
-        
-        # 1. 보고서 구조 설계
-        print("\n📋 보고서 구조 설계 중...")
-        report_structure = self.create_report_structure(
-            service_analysis, risk_assessment, recommendations, domain_info, domain_focus
-        )
-        
-        # 2. 요약(Executive Summary) 작성
-        print("✍️ 보고서 요약(Executive Summary) 작성 중...")
-        executive_summary = self.generate_executive_summary(
-            service_name, service_analysis, risk_assessment,
-            recommendations, domain_info, domain_focus
-        )
-        
-        # 3. 각 섹션 생성
-        print("✍️ 서론 섹션 작성 중...")
-        introduction = self.generate_introduction(
-            service_name, service_analysis, domain_info, domain_focus
-        )
-        
-        print("✍️ 서비스 개요 섹션 작성 중...")
-        service_overview = self.generate_service_overview(
-            service_name, service_analysis, domain_info, domain_focus
-        )
-        
-        print("✍️ 리스크 평가 섹션 작성 중...")
-        risk_assessment_section = self.generate_risk_assessment_section(
-            service_name, service_analysis, risk_assessment, domain_info, domain_focus
-        )
-        
-        print("✍️ 규정 준수 상태 섹션 작성 중...")
-        compliance_section = self.generate_compliance_section(
-            service_name, risk_assessment, domain_info
-        )
-        
-        print("✍️ 개선 권고안 섹션 작성 중...")
-        recommendations_section = self.generate_recommendations_section(
-            service_name, service_analysis, risk_assessment,
-            recommendations, domain_info, domain_focus
-        )
-        
-        print("✍️ 결론 섹션 작성 중...")
-        conclusion = self.generate_conclusion(
-            service_name, risk_assessment, recommendations, domain_info, domain_focus
-        )
-        
-        # 4. 시각화 제안
-        print("🎨 시각화 요소 제안 중...")
-        visualization_suggestions = self.suggest_visualizations(
-            service_name, risk_assessment, recommendations, domain_info
-        )
-        
-        # 5. 최종 보고서 조립
-        print("📄 최종 보고서 조립 중...")
-        final_report = self.assemble_final_report(
-            service_name, executive_summary, introduction, service_overview,
-            risk_assessment_section, compliance_section, recommendations_section,
-            conclusion, visualization_suggestions
-        )
-        
-        # 6. 보고서 저장
-        print("💾 보고서 파일 저장 중...")
-        report_filepath = self.save_report_to_file(final_report, service_name)
-        
+        return service_name, service_analysis, risk_assessment, recommendations, domain_info, domain_focus
+
+    def _finish_report(self, state: Dict[str, Any], sections: Dict[str, Any], report_filepath: str) -> Dict[str, Any]:
+        """작성된 섹션과 저장 경로를 상태에 저장"""
         # PDF 파일 경로 추론 (마크다운 파일 경로에서 확장자만 변경)
         pdf_filepath = report_filepath.replace('.md', '.pdf')
         pdf_exists = os.path.exists(pdf_filepath)
         
         # 보고서 생성 정보 저장
         report_generation = {
-            "report_structure": report_structure.get("structure", ""),
-            "executive_summary": executive_summary,
-            "introduction": introduction,
-            "service_overview": service_overview,
-            "risk_assessment_section": risk_assessment_section,
-            "compliance_section": compliance_section,
-            "recommendations_section": recommendations_section,
-            "conclusion": conclusion,
-            "visualization_suggestions": visualization_suggestions,
-            "final_report": final_report,
+            "report_structure": sections["report_structure"].get("structure", ""),
+            "executive_summary": sections["executive_summary"],
+            "introduction": sections["introduction"],
+            "service_overview": sections["service_overview"],
+            "risk_assessment_section": sections["risk_assessment_section"],
+            "compliance_section": sections["compliance_section"],
+            "recommendations_section": sections["recommendations_section"],
+            "conclusion": sections["conclusion"],
+            "visualization_suggestions": sections["visualization_suggestions"],
+            "final_report": sections["final_report"],
             "report_filepath": report_filepath,
             "pdf_filepath": pdf_filepath if pdf_exists else None
         }
@@ -1,6 +1,12 @@
 #윤리 리스크 진단 에이전트
-from typing import Dict, List, Any
-from langchain_openai import ChatOpenAI
+from typing import Dict, List, Any, Optional
+from tools.llm_cache import with_cache
+from tools.llm_trace import traced, llm_template
+from tools.llm_client_pool import create_chat_llm
+from tools.structured_output import StructuredOutput
+from tools.task_graph import run_task_graph, arun_task_graph
+from tools.prompt_context import render_context, prompt_stage, SERVICE_SUMMARY_FIELDS, RISK_SUMMARY_FIELDS
+import asyncio
 import json
 
 # 프롬프트 임포트
@@ -16,12 +22,128 @@ class RiskAssessor:
     AI 서비스의 윤리적 리스크를 평가하는 에이전트
     """
 
-    def __init__(self, model_name="gpt-4o-mini"):
-        # LLM 모델 초기화 - 온도를 낮게 설정하여 객관적인 평가 유도
-        self.llm = ChatOpenAI(model=model_name, temperature=0.1)
+    # 윤리적 측면별 가이드라인 청크 도메인 태그 (tools.guideline_metadata 태그 이름)
+    ASPECT_TAGS = {
+        "bias": "fairness",
+        "privacy": "privacy",
+        "transparency": "transparency",
+        "accountability": "accountability"
+    }
+    
+    # 준수 여부를 평가하는 가이드라인 (검색 쿼리, 규제 계열 태그)
+    COMPLIANCE_GUIDELINES = {
+        "eu_ai_act": ("EU AI Act 고위험 AI 시스템 요구사항", "eu_ai_act"),
+        "oecd_ai_principles": ("OECD AI 원칙", "oecd"),
+        "unesco_recommendation": ("UNESCO AI 윤리 권고", "unesco")
+    }
+    
+    # 측면별 리스크 평가 응답 구조 (초기/최종 평가 공통)
+    RISK_AREA_SCHEMA = {"score": (int, float), "evidence": list, "details": str}
+    ASSESSMENT_SCHEMA = {
+        "risk_areas": {
+            "bias": RISK_AREA_SCHEMA,
+            "privacy": RISK_AREA_SCHEMA,
+            "transparency": RISK_AREA_SCHEMA,
+            "accountability": RISK_AREA_SCHEMA
+        }
+    }
+    # 가이드라인 준수 평가 응답 구조
+    COMPLIANCE_SCHEMA = {name: {"status": str, "reason": str} for name in COMPLIANCE_GUIDELINES}
+    
+    def __init__(self, model_name="gpt-4o-mini", guideline_rag=None, max_concurrency=5, call_timeout=120,
+                 llm_cache=None, client_pool=None):
+        # LLM 모델 초기화 - 온도를 낮게 설정하여 객관적인 평가 유도 (llm_cache가 있으면 응답 재사용, 호출마다 토큰·지연 시간 추적)
+        self.llm = traced(with_cache(create_chat_llm(model_name, 0.1, client_pool), llm_cache))
         # 평가할 윤리적 측면들
         self.ethical_aspects = ["bias", "privacy", "transparency", "accountability"]
+        # 가이드라인 검색 도구 (없으면 근거 없이 평가)
+        self.guideline_rag = guideline_rag
+        # 심층 분석/준수 평가를 동시에 요청할 최대 수(기본값: 4개 측면 + 준수 평가)와 요청별 제한 시간(초)
+        self.max_concurrency = max_concurrency
+        self.call_timeout = call_timeout
+        # 평가/준수 응답은 JSON 모드로 요청하고, 잘못된 항목만 다시 요청
+        self.assessment_output = StructuredOutput(self.ASSESSMENT_SCHEMA)
+        self.compliance_output = StructuredOutput(self.COMPLIANCE_SCHEMA)
+        
+    def retrieve_guideline_evidence(self, service_name: str, domain_info: str,
+                                    domain_specific: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        평가에 필요한 가이드라인 근거를 한 번의 배치 검색으로 조회
+        (윤리적 측면별 1개 + 가이드라인/도메인 규제별 1개 쿼리, 임베딩은 한 번의 배치 요청)
+        
+        Args:
+            service_name: 서비스 이름
+            domain_info: 도메인 정보
+            domain_specific: 도메인 특화 정보 (관련 규제 목록 포함)
+            
+        Returns:
+            {"aspects": 측면별 검색 결과, "regulations": 가이드라인/규제별 검색 결과}
+        """
+        evidence = {"aspects": {}, "regulations": {}}
+        if self.guideline_rag is None:
+            return evidence
+        
+        queries = {}
+        for aspect in self.ethical_aspects:
+            queries[f"aspect:{aspect}"] = {
+                "query": f"{domain_info} AI {self._aspect_korean(aspect)} 윤리 기준 {service_name}",
+                "filters": {"domains": [self.ASPECT_TAGS[aspect]]}
+            }
+        for name, (query, family) in self.COMPLIANCE_GUIDELINES.items():
+            queries[f"regulation:{name}"] = {
+                "query": f"{query} {domain_info} AI 준수 요건",
+                "filters": {"regulations": [family]}
+            }
+        for regulation in (domain_specific or {}).get("regulations", []):
+            queries[f"regulation:{regulation}"] = {"query": f"{regulation} {domain_info} AI 준수 요건"}
+        
+        try:
+            results = self.guideline_rag.search_local_guidelines_batch(queries)
+        except Exception as e:
+            print(f"⚠️ 가이드라인 근거 검색 실패: {str(e)}")
+            return evidence
         
+        for key, value in results.items():
+            group, name = key.split(":", 1)
+            evidence["aspects" if group == "aspect" else "regulations"][name] = value
+        return evidence
+    
+    def _aspect_korean(self, ethical_aspect: str) -> str:
+        """윤리적 측면 한글화"""
+        return {
+            "bias": "편향성",
+            "privacy": "프라이버시",
+            "transparency": "투명성",
+            "accountability": "책임성"
+        }.get(ethical_aspect, ethical_aspect)
+    
+    def _format_evidence(self, results: List[Dict[str, Any]], max_chars: int = 500) -> str:
+        """검색 결과를 프롬프트용 근거 텍스트로 변환"""
+        if not results:
+            return "검색된 가이드라인 근거 없음"
+        
+        lines = []
+        for result in results:
+            page = result.get("page")
+            location = f"{result['source']}, {page + 1}쪽" if isinstance(page, int) else result["source"]
+            content = " ".join(result["content"].split())[:max_chars]
+            lines.append(f"- [{location}] {content}")
+        return "\n".join(lines)
+    
+    def _evidence_references(self, evidence: Dict[str, Any]) -> Dict[str, Any]:
+        """근거 검색 결과에서 본문을 제외한 출처 목록만 추출 (상태 저장용)"""
+        return {
+            group: {
+                name: [
+                    {"source": r["source"], "page": r.get("page"), "relevance": r["relevance"]}
+                    for r in results
+                ]
+                for name, results in items.items()
+            }
+            for group, items in evidence.items()
+        }
+        
+    @llm_template("INITIAL_ASSESSMENT_PROMPT")
     def initial_risk_assessment(self, service_analysis: Dict[str, Any], domain_info: str, domain_focus: str) -> Dict[str, Any]:
         """
         서비스 정보를 바탕으로 초기 윤리 리스크 평가 수행
@@ -34,143 +156,160 @@ class RiskAssessor:
         Returns:
             초기 리스크 평가 결과
         """
-        # 서비스 분석 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        
         # 초기 리스크 평가 요청
-        response = self.llm.invoke(
-            INITIAL_ASSESSMENT_PROMPT.format(
-                service_analysis=service_analysis_str,
-                domain_info=domain_info,
-                domain_focus=domain_focus
-            )
+        assessment, content = self.assessment_output.invoke(
+            self.llm, self._initial_assessment_prompt(service_analysis, domain_info, domain_focus)
         )
-        
-        try:
-            # JSON 형식 응답 추출
-            content = response.content
-            start_idx = content.find("{")
-            end_idx = content.rfind("}") + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx]
-                result = json.loads(json_str)
-            else:
-                # 구조화되지 않은 경우 수동 파싱 시도
-                result = self._parse_unstructured_assessment(content)
-                
-            return result
-            
-        except json.JSONDecodeError:
-            # JSON 파싱 실패 시 수동 파싱 시도
-            return self._parse_unstructured_assessment(response.content)
+        return self._parse_initial_assessment(assessment, content)
+    
+    @llm_template("INITIAL_ASSESSMENT_PROMPT")
+    async def ainitial_risk_assessment(self, service_analysis: Dict[str, Any], domain_info: str,
+                                       domain_focus: str) -> Dict[str, Any]:
+        """initial_risk_assessment의 비동기 버전"""
+        assessment, content = await self.assessment_output.ainvoke(
+            self.llm, self._initial_assessment_prompt(service_analysis, domain_info, domain_focus)
+        )
+        return self._parse_initial_assessment(assessment, content)
+    
+    def _initial_assessment_prompt(self, service_analysis: Dict[str, Any], domain_info: str, domain_focus: str) -> str:
+        """초기 리스크 평가 프롬프트 작성"""
+        # 서비스 분석 정보 문자열화 (도메인 특화 정보까지 포함한 전체, 토큰 예산 적용)
+        service_analysis_str = render_context(service_analysis)
+        return INITIAL_ASSESSMENT_PROMPT.format(
+            service_analysis=service_analysis_str,
+            domain_info=domain_info,
+            domain_focus=domain_focus
+        )
+    
+    def _parse_initial_assessment(self, assessment: Optional[Dict[str, Any]], content: str) -> Dict[str, Any]:
+        """초기 리스크 평가 응답 처리 (복구 후에도 JSON이 없으면 텍스트에서 점수 추출)"""
+        if assessment is None:
+            return self._parse_unstructured_assessment(content)
+        return assessment
 
+    @llm_template("DEEP_DIVE_PROMPT")
     def deep_dive_analysis(self, service_name: str, ethical_aspect: str, 
                          service_analysis: Dict[str, Any], domain_info: str,
-                         current_assessment: Dict[str, Any]) -> Dict[str, Any]:
+                         current_assessment: Dict[str, Any],
+                         guideline_evidence: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         특정 윤리적 측면에 대해 심층 분석 수행
         
         Args:
             current_assessment: 현재까지의 평가 정보
+            guideline_evidence: 해당 측면의 가이드라인 검색 결과
             
         Returns:
             심층 분석 결과
         """
-        # 서비스 분석과 현재 평가 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        current_assessment_str = json.dumps(current_assessment, ensure_ascii=False, indent=2)
-        
-        # 윤리적 측면 한글화 (프롬프트 템플릿용)
-        aspect_korean = {
-            "bias": "편향성",
-            "privacy": "프라이버시",
-            "transparency": "투명성",
-            "accountability": "책임성"
-        }.get(ethical_aspect, ethical_aspect)
-        
         # 심층 분석 요청
-        response = self.llm.invoke(
-            DEEP_DIVE_PROMPT.format(
-                ethical_aspect=aspect_korean,
-                service_name=service_name,
-                service_analysis=service_analysis_str,
-                domain_info=domain_info,
-                current_assessment=current_assessment_str
-            )
-        )
+        response = self.llm.invoke(self._deep_dive_prompt(
+            service_name, ethical_aspect, service_analysis, domain_info, current_assessment, guideline_evidence
+        ))
         
         # 응답 처리
         return {
             "aspect": ethical_aspect,
             "detailed_analysis": response.content
         }
+    
+    @llm_template("DEEP_DIVE_PROMPT")
+    async def adeep_dive_analysis(self, service_name: str, ethical_aspect: str,
+                                  service_analysis: Dict[str, Any], domain_info: str,
+                                  current_assessment: Dict[str, Any],
+                                  guideline_evidence: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """deep_dive_analysis의 비동기 버전"""
+        response = await self.llm.ainvoke(self._deep_dive_prompt(
+            service_name, ethical_aspect, service_analysis, domain_info, current_assessment, guideline_evidence
+        ))
+        return {
+            "aspect": ethical_aspect,
+            "detailed_analysis": response.content
+        }
+    
+    def _deep_dive_prompt(self, service_name: str, ethical_aspect: str, service_analysis: Dict[str, Any],
+                          domain_info: str, current_assessment: Dict[str, Any],
+                          guideline_evidence: Optional[List[Dict[str, Any]]]) -> str:
+        """심층 분석 프롬프트 작성"""
+        # 서비스 분석과 현재 평가 정보 문자열화 (현재 평가는 해당 측면의 초기 평가만)
+        service_analysis_str = render_context(service_analysis)
+        current_assessment_str = render_context(
+            current_assessment.get("risk_areas", {}).get(ethical_aspect, current_assessment), max_tokens=600
+        )
+        
+        # 윤리적 측면 한글화 (프롬프트 템플릿용)
+        aspect_korean = self._aspect_korean(ethical_aspect)
+        
+        return DEEP_DIVE_PROMPT.format(
+            ethical_aspect=aspect_korean,
+            service_name=service_name,
+            service_analysis=service_analysis_str,
+            domain_info=domain_info,
+            current_assessment=current_assessment_str,
+            guideline_evidence=self._format_evidence(guideline_evidence or [])
+        )
 
+    @llm_template("COMPLIANCE_CHECK_PROMPT")
     def check_compliance(self, service_name: str, service_analysis: Dict[str, Any], 
-                       risk_assessment: Dict[str, Any]) -> Dict[str, Any]:
+                       risk_assessment: Dict[str, Any],
+                       guideline_evidence: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> Dict[str, Any]:
         """
         주요 AI 윤리 가이드라인 준수 여부 확인
-        """
-        # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        risk_assessment_str = json.dumps(risk_assessment, ensure_ascii=False, indent=2)
         
+        Args:
+            guideline_evidence: 가이드라인/규제별 검색 결과
+        """
         # 준수 여부 평가 요청
-        response = self.llm.invoke(
-            COMPLIANCE_CHECK_PROMPT.format(
-                service_name=service_name,
-                service_analysis=service_analysis_str,
-                risk_assessment=risk_assessment_str
-            )
+        compliance, content = self.compliance_output.invoke(self.llm, self._compliance_prompt(
+            service_name, service_analysis, risk_assessment, guideline_evidence
+        ))
+        return self._parse_compliance(compliance, content)
+    
+    @llm_template("COMPLIANCE_CHECK_PROMPT")
+    async def acheck_compliance(self, service_name: str, service_analysis: Dict[str, Any],
+                                risk_assessment: Dict[str, Any],
+                                guideline_evidence: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+        """check_compliance의 비동기 버전"""
+        compliance, content = await self.compliance_output.ainvoke(self.llm, self._compliance_prompt(
+            service_name, service_analysis, risk_assessment, guideline_evidence
+        ))
+        return self._parse_compliance(compliance, content)
+    
+    def _compliance_prompt(self, service_name: str, service_analysis: Dict[str, Any],
+                           risk_assessment: Dict[str, Any],
+                           guideline_evidence: Optional[Dict[str, List[Dict[str, Any]]]]) -> str:
+        """가이드라인 준수 여부 평가 프롬프트 작성"""
+        # 입력 정보 문자열화 (리스크 평가는 측면별 점수와 근거만)
+        service_analysis_str = render_context(service_analysis, SERVICE_SUMMARY_FIELDS)
+        risk_assessment_str = render_context(risk_assessment, RISK_SUMMARY_FIELDS)
+        evidence_str = "\n\n".join(
+            f"[{name}]\n{self._format_evidence(results)}"
+            for name, results in (guideline_evidence or {}).items()
+        ) or "검색된 가이드라인 근거 없음"
+        
+        return COMPLIANCE_CHECK_PROMPT.format(
+            service_name=service_name,
+            service_analysis=service_analysis_str,
+            risk_assessment=risk_assessment_str,
+            guideline_evidence=evidence_str
         )
-        
-        try:
-            # JSON 형식 응답 추출 시도
-            content = response.content
-            start_idx = content.find("{")
-            end_idx = content.rfind("}") + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx]
-                result = json.loads(json_str)
-            else:
-                # 구조화되지 않은 경우 기본 형식으로 반환
-                result = {
-                    "eu_ai_act": {
-                        "status": "미평가",
-                        "reason": "자동 파싱 실패"
-                    },
-                    "oecd_ai_principles": {
-                        "status": "미평가",
-                        "reason": "자동 파싱 실패"
-                    },
-                    "unesco_recommendation": {
-                        "status": "미평가",
-                        "reason": "자동 파싱 실패"
-                    },
-                    "compliance_text": response.content
-                }
-                
-            return result
-            
-        except json.JSONDecodeError:
-            # 파싱 실패 시 기본 형식으로 반환
-            return {
-                "eu_ai_act": {
-                    "status": "미평가",
-                    "reason": "JSON 파싱 실패"
-                },
-                "oecd_ai_principles": {
-                    "status": "미평가",
-                    "reason": "JSON 파싱 실패"
-                },
-                "unesco_recommendation": {
-                    "status": "미평가",
-                    "reason": "JSON 파싱 실패"
-                },
-                "compliance_text": response.content
-            }
+    
+    def _parse_compliance(self, compliance: Optional[Dict[str, Any]], content: str) -> Dict[str, Any]:
+        """준수 여부 평가 응답 처리 (복구 후에도 JSON이 없으면 기본 형식)"""
+        if compliance is None:
+            return self._default_compliance("JSON 파싱 실패", content)
+        return compliance
 
+    def _default_compliance(self, reason: str, compliance_text: str = "") -> Dict[str, Any]:
+        """준수 여부를 평가하지 못한 경우의 기본 결과"""
+        result = {
+            name: {"status": "미평가", "reason": reason}
+            for name in self.COMPLIANCE_GUIDELINES
+        }
+        result["compliance_text"] = compliance_text
+        return result
+
+    @llm_template("FINAL_ASSESSMENT_PROMPT")
     def generate_final_assessment(self, service_name: str, service_analysis: Dict[str, Any],
                                initial_assessment: Dict[str, Any], deep_dive_results: List[Dict[str, Any]],
                                domain_info: str, domain_focus: str) -> Dict[str, Any]:
@@ -188,11 +327,43 @@ class RiskAssessor:
         Returns:
             최종 리스크 평가 보고서
         """
-        # 입력 정보 문자열화
-        service_analysis_str = json.dumps(service_analysis, ensure_ascii=False, indent=2)
-        initial_assessment_str = json.dumps(initial_assessment, ensure_ascii=False, indent=2)
-        deep_dive_str = json.dumps(deep_dive_results, ensure_ascii=False, indent=2)
-        
+        # 최종 평가 요청
+        assessment, content = self.assessment_output.invoke(self.llm, self._final_assessment_prompt(
+            service_name, service_analysis, initial_assessment, deep_dive_results, domain_info, domain_focus
+        ))
+        return self._finalize_assessment(assessment, content, domain_info, domain_focus)
+    
+    @llm_template("FINAL_ASSESSMENT_PROMPT")
+    async def agenerate_final_assessment(self, service_name: str, service_analysis: Dict[str, Any],
+                                         initial_assessment: Dict[str, Any], deep_dive_results: List[Dict[str, Any]],
+                                         domain_info: str, domain_focus: str) -> Dict[str, Any]:
+        """generate_final_assessment의 비동기 버전"""
+        assessment, content = await self.assessment_output.ainvoke(self.llm, self._final_assessment_prompt(
+            service_name, service_analysis, initial_assessment, deep_dive_results, domain_info, domain_focus
+        ))
+        return self._finalize_assessment(assessment, content, domain_info, domain_focus)
+    
+    def _final_assessment_prompt(self, service_name: str, service_analysis: Dict[str, Any],
+                                 initial_assessment: Dict[str, Any], deep_dive_results: List[Dict[str, Any]],
+                                 domain_info: str, domain_focus: str) -> str:
+        """최종 평가 프롬프트 작성"""
+        # 입력 정보 문자열화 (심층 분석 결과가 가장 길므로 예산을 더 배정)
+        service_analysis_str = render_context(service_analysis, SERVICE_SUMMARY_FIELDS)
+        initial_assessment_str = render_context(initial_assessment)
+        deep_dive_str = render_context(deep_dive_results, max_tokens=3000)
+        
+        return FINAL_ASSESSMENT_PROMPT.format(
+            service_name=service_name,
+            service_analysis=service_analysis_str,
+            initial_assessment=initial_assessment_str,
+            deep_dive_results=deep_dive_str,
+            domain_info=domain_info,
+            domain_focus=domain_focus
+        )
+    
+    def _finalize_assessment(self, assessment: Optional[Dict[str, Any]], content: str,
+                             domain_info: str, domain_focus: str) -> Dict[str, Any]:
+        """최종 평가 응답 처리 및 기본 점수 보장"""
         # 기본 점수 설정 - 오류 해결을 위해 추가
         default_scores = {
         "bias": self._calculate_default_score(domain_info, "bias", domain_focus),
@@ -201,20 +372,8 @@ class RiskAssessor:
         "accountability": self._calculate_default_score(domain_info, "accountability", domain_focus)
          }
         
-        # 최종 평가 요청
-        response = self.llm.invoke(
-            FINAL_ASSESSMENT_PROMPT.format(
-                service_name=service_name,
-                service_analysis=service_analysis_str,
-                initial_assessment=initial_assessment_str,
-                deep_dive_results=deep_dive_str,
-                domain_info=domain_info,
-                domain_focus=domain_focus
-            )
-        )
-        
-        # 결과 처리 및 기본 점수 보장
-        result = self._extract_json_or_default(response.content)
+        # 결과 처리 및 기본 점수 보장 (복구 후에도 JSON이 없으면 빈 평가 구조)
+        result = assessment if assessment is not None else self._empty_assessment(content)
         
         # 결과에 risk_areas가 없거나 점수가 0으로만 되어 있는 경우 기본 점수 사용
         if "risk_areas" not in result or all(area.get("score", 0) == 0 for area in result["risk_areas"].values()):
@@ -316,43 +475,41 @@ class RiskAssessor:
             print(f"평가 텍스트 파싱 오류: {e}")
             
         return result
-    def _extract_json_or_default(self, content: str) -> Dict[str, Any]:
-        """응답에서 JSON 추출 또는 기본값 반환"""
-        try:
-            # JSON 형식 응답 추출
-            start_idx = content.find("{")
-            end_idx = content.rfind("}") + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx]
-                result = json.loads(json_str)
-                return result
-            else:
-                # 구조화되지 않은 경우 기본 구조로 반환
-                return {
-                    "risk_areas": {
-                        "bias": {"score": 0, "evidence": [], "details": ""},
-                        "privacy": {"score": 0, "evidence": [], "details": ""},
-                        "transparency": {"score": 0, "evidence": [], "details": ""},
-                        "accountability": {"score": 0, "evidence": [], "details": ""}
-                    },
-                    "overall_risk_score": 0,
-                    "assessment_text": content
-                }
-                
-        except json.JSONDecodeError:
-            # 파싱 실패 시 기본 구조로 반환
-            return {
-                "risk_areas": {
-                    "bias": {"score": 0, "evidence": [], "details": ""},
-                    "privacy": {"score": 0, "evidence": [], "details": ""},
-                    "transparency": {"score": 0, "evidence": [], "details": ""},
-                    "accountability": {"score": 0, "evidence": [], "details": ""}
-                },
-                "overall_risk_score": 0,
-                "assessment_text": content
-            }
+    
+    def _empty_assessment(self, content: str) -> Dict[str, Any]:
+        """점수가 없는 기본 평가 구조 (원본 응답 보존)"""
+        return {
+            "risk_areas": {
+                "bias": {"score": 0, "evidence": [], "details": ""},
+                "privacy": {"score": 0, "evidence": [], "details": ""},
+                "transparency": {"score": 0, "evidence": [], "details": ""},
+                "accountability": {"score": 0, "evidence": [], "details": ""}
+            },
+            "overall_risk_score": 0,
+            "assessment_text": content
+        }
         
+    def _deep_dive_task(self, service_name: str, aspect: str, service_analysis: Dict[str, Any],
+                        domain_info: str, initial_assessment: Dict[str, Any],
+                        guideline_evidence: Optional[List[Dict[str, Any]]], asynchronous: bool = False):
+        """작업 그래프에서 실행할 심층 분석 작업 생성 (asynchronous이면 코루틴 함수)"""
+        analyze = self.adeep_dive_analysis if asynchronous else self.deep_dive_analysis
+        return lambda results: analyze(
+            service_name, aspect, service_analysis, domain_info, initial_assessment, guideline_evidence
+        )
+    
+    def _fallback_result(self, task_name: str, error: Exception) -> Dict[str, Any]:
+        """심층 분석/준수 평가가 실패하거나 시간을 초과했을 때의 대체 결과"""
+        reason = "시간 초과" if isinstance(error, TimeoutError) else f"오류: {str(error)}"
+        print(f"⚠️ {task_name} 작업을 완료하지 못했습니다 ({reason})")
+        if task_name == "compliance":
+            return self._default_compliance(reason)
+        return {
+            "aspect": task_name.split(":", 1)[1],
+            "detailed_analysis": f"심층 분석을 완료하지 못했습니다 ({reason})"
+        }
+        
+    @prompt_stage
     def assess(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         전체 리스크 평가 프로세스 실행
@@ -363,6 +520,91 @@ class RiskAssessor:
         Returns:
             업데이트된 시스템 상태
         """
+        context = self._prepare_assessment(state)
+        if context is None:
+            return state
+        service_name, service_analysis, domain_info, domain_focus = context
+        
+        # 0. 이후 단계에서 사용할 가이드라인 근거를 한 번에 검색
+        guideline_evidence = {"aspects": {}, "regulations": {}}
+        if self.guideline_rag is not None:
+            print("\n📚 관련 가이드라인 근거 검색 중...")
+            guideline_evidence = self.retrieve_guideline_evidence(
+                service_name, domain_info, state.get("domain_specific")
+            )
+        
+        # 1. 초기 리스크 평가 수행
+        print("\n🧐 초기 윤리 리스크 평가 중...")
+        initial_assessment = self.initial_risk_assessment(service_analysis, domain_info, domain_focus)
+        
+        # 2~3. 높은 리스크 영역 심층 분석과 가이드라인 준수 여부 확인을 동시에 실행
+        high_risk_aspects = self._report_initial_assessment(initial_assessment)
+        tasks = self._analysis_tasks(context, initial_assessment, high_risk_aspects, guideline_evidence)
+        results = run_task_graph(
+            tasks, max_workers=self.max_concurrency,
+            timeout=self.call_timeout, on_error=self._fallback_result
+        )
+        deep_dive_results = [results[f"deep_dive:{aspect}"] for aspect in high_risk_aspects]
+        
+        # 4. 최종 평가 보고서 생성
+        print("\n📝 최종 윤리 리스크 평가 보고서 생성 중...")
+        final_assessment = self.generate_final_assessment(
+            service_name, service_analysis, initial_assessment,
+            deep_dive_results, domain_info, domain_focus
+        )
+        
+        return self._finish_assessment(state, final_assessment, results["compliance"],
+                                       deep_dive_results, guideline_evidence)
+    
+    @prompt_stage
+    async def aassess(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """assess의 비동기 버전 (LangGraph ainvoke용 노드)"""
+        context = self._prepare_assessment(state)
+        if context is None:
+            return state
+        service_name, service_analysis, domain_info, domain_focus = context
+        
+        # 가이드라인 근거 검색(임베딩 요청 + FAISS 검색)은 동기 코드이므로 스레드에서 실행하고
+        # 그동안 초기 리스크 평가를 함께 진행 (초기 평가는 근거를 사용하지 않음)
+        print("\n🧐 초기 윤리 리스크 평가 중...")
+        if self.guideline_rag is not None:
+            print("\n📚 관련 가이드라인 근거 검색 중...")
+            guideline_evidence, initial_assessment = await asyncio.gather(
+                asyncio.to_thread(
+                    self.retrieve_guideline_evidence, service_name, domain_info, state.get("domain_specific")
+                ),
+                self.ainitial_risk_assessment(service_analysis, domain_info, domain_focus)
+            )
+        else:
+            guideline_evidence = {"aspects": {}, "regulations": {}}
+            initial_assessment = await self.ainitial_risk_assessment(service_analysis, domain_info, domain_focus)
+        
+        high_risk_aspects = self._report_initial_assessment(initial_assessment)
+        tasks = self._analysis_tasks(context, initial_assessment, high_risk_aspects, guideline_evidence,
+                                     asynchronous=True)
+        results = await arun_task_graph(
+            tasks, max_workers=self.max_concurrency,
+            timeout=self.call_timeout, on_error=self._fallback_result
+        )
+        deep_dive_results = [results[f"deep_dive:{aspect}"] for aspect in high_risk_aspects]
+        
+        print("\n📝 최종 윤리 리스크 평가 보고서 생성 중...")
+        final_assessment = await self.agenerate_final_assessment(
+            service_name, service_analysis, initial_assessment,
+            deep_dive_results, domain_info, domain_focus
+        )
+        
+        return self._finish_assessment(state, final_assessment, results["compliance"],
+                                       deep_dive_results, guideline_evidence)
+    
+    def _prepare_assessment(self, state: Dict[str, Any]) -> Optional[tuple]:
+        """
+        상태에서 평가에 필요한 정보 추출
+        
+        Returns:
+            (서비스 이름, 서비스 분석 정보, 도메인 정보, 중점 분석 요소)
+            (서비스 정보가 부족하면 피드백 플래그를 설정하고 None)
+        """
         # 상태에서 필요한 정보 추출
         service_analysis = state.get("service_analysis", {})
         service_name = service_analysis.get("service_name", state.get("service_name", ""))
@@ -374,53 +616,59 @@ class RiskAssessor:
             print("⚠️ 서비스 분석 정보가 부족합니다. 서비스 분석 단계로 돌아갑니다.")
             # 피드백 루프를 위한 플래그 설정
             state["feedback_required"] = True
-            return state
+            return None
         
         print(f"\n🔍 '{service_name}' 서비스의 윤리적 리스크 평가를 시작합니다...")
         print(f"📊 도메인: {domain_info} | 중점 분석 요소: {domain_focus}")
-        
-        # 1. 초기 리스크 평가 수행
-        print("\n🧐 초기 윤리 리스크 평가 중...")
-        initial_assessment = self.initial_risk_assessment(service_analysis, domain_info, domain_focus)
-        
+        return service_name, service_analysis, domain_info, domain_focus
+    
+    def _report_initial_assessment(self, initial_assessment: Dict[str, Any]) -> List[str]:
+        """초기 평가 결과를 출력하고 심층 분석이 필요한 높은 리스크 영역(점수 7 이상) 반환"""
         # 초기 평가 결과 출력
         print("\n📊 초기 윤리 리스크 평가 결과:")
         for aspect in initial_assessment.get("risk_areas", {}):
             score = initial_assessment["risk_areas"][aspect].get("score", "N/A")
             print(f"- {aspect.capitalize()}: {score}/10")
         
-        # 2. 필요시 심층 분석 수행
-        deep_dive_results = []
+        # 심층 분석이 필요한 높은 리스크 영역 식별 (점수 7 이상)
         high_risk_aspects = []
-        
-        # 높은 리스크 영역 식별 (점수 7 이상)
         for aspect in self.ethical_aspects:
             if aspect in initial_assessment.get("risk_areas", {}) and \
                initial_assessment["risk_areas"][aspect].get("score", 0) >= 7:
                 high_risk_aspects.append(aspect)
+        return high_risk_aspects
+    
+    def _analysis_tasks(self, context: tuple, initial_assessment: Dict[str, Any], high_risk_aspects: List[str],
+                        guideline_evidence: Dict[str, Any], asynchronous: bool = False) -> Dict[str, Any]:
+        """
+        심층 분석과 가이드라인 준수 평가 작업 그래프 구성
+        (모두 초기 평가에만 의존하므로 서로 기다리지 않음)
+        """
+        service_name, service_analysis, domain_info, _ = context
+        check = self.acheck_compliance if asynchronous else self.check_compliance
+        
+        tasks = {
+            f"deep_dive:{aspect}": (self._deep_dive_task(
+                service_name, aspect, service_analysis, domain_info, initial_assessment,
+                guideline_evidence["aspects"].get(aspect), asynchronous
+            ), [])
+            for aspect in high_risk_aspects
+        }
+        tasks["compliance"] = (lambda results: check(
+            service_name, service_analysis, initial_assessment, guideline_evidence["regulations"]
+        ), [])
         
-        # 높은 리스크 영역에 대한 심층 분석
         if high_risk_aspects:
             print("\n🔍 높은 리스크가 식별된 영역에 대한 심층 분석 중...")
-            
             for aspect in high_risk_aspects:
                 print(f"- {aspect.capitalize()} 심층 분석...")
-                deep_dive_result = self.deep_dive_analysis(
-                    service_name, aspect, service_analysis, domain_info, initial_assessment
-                )
-                deep_dive_results.append(deep_dive_result)
-        
-        # 3. 가이드라인 준수 여부 확인
         print("\n📋 주요 AI 윤리 가이드라인 준수 여부 평가 중...")
-        compliance_status = self.check_compliance(service_name, service_analysis, initial_assessment)
-        
-        # 4. 최종 평가 보고서 생성
-        print("\n📝 최종 윤리 리스크 평가 보고서 생성 중...")
-        final_assessment = self.generate_final_assessment(
-            service_name, service_analysis, initial_assessment,
-            deep_dive_results, domain_info, domain_focus
-        )
-        
+        return tasks
+    
+    def _finish_assessment(self, state: Dict[str, Any], final_assessment: Dict[str, Any],
+                           compliance_status: Dict[str, Any], deep_dive_results: List[Dict[str, Any]],
+                           guideline_evidence: Dict[str, Any]) -> Dict[str, Any]:
+        """최종 평가 결과를 정리하여 상태에 저장"""
         # 종합 리스크 점수 계산 (이미 계산되어 있지 않은 경우)
         if "overall_risk_score" not in final_assessment or not final_assessment["overall_risk_score"]:
             scores = [final_assessment.get("risk_areas", {}).get(aspect, {}).get("score", 0) 
@@ -436,7 +684,8 @@ class RiskAssessor:
             "risk_areas": final_assessment.get("risk_areas", {}),
             "compliance_status": compliance_status,
             "overall_risk_score": final_assessment.get("overall_risk_score", 0),
-            "deep_dive_analyses": deep_dive_results
+            "deep_dive_analyses": deep_dive_results,
+            "guideline_evidence": self._evidence_references(guideline_evidence)
         }
         
         # 평가 결과 로그
@@ -1,8 +1,12 @@
 #서비스 분석 에이전트
 #service_analyzer.py
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
-from tools.web_search import WebSearchTool
+from typing import Dict, Any, Optional
+from tools.llm_cache import with_cache
+from tools.llm_trace import traced, llm_template
+from tools.llm_client_pool import create_chat_llm
+from tools.structured_output import StructuredOutput
+from tools.web_search import create_search_tool
+import asyncio
 import json
 
 # 프롬프트 파일에서 상수 임포트
@@ -15,10 +19,23 @@ from prompts.service_analysis import (
 class ServiceAnalyzer:
     """AI 서비스의 기본 정보를 수집하고 분석하는 에이전트"""
 
-    def __init__(self, model_name="gpt-4o-mini"):
-        # LLM 모델 초기화
-        self.llm = ChatOpenAI(model=model_name, temperature=0.2)
-        self.web_search = WebSearchTool()  # 웹 검색 도구 추가
+    # 최종 서비스 분석 응답 구조 (이후 에이전트가 사용하는 항목)
+    ANALYSIS_SCHEMA = {
+        "service_provider": str,
+        "target_functionality": list,
+        "data_types": list,
+        "decision_processes": list,
+        "technical_architecture": (str, dict),
+        "user_groups": list,
+        "deployment_context": str
+    }
+
+    def __init__(self, model_name="gpt-4o-mini", llm_cache=None, client_pool=None, search_backend=None):
+        # LLM 모델 초기화 (llm_cache가 있으면 같은 프롬프트의 응답을 재사용, 호출마다 토큰·지연 시간 추적)
+        self.llm = traced(with_cache(create_chat_llm(model_name, 0.2, client_pool), llm_cache))
+        self.web_search = create_search_tool(search_backend)  # 웹 검색 도구 추가 ("local"이면 네트워크 없는 고정 결과)
+        # 최종 분석은 JSON 모드로 요청하고, 잘못된 항목만 다시 요청
+        self.analysis_output = StructuredOutput(self.ANALYSIS_SCHEMA)
     
     def auto_analyze_service (self, service_name: str, domain_info: str, domain_focus: str) -> Dict[str, Any]:
         """웹 검색 결과를 활용한 서비스 분석"""
@@ -27,8 +44,45 @@ class ServiceAnalyzer:
         print(f"🔎 '{service_name}'에 대한 정보 검색 중...")
         search_results = self.web_search.search_service_info(service_name, domain_info)
         
-        # 검색 결과를 포함한 프롬프트 작성
-        prompt = f"""
+        # 검색 결과를 활용한 분석 수행
+        with llm_template("inline:initial_analysis"):
+            response = self.llm.invoke(
+                self._initial_analysis_prompt(service_name, domain_info, domain_focus, search_results)
+            )
+        
+        # 최종 분석 수행 (검색 결과와 초기 분석 포함)
+        with llm_template("FINAL_ANALYSIS_PROMPT"):
+            analysis, _ = self.analysis_output.invoke(
+                self.llm,
+                self._final_analysis_prompt(service_name, domain_info, domain_focus, search_results, response.content)
+            )
+        
+        return self._parse_analysis(service_name, analysis)
+    
+    async def aauto_analyze_service(self, service_name: str, domain_info: str, domain_focus: str) -> Dict[str, Any]:
+        """auto_analyze_service의 비동기 버전"""
+        print(f"🔎 '{service_name}'에 대한 정보 검색 중...")
+        # 웹 검색 도구는 동기 HTTP 요청이므로 이벤트 루프를 막지 않도록 기본 스레드 풀에서 실행
+        search_results = await asyncio.to_thread(
+            self.web_search.search_service_info, service_name, domain_info
+        )
+        
+        with llm_template("inline:initial_analysis"):
+            response = await self.llm.ainvoke(
+                self._initial_analysis_prompt(service_name, domain_info, domain_focus, search_results)
+            )
+        with llm_template("FINAL_ANALYSIS_PROMPT"):
+            analysis, _ = await self.analysis_output.ainvoke(
+                self.llm,
+                self._final_analysis_prompt(service_name, domain_info, domain_focus, search_results, response.content)
+            )
+        
+        return self._parse_analysis(service_name, analysis)
+    
+    def _initial_analysis_prompt(self, service_name: str, domain_info: str, domain_focus: str,
+                                 search_results: str) -> str:
+        """검색 결과를 포함한 초기 분석 프롬프트 작성"""
+        return f"""
         다음은 {service_name}에 관한 검색 결과입니다:
         
         {search_results}
@@ -37,41 +91,27 @@ class ServiceAnalyzer:
         서비스 제공업체, 주요 기능, 사용 데이터, 의사결정 과정 등에 대한 정보를 JSON 형식으로 제공해주세요.
         특히 {domain_focus} 측면에 주목해주세요.
         """
-        
-        # 검색 결과를 활용한 분석 수행
-        response = self.llm.invoke(prompt)
-        
-        # 정보 수집 (검색 결과 포함)
+    
+    def _final_analysis_prompt(self, service_name: str, domain_info: str, domain_focus: str,
+                               search_results: str, initial_analysis: str) -> str:
+        """수집된 정보(검색 결과 + 초기 분석)로 최종 분석 프롬프트 작성"""
         collected_info = {
             "web_search_results": search_results,
-            "initial_analysis": response.content
+            "initial_analysis": initial_analysis
         }
-        
-        # 최종 분석 수행
-        final_response = self.llm.invoke(
-            FINAL_ANALYSIS_PROMPT.format(
-                service_name=service_name,
-                collected_info=json.dumps(collected_info, ensure_ascii=False),
-                domain_info=domain_info,
-                domain_focus=domain_focus
-            )
+        return FINAL_ANALYSIS_PROMPT.format(
+            service_name=service_name,
+            collected_info=json.dumps(collected_info, ensure_ascii=False),
+            domain_info=domain_info,
+            domain_focus=domain_focus
         )
-        
-        # JSON 응답 추출
-        try:
-            content = final_response.content
-            start_idx = content.find("{")
-            end_idx = content.rfind("}") + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx]
-                result = json.loads(json_str)
-                result["service_name"] = service_name
-                return result
-            else:
-                return self._create_default_analysis(service_name)
-        except:
+    
+    def _parse_analysis(self, service_name: str, analysis: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """구조화된 최종 분석 정리 (복구 후에도 JSON이 없으면 기본 분석 정보)"""
+        if analysis is None:
             return self._create_default_analysis(service_name)
+        analysis["service_name"] = service_name
+        return analysis
     
     def _create_default_analysis(self, service_name: str) -> Dict[str, Any]:
         """기본 서비스 분석 정보 생성"""
@@ -101,4 +141,12 @@ class ServiceAnalyzer:
         state["service_analysis"] = analysis_result
         
         return state
-
+    
+    async def arun(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """run의 비동기 버전 (LangGraph ainvoke용 노드)"""
+        service_name = state.get("service_name", "")
+        domain_info = state.get("domain_info", "일반")
+        domain_focus = state.get("domain_focus", "모든 측면")
+        
+        state["service_analysis"] = await self.aauto_analyze_service(service_name, domain_info, domain_focus)
+        return state
@@ -9,9 +9,23 @@ from agents.risk_assessor import RiskAssessor
 from agents.recommender import Recommender
 from agents.report_generator import ReportGenerator
 from tools.domain_adapter import DomainAdapter
+from tools.guideline_rag import GuidelineRAG
+from tools.llm_cache import LLMResponseCache
+from tools.llm_client_pool import LLMClientPool
+from tools.embedding_service import LOCAL_EMBEDDINGS_MODEL
+from tools.checkpoint_store import SQLiteCheckpointSaver
+from tools.llm_trace import RunTrace, run_trace, traced_node, trace_path_for
 from dotenv import load_dotenv
+import argparse
+import datetime
+import asyncio
+import uuid
+import os
 load_dotenv()
 
+# 오프라인 백엔드용 가이드라인 인덱스 위치 (로컬 임베딩 인덱스가 OpenAI 임베딩으로 만든 기본 인덱스를 덮어쓰지 않도록 분리)
+OFFLINE_GUIDELINE_INDEX_DIR = "data/guideline_index/local-hash"
+
 # 상태 타입 정의
 class StateType(TypedDict):
     service_name: str
@@ -22,45 +36,79 @@ class StateType(TypedDict):
     recommendations: Dict[str, Any]
     report_generation: Dict[str, Any]
     feedback_required: Optional[bool]
+    domain_specific: Dict[str, Any]
+    domain_guidelines: List[str]
 
-def main():
-    """
-    AI 윤리성 리스크 진단 시스템의 메인 함수
+def create_agents(llm_cache: Optional[LLMResponseCache] = None,
+                  client_pool: Optional[LLMClientPool] = None,
+                  search_backend: Optional[str] = None,
+                  guideline_index_dir: Optional[str] = None,
+                  report_dir: str = "outputs/reports") -> Dict[str, Any]:
     """
-    print("=== AI 윤리성 리스크 진단 시스템 ===")
-    
-    # 사용자 입력 받기
-    service_name = input("분석할 AI 서비스 이름을 입력하세요: ")
-    domain_info = input("해당 서비스의 도메인 정보를 입력하세요 (예: '의료', '금융', '교육' 등): ")
-    domain_focus = input("해당 도메인에서 중점적으로 봐야 할 윤리적 측면이 있다면 알려주세요\n ('편향성','프라이버시','투명성','책임성'): ")
+    에이전트 초기화 (여러 진단을 실행할 때 LLM 클라이언트와 가이드라인 인덱스를 공유할 수 있도록 분리)
     
-    # 초기 상태 설정
-    initial_state = {
-        "service_name": service_name,
-        "domain_info": domain_info,
-        "domain_focus": domain_focus,
-        "service_analysis": {},
-        "risk_assessment": {},
-        "recommendations": {},
-        "report_generation": {}
+    Args:
+        llm_cache: 모든 에이전트가 공유할 LLM 응답 캐시 (없으면 캐시 없이 매번 호출)
+        client_pool: 모든 에이전트가 공유할 LLM 클라이언트 풀 (없으면 새 풀 하나를 만들어 공유)
+        search_backend: 서비스 정보 검색 백엔드 ("web" 또는 "local", 없으면 SEARCH_BACKEND 환경 변수)
+        guideline_index_dir: 가이드라인 인덱스 디렉토리 (없으면 기본 위치, 오프라인 백엔드는 OFFLINE_GUIDELINE_INDEX_DIR)
+        report_dir: 보고서 저장 디렉토리
+        
+    Returns:
+        노드 이름 → 에이전트
+    """
+    # 모든 에이전트가 하나의 keep-alive 연결 풀을 사용 (온도는 에이전트별로 유지)
+    client_pool = client_pool or LLMClientPool()
+    # 오프라인 백엔드의 고정/재생 응답이 실제 응답 캐시에 섞이지 않도록 캐시를 사용하지 않음
+    if client_pool.offline and llm_cache is not None:
+        print(f"ℹ️ 오프라인 LLM 백엔드({client_pool.backend})에서는 응답 캐시를 사용하지 않습니다")
+        llm_cache = None
+    # 가이드라인 인덱스는 한 번 로드하여 리스크 평가의 근거 검색에 사용
+    # (오프라인 백엔드에서는 네트워크 없이 동작하는 로컬 임베딩과 별도 인덱스 디렉토리 사용)
+    if client_pool.offline:
+        guideline_rag = GuidelineRAG(client_pool=client_pool, embeddings_model=LOCAL_EMBEDDINGS_MODEL,
+                                     index_dir=guideline_index_dir or OFFLINE_GUIDELINE_INDEX_DIR)
+    elif guideline_index_dir:
+        guideline_rag = GuidelineRAG(client_pool=client_pool, index_dir=guideline_index_dir)
+    else:
+        guideline_rag = GuidelineRAG(client_pool=client_pool)
+    return {
+        "service_analyzer": ServiceAnalyzer(llm_cache=llm_cache, client_pool=client_pool,
+                                            search_backend=search_backend),
+        "domain_adapter": DomainAdapter(llm_cache=llm_cache, client_pool=client_pool),
+        "risk_assessor": RiskAssessor(guideline_rag=guideline_rag, llm_cache=llm_cache, client_pool=client_pool),
+        "recommender": Recommender(llm_cache=llm_cache, client_pool=client_pool),
+        "report_generator": ReportGenerator(llm_cache=llm_cache, client_pool=client_pool, output_dir=report_dir)
     }
+
+def build_workflow(agents: Dict[str, Any], use_async: bool = False, checkpointer=None):
+    """
+    에이전트 그래프 구성 및 컴파일
     
-    # 에이전트 초기화
-    service_analyzer = ServiceAnalyzer()
-    domain_adapter = DomainAdapter()
-    risk_assessor = RiskAssessor()
-    recommender = Recommender()
-    report_generator = ReportGenerator()
-    
+    Args:
+        agents: create_agents()로 만든 에이전트
+        use_async: True이면 비동기 노드(arun, aadapt, ...)로 구성 (ainvoke로 실행)
+        checkpointer: 노드가 끝날 때마다 상태를 저장할 체크포인터 (있으면 run_id로 중단된 진단 재개 가능)
+        
+    Returns:
+        컴파일된 워크플로우
+    """
     # 에이전트 그래프 구성 - TypedDict 사용
     graph = StateGraph(StateType)
     
-    # 노드 추가
-    graph.add_node("service_analyzer", service_analyzer.run)
-    graph.add_node("domain_adapter", domain_adapter.adapt)
-    graph.add_node("risk_assessor", risk_assessor.assess)
-    graph.add_node("recommender", recommender.recommend)
-    graph.add_node("report_generator", report_generator.generate)
+    # 노드 추가 (노드별 LLM 호출과 실행 시간을 추적)
+    if use_async:
+        graph.add_node("service_analyzer", traced_node("service_analyzer", agents["service_analyzer"].arun))
+        graph.add_node("domain_adapter", traced_node("domain_adapter", agents["domain_adapter"].aadapt))
+        graph.add_node("risk_assessor", traced_node("risk_assessor", agents["risk_assessor"].aassess))
+        graph.add_node("recommender", traced_node("recommender", agents["recommender"].arecommend))
+        graph.add_node("report_generator", traced_node("report_generator", agents["report_generator"].agenerate))
+    else:
+        graph.add_node("service_analyzer", traced_node("service_analyzer", agents["service_analyzer"].run))
+        graph.add_node("domain_adapter", traced_node("domain_adapter", agents["domain_adapter"].adapt))
+        graph.add_node("risk_assessor", traced_node("risk_assessor", agents["risk_assessor"].assess))
+        graph.add_node("recommender", traced_node("recommender", agents["recommender"].recommend))
+        graph.add_node("report_generator", traced_node("report_generator", agents["report_generator"].generate))
     
     # 시작점 설정 (entry point)
     graph.set_entry_point("service_analyzer")
@@ -77,11 +125,146 @@ def main():
     lambda x: "service_analyzer" if x.get("feedback_required") else "recommender")
     
     # 그래프 컴파일
-    workflow = graph.compile()
+    return graph.compile(checkpointer=checkpointer)
+
+def create_initial_state(service_name: str, domain_info: str, domain_focus: str) -> Dict[str, Any]:
+    """진단 시작 상태 생성"""
+    return {
+        "service_name": service_name,
+        "domain_info": domain_info,
+        "domain_focus": domain_focus,
+        "service_analysis": {},
+        "risk_assessment": {},
+        "recommendations": {},
+        "report_generation": {}
+    }
+
+def new_run_id() -> str:
+    """진단 실행 ID 생성 (체크포인트의 thread_id로 사용)"""
+    return f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+def save_run_trace(trace: RunTrace, state: Optional[Dict[str, Any]],
+                   report_dir: str = "outputs/reports") -> str:
+    """
+    실행 추적을 보고서 옆에 JSON으로 저장하고 노드별·템플릿별 요약 표 출력
+    (보고서가 없으면 <report_dir>/trace_<실행 ID>.json)
+    
+    Args:
+        report_dir: 보고서 없이 끝난 실행의 추적을 저장할 디렉토리 (보고서 생성기의 output_dir와 같게 지정)
+        
+    Returns:
+        추적 파일 경로
+    """
+    report_filepath = ((state or {}).get("report_generation") or {}).get("report_filepath")
+    if report_filepath:
+        trace_path = trace_path_for(report_filepath)
+    else:
+        trace_path = os.path.join(report_dir, f"trace_{trace.run_id}.json")
+    trace.save(trace_path)
+    print(f"\n📈 '{trace.service_name}' LLM 호출 요약\n{trace.format_table()}")
+    print(f"🧾 호출 추적 파일: {trace_path}")
+    return trace_path
+
+def create_default_workflow():
+    """응답 캐시와 체크포인트 저장소를 사용하는 기본 비동기 워크플로우 생성"""
+    return build_workflow(create_agents(LLMResponseCache()), use_async=True, checkpointer=SQLiteCheckpointSaver())
+
+async def arun_diagnosis(service_name: str, domain_info: str, domain_focus: str,
+                         workflow=None, run_id: Optional[str] = None,
+                         report_dir: str = "outputs/reports") -> Dict[str, Any]:
+    """
+    하나의 이벤트 루프에서 진단 실행 (LLM 호출 대기 중에는 스레드를 점유하지 않음)
+    여러 진단을 asyncio.gather로 동시에 실행할 때는 비동기 워크플로우 하나를 만들어 공유
+    
+    Args:
+        workflow: build_workflow(..., use_async=True)로 만든 워크플로우 (없으면 새로 생성)
+        run_id: 체크포인트에 사용할 실행 ID (없으면 새로 생성, 체크포인터가 없는 워크플로우에서는 무시)
+        report_dir: 워크플로우의 보고서 저장 디렉토리 (보고서 없이 실패한 진단의 추적도 여기에 저장)
+        
+    Returns:
+        최종 상태
+    """
+    if workflow is None:
+        workflow = create_default_workflow()
+    run_id = run_id or new_run_id()
     
-    # 실행
     print(f"\n'{service_name}' 서비스에 대한 분석을 시작합니다...")
-    result = workflow.invoke(initial_state)
+    if workflow.checkpointer is not None:
+        print(f"🔖 실행 ID: {run_id} (중단되면 'python app.py --resume {run_id}'로 이어서 진행)")
+    # 실패한 진단도 어느 호출까지 진행되었는지 남도록 추적은 항상 저장
+    state = None
+    try:
+        with run_trace(run_id, service_name) as trace:
+            state = await workflow.ainvoke(
+                create_initial_state(service_name, domain_info, domain_focus),
+                {"configurable": {"thread_id": run_id}}
+            )
+    finally:
+        save_run_trace(trace, state, report_dir)
+    return state
+
+async def aresume_diagnosis(run_id: str, workflow=None, report_dir: str = "outputs/reports") -> Dict[str, Any]:
+    """
+    실패하거나 중단된 진단을 마지막으로 완료된 노드 다음부터 재개
+    (완료된 노드의 웹 검색·LLM 호출은 다시 실행하지 않음)
+    
+    Args:
+        run_id: 재개할 실행 ID
+        workflow: 체크포인터를 가진 비동기 워크플로우 (없으면 기본 저장소로 새로 생성)
+        report_dir: 워크플로우의 보고서 저장 디렉토리 (보고서 없이 실패한 진단의 추적도 여기에 저장)
+        
+    Returns:
+        최종 상태
+    """
+    if workflow is None:
+        workflow = create_default_workflow()
+    config = {"configurable": {"thread_id": run_id}}
+    
+    snapshot = await workflow.aget_state(config)
+    if not snapshot.values:
+        raise ValueError(f"저장된 진단을 찾을 수 없습니다: {run_id}")
+    if not snapshot.next:
+        print(f"✅ '{snapshot.values.get('service_name')}' 진단({run_id})은 이미 완료되었습니다.")
+        return snapshot.values
+    
+    print(f"\n'{snapshot.values.get('service_name')}' 진단({run_id})을 '{', '.join(snapshot.next)}' 단계부터 재개합니다...")
+    # 재개한 실행의 추적에는 재개 이후 노드의 호출만 기록
+    state = None
+    try:
+        with run_trace(run_id, snapshot.values.get("service_name")) as trace:
+            state = await workflow.ainvoke(None, config)
+    finally:
+        save_run_trace(trace, state, report_dir)
+    return state
+
+def main():
+    """
+    AI 윤리성 리스크 진단 시스템의 메인 함수
+    """
+    parser = argparse.ArgumentParser(description="AI 윤리성 리스크 진단 시스템")
+    parser.add_argument("--resume", metavar="RUN_ID", help="실패하거나 중단된 진단을 이어서 진행")
+    parser.add_argument("--list-runs", action="store_true", help="저장된 진단 실행 목록 표시")
+    args = parser.parse_args()
+    
+    print("=== AI 윤리성 리스크 진단 시스템 ===")
+    
+    if args.list_runs:
+        for run in SQLiteCheckpointSaver().list_runs():
+            print(f"- {run['run_id']} (체크포인트 {run['checkpoints']}개)")
+        return None
+    
+    if args.resume:
+        result = asyncio.run(aresume_diagnosis(args.resume))
+        print("\n분석이 완료되었습니다. 결과 보고서는 outputs/reports/ 디렉토리에 저장되었습니다.")
+        return result
+    
+    # 사용자 입력 받기
+    service_name = input("분석할 AI 서비스 이름을 입력하세요: ")
+    domain_info = input("해당 서비스의 도메인 정보를 입력하세요 (예: '의료', '금융', '교육' 등): ")
+    domain_focus = input("해당 도메인에서 중점적으로 봐야 할 윤리적 측면이 있다면 알려주세요\n ('편향성','프라이버시','투명성','책임성'): ")
+    
+    # 실행
+    result = asyncio.run(arun_diagnosis(service_name, domain_info, domain_focus))
     
     print("\n분석이 완료되었습니다. 결과 보고서는 outputs/reports/ 디렉토리에 저장되었습니다.")
     return result
@@ -0,0 +1,234 @@
+#여러 AI 서비스 일괄 진단 실행 파일
+# 실행: python batch_diagnosis.py services.csv --max-runs 4 --max-llm-concurrency 8 --requests-per-minute 300
+from typing import Dict, List, Any, Optional
+from app import create_agents, build_workflow, arun_diagnosis, new_run_id
+from tools.checkpoint_store import SQLiteCheckpointSaver
+from tools.llm_limiter import LLMRateLimiter
+from tools.llm_client_pool import LLMClientPool, LLM_BACKENDS
+from tools.web_search import SEARCH_BACKENDS
+from tools.llm_cache import LLMResponseCache
+from tools.llm_trace import trace_path_for
+import argparse
+import datetime
+import asyncio
+import json
+import time
+import csv
+import os
+
+# 입력 파일의 필드 (domain_focus는 생략 가능)
+INPUT_FIELDS = ("service_name", "domain_info", "domain_focus")
+ETHICAL_ASPECTS = ("bias", "privacy", "transparency", "accountability")
+
+def load_services(path: str) -> List[Dict[str, str]]:
+    """
+    진단할 서비스 목록 로드 (CSV 또는 JSONL)
+
+    Args:
+        path: service_name, domain_info, domain_focus 열(키)을 가진 CSV/JSONL 파일
+
+    Returns:
+        서비스 목록
+    """
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+
+    services = []
+    for line_number, row in enumerate(rows, 1):
+        service_name = (row.get("service_name") or "").strip()
+        if not service_name:
+            print(f"⚠️ {line_number}번째 항목에 service_name이 없어 건너뜁니다.")
+            continue
+        services.append({
+            "service_name": service_name,
+            "domain_info": (row.get("domain_info") or "일반").strip(),
+            "domain_focus": (row.get("domain_focus") or "모든 측면").strip()
+        })
+    return services
+
+def summarize_result(service: Dict[str, str], state: Optional[Dict[str, Any]],
+                     elapsed: float, error: Optional[Exception] = None,
+                     run_id: Optional[str] = None) -> Dict[str, Any]:
+    """진단 한 건의 결과를 요약 색인 항목으로 변환"""
+    summary = {**service, "status": "failed" if error else "completed", "elapsed_seconds": round(elapsed, 1)}
+    if run_id:
+        summary["run_id"] = run_id
+    if error is not None:
+        summary["error"] = f"{type(error).__name__}: {error}"
+        return summary
+
+    risk_assessment = state.get("risk_assessment", {})
+    report_generation = state.get("report_generation", {})
+    risk_areas = risk_assessment.get("risk_areas", {})
+    summary.update({
+        "overall_risk_score": risk_assessment.get("overall_risk_score"),
+        "risk_scores": {aspect: risk_areas.get(aspect, {}).get("score") for aspect in ETHICAL_ASPECTS},
+        "report_filepath": report_generation.get("report_filepath"),
+        "pdf_filepath": report_generation.get("pdf_filepath"),
+        "trace_filepath": trace_path_for(report_generation["report_filepath"])
+        if report_generation.get("report_filepath") else None
+    })
+    if not summary["report_filepath"]:
+        summary["status"] = "incomplete"
+    return summary
+
+async def arun_batch(services: List[Dict[str, str]], max_runs: int = 4, max_llm_concurrency: int = 8,
+                     requests_per_minute: Optional[float] = None,
+                     tokens_per_minute: Optional[float] = None,
+                     llm_cache: Optional[LLMResponseCache] = None,
+                     checkpointer: Optional[SQLiteCheckpointSaver] = None,
+                     llm_backend: Optional[str] = None, fake_latency: Optional[float] = None,
+                     search_backend: Optional[str] = None,
+                     report_dir: str = "outputs/reports") -> List[Dict[str, Any]]:
+    """
+    여러 서비스를 하나의 이벤트 루프에서 동시에 진단
+    (에이전트·가이드라인 인덱스·도메인 어댑터는 한 번만 만들어 모든 진단이 공유하고,
+     전체 처리량은 진단 수가 아니라 공유 LLM 요청 제한으로 조절)
+
+    Args:
+        services: 진단할 서비스 목록
+        max_runs: 동시에 진행할 최대 진단 수 (상태/보고서 메모리 사용량 제한)
+        max_llm_concurrency: 모든 진단을 합친 최대 동시 LLM 요청 수
+        requests_per_minute: 모든 진단을 합친 분당 LLM 요청 수 제한 (없으면 제한 없음)
+        tokens_per_minute: 모든 진단을 합친 분당 LLM 토큰 수 제한 (없으면 제한 없음)
+        llm_cache: 모든 진단이 공유할 LLM 응답 캐시 (캐시 적중은 요청 제한에 포함되지 않음)
+        checkpointer: 서비스별 진행 상태를 저장할 체크포인터 (실패한 진단은 run_id로 재개 가능)
+        llm_backend: LLM 백엔드 ("openai", "record", "replay", "fake", 없으면 LLM_BACKEND 환경 변수)
+        fake_latency: 오프라인 백엔드의 호출당 지연 시간(초)
+        search_backend: 서비스 정보 검색 백엔드 ("web" 또는 "local")
+        report_dir: 서비스별 보고서와 호출 추적을 저장할 디렉토리
+
+    Returns:
+        입력 순서대로 정렬된 진단 결과 요약 목록
+    """
+    # 모든 진단이 하나의 HTTP 연결 풀과 전역 요청/토큰 제한을 공유
+    client_pool = LLMClientPool(
+        LLMRateLimiter(max_llm_concurrency, requests_per_minute, tokens_per_minute),
+        backend=llm_backend, fake_latency=fake_latency
+    )
+    agents = create_agents(llm_cache, client_pool, search_backend, report_dir=report_dir)
+    workflow = build_workflow(agents, use_async=True, checkpointer=checkpointer)
+    run_slots = asyncio.Semaphore(max(1, max_runs))
+
+    async def diagnose(index: int, service: Dict[str, str]) -> Dict[str, Any]:
+        async with run_slots:
+            print(f"\n🚀 [{index}/{len(services)}] '{service['service_name']}' 진단 시작")
+            started_at = time.perf_counter()
+            run_id = new_run_id() if checkpointer is not None else None
+            try:
+                state = await arun_diagnosis(
+                    service["service_name"], service["domain_info"], service["domain_focus"], workflow, run_id,
+                    report_dir
+                )
+            except Exception as e:
+                # 한 서비스의 실패가 다른 진단을 중단하지 않도록 결과에 기록
+                print(f"❌ [{index}/{len(services)}] '{service['service_name']}' 진단 실패: {str(e)}")
+                return summarize_result(service, None, time.perf_counter() - started_at, e, run_id)
+            print(f"🏁 [{index}/{len(services)}] '{service['service_name']}' 진단 완료")
+            return summarize_result(service, state, time.perf_counter() - started_at, run_id=run_id)
+
+    try:
+        return list(await asyncio.gather(*[
+            diagnose(index, service) for index, service in enumerate(services, 1)
+        ]))
+    finally:
+        await client_pool.aclose()
+
+def write_batch_index(results: List[Dict[str, Any]], elapsed: float,
+                      output_dir: str = "outputs/reports") -> Dict[str, str]:
+    """
+    일괄 진단 요약 색인 저장 (JSON + 마크다운 표)
+
+    Returns:
+        {"json": JSON 경로, "markdown": 마크다운 경로}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_path = os.path.join(output_dir, f"batch_index_{timestamp}.json")
+    md_path = os.path.join(output_dir, f"batch_index_{timestamp}.md")
+
+    completed = [r for r in results if r["status"] == "completed"]
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "total": len(results),
+            "completed": len(completed),
+            "elapsed_seconds": round(elapsed, 1),
+            "results": results
+        }, f, ensure_ascii=False, indent=2)
+
+    def cell(value) -> str:
+        return "-" if value is None else str(value).replace("|", "\\|")
+
+    lines = [
+        "# AI 서비스 일괄 윤리 리스크 진단 요약",
+        "",
+        f"- 생성일: {datetime.datetime.now().strftime('%Y년 %m월 %d일 %H:%M')}",
+        f"- 진단 완료: {len(completed)}/{len(results)}건 (총 소요 시간 {elapsed:.1f}초)",
+        "",
+        "| 서비스 | 도메인 | 중점 요소 | 종합 점수 | 편향성 | 프라이버시 | 투명성 | 책임성 | 상태 | 보고서 |",
+        "|---|---|---|---|---|---|---|---|---|---|"
+    ]
+    # 종합 리스크 점수가 높은 서비스부터 표시
+    ordered = sorted(results, key=lambda r: -(r.get("overall_risk_score") or 0))
+    for result in ordered:
+        scores = result.get("risk_scores", {})
+        report = result.get("report_filepath")
+        report_link = f"[{os.path.basename(report)}]({os.path.relpath(report, output_dir)})" if report else \
+            cell(result.get("error"))
+        lines.append("| " + " | ".join([
+            cell(result["service_name"]), cell(result["domain_info"]), cell(result["domain_focus"]),
+            cell(result.get("overall_risk_score")),
+            *[cell(scores.get(aspect)) for aspect in ETHICAL_ASPECTS],
+            result["status"], report_link
+        ]) + " |")
+
+    with open(md_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return {"json": json_path, "markdown": md_path}
+
+def main():
+    parser = argparse.ArgumentParser(description="여러 AI 서비스 일괄 윤리 리스크 진단")
+    parser.add_argument("input", help="service_name, domain_info, domain_focus 열을 가진 CSV 또는 JSONL 파일")
+    parser.add_argument("--max-runs", type=int, default=4, help="동시에 진행할 최대 진단 수")
+    parser.add_argument("--max-llm-concurrency", type=int, default=8, help="전체 최대 동시 LLM 요청 수")
+    parser.add_argument("--requests-per-minute", type=float, default=None, help="전체 분당 LLM 요청 수 제한")
+    parser.add_argument("--tokens-per-minute", type=float, default=None, help="전체 분당 LLM 토큰 수 제한")
+    parser.add_argument("--output-dir", default="outputs/reports", help="보고서, 호출 추적, 요약 색인을 저장할 디렉토리")
+    parser.add_argument("--cache-path", default="data/llm_cache/responses.sqlite", help="LLM 응답 캐시 파일")
+    parser.add_argument("--cache-ttl-hours", type=float, default=24 * 7, help="캐시된 응답 보관 시간")
+    parser.add_argument("--no-cache", action="store_true", help="LLM 응답 캐시를 사용하지 않음")
+    parser.add_argument("--no-checkpoint", action="store_true", help="진단 진행 상태를 저장하지 않음")
+    parser.add_argument("--llm-backend", choices=LLM_BACKENDS, default=None,
+                        help="LLM 백엔드 (fake/replay는 네트워크 없이 실행, 기본값: LLM_BACKEND 환경 변수 또는 openai)")
+    parser.add_argument("--fake-latency", type=float, default=None, help="오프라인 LLM 백엔드의 호출당 지연 시간(초)")
+    parser.add_argument("--search-backend", choices=SEARCH_BACKENDS, default=None,
+                        help="서비스 정보 검색 백엔드 (local은 로컬 고정 데이터 사용)")
+    args = parser.parse_args()
+
+    services = load_services(args.input)
+    print(f"=== AI 윤리성 리스크 일괄 진단: 서비스 {len(services)}개 ===")
+
+    started_at = time.perf_counter()
+    llm_cache = None if args.no_cache else LLMResponseCache(args.cache_path, args.cache_ttl_hours * 3600)
+    checkpointer = None if args.no_checkpoint else SQLiteCheckpointSaver()
+    results = asyncio.run(arun_batch(
+        services, args.max_runs, args.max_llm_concurrency, args.requests_per_minute, args.tokens_per_minute,
+        llm_cache, checkpointer, args.llm_backend, args.fake_latency, args.search_backend,
+        report_dir=args.output_dir
+    ))
+    paths = write_batch_index(results, time.perf_counter() - started_at, args.output_dir)
+
+    completed = sum(1 for r in results if r["status"] == "completed")
+    print(f"\n✅ 일괄 진단 완료: {completed}/{len(results)}건")
+    print(f"📑 요약 색인: {paths['markdown']}")
+    if llm_cache is not None:
+        print(f"🗃️ LLM 응답 캐시: 적중 {llm_cache.hits}회 / 미적중 {llm_cache.misses}회")
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#FAISS 인덱스 유형별 재현율/지연시간 벤치마크
+# 실행: python -m benchmarks.ann_benchmark --corpus synthetic --sizes 20000 200000
+from typing import Dict, List, Any
+from tools.guideline_index import INDEX_TYPES, build_faiss_index, resolve_index_type
+import numpy as np
+import argparse
+import tempfile
+import json
+import time
+import os
+
+def load_guideline_vectors(embeddings_model: str = "local-hash") -> np.ndarray:
+    """
+    가이드라인 청크 벡터 로드
+    (임시 디렉토리에 flat 인덱스를 새로 생성하여 저장된 가이드라인 인덱스를 덮어쓰거나 변환하지 않음)
+    """
+    from tools.guideline_rag import GuidelineRAG
+    from tools.llm_client_pool import LLMClientPool
+    with tempfile.TemporaryDirectory() as index_dir:
+        rag = GuidelineRAG(embeddings_model=embeddings_model, index_type="flat", index_dir=index_dir,
+                           persist_search_cache=False, client_pool=LLMClientPool(backend="fake"))
+        return rag.vector_store.index.reconstruct_n(0, rag.vector_store.index.ntotal)
+
+def make_synthetic_vectors(count: int, dimension: int, seed: int = 0) -> np.ndarray:
+    """클러스터 구조를 가진 합성 벡터 생성 (실제 임베딩 분포와 유사하도록)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, count // 200), dimension)).astype(np.float32)
+    labels = rng.integers(0, len(centers), size=count)
+    vectors = centers[labels] + 0.3 * rng.normal(size=(count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def make_queries(vectors: np.ndarray, count: int, seed: int = 1) -> np.ndarray:
+    """코퍼스 벡터에 잡음을 더해 쿼리 생성"""
+    rng = np.random.default_rng(seed)
+    picks = vectors[rng.integers(0, len(vectors), size=count)]
+    queries = picks + 0.05 * rng.normal(size=picks.shape).astype(np.float32)
+    return np.ascontiguousarray(queries, dtype=np.float32)
+
+def benchmark_index(index_type: str, vectors: np.ndarray, queries: np.ndarray,
+                    ground_truth: np.ndarray, k: int) -> Dict[str, Any]:
+    """인덱스 하나를 생성(학습 포함)하고 재현율과 쿼리 지연시간 측정"""
+    start = time.perf_counter()
+    index = build_faiss_index(index_type, vectors)
+    build_seconds = time.perf_counter() - start
+
+    latencies = []
+    found = []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found.append(ids[0])
+
+    recall = np.mean([
+        len(set(result) & set(truth)) / k for result, truth in zip(found, ground_truth)
+    ])
+    return {
+        "index_type": index_type,
+        "build_seconds": round(build_seconds, 3),
+        f"recall@{k}": round(float(recall), 4),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 4),
+        "latency_ms_p99": round(float(np.percentile(latencies, 99)), 4)
+    }
+
+def run(corpus: str, sizes: List[int], dimension: int, k: int, query_count: int) -> List[Dict[str, Any]]:
+    """코퍼스 크기별로 flat 기준 대비 각 인덱스 유형 측정"""
+    results = []
+    base_vectors = load_guideline_vectors() if corpus == "guideline" else None
+
+    for size in sizes:
+        vectors = base_vectors if base_vectors is not None else make_synthetic_vectors(size, dimension)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        queries = make_queries(vectors, query_count)
+
+        # flat 인덱스 결과를 정답으로 사용
+        _, ground_truth = build_faiss_index("flat", vectors).search(queries, k)
+
+        print(f"\n📊 벡터 {len(vectors)}개 (차원 {vectors.shape[1]}), 자동 선택: "
+              f"{resolve_index_type('auto', len(vectors))}")
+        for index_type in INDEX_TYPES:
+            if resolve_index_type(index_type, len(vectors)) != index_type:
+                continue
+            result = benchmark_index(index_type, vectors, queries, ground_truth, k)
+            result["vector_count"] = len(vectors)
+            results.append(result)
+            print(f"  {index_type:6s} | 생성 {result['build_seconds']:8.3f}s | "
+                  f"recall@{k} {result[f'recall@{k}']:.4f} | "
+                  f"p50 {result['latency_ms_p50']:.3f}ms | p99 {result['latency_ms_p99']:.3f}ms")
+
+        if base_vectors is not None:
+            break
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISS 인덱스 유형별 재현율/지연시간 벤치마크")
+    parser.add_argument("--corpus", choices=["guideline", "synthetic"], default="synthetic")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 50000])
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--output", default="benchmarks/results/ann_benchmark.json")
+    args = parser.parse_args()
+
+    results = run(args.corpus, args.sizes, args.dimension, args.k, args.queries)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"corpus": args.corpus, "k": args.k, "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#진단 파이프라인 종단 간 벤치마크 (오프라인 LLM/검색 백엔드, 동시 진단 수별 처리량·노드 시간·토큰·메모리)
+# 실행: python -m benchmarks.pipeline_benchmark --concurrency 1 4 16 --runs 16 --fake-latency 0.05
+from typing import Dict, List, Any, Optional
+from app import create_agents, build_workflow, create_initial_state, new_run_id
+from batch_diagnosis import load_services
+from tools.llm_client_pool import LLMClientPool, OFFLINE_BACKENDS
+from tools.llm_limiter import LLMRateLimiter
+from tools.llm_trace import run_trace
+import numpy as np
+import contextlib
+import subprocess
+import tracemalloc
+import tempfile
+import datetime
+import argparse
+import platform
+import asyncio
+import json
+import time
+import io
+import os
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_FIXTURES = "benchmarks/fixtures/services.jsonl"
+DEFAULT_OUTPUT = "benchmarks/results/pipeline_benchmark.json"
+
+def git_revision() -> Optional[str]:
+    """현재 커밋 (버전 간 결과 비교용, git이 없으면 None)"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def peak_rss_mb() -> Optional[float]:
+    """프로세스 최대 상주 메모리(MB, 프로세스 시작 이후 누적 최댓값)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, Linux는 KB 단위
+    return round(peak / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1)
+
+def percentile(values: List[float], q: float) -> float:
+    return round(float(np.percentile(values, q)), 3) if values else 0.0
+
+def summarize_level(concurrency: int, results: List[Dict[str, Any]], wall_seconds: float,
+                    peak_heap_mb: Optional[float]) -> Dict[str, Any]:
+    """
+    동시 진단 수 하나의 측정 결과 집계
+
+    Args:
+        concurrency: 동시 진단 수
+        results: 진단별 (상태, 소요 시간, 추적 요약) 목록
+        wall_seconds: 전체 진단이 끝날 때까지 걸린 시간
+        peak_heap_mb: tracemalloc으로 측정한 최대 Python 힙 사용량 (측정하지 않았으면 None)
+
+    Returns:
+        처리량, 진단 소요 시간 분포, 노드별 실행 시간·호출 수·토큰 수, 메모리
+    """
+    completed = [result for result in results if result["status"] == "completed"]
+    nodes: Dict[str, Dict[str, Any]] = {}
+    totals = {"calls": 0, "input_tokens": 0, "output_tokens": 0, "retries": 0}
+    for result in results:
+        summary = result["trace"]
+        for name in totals:
+            totals[name] += summary["totals"][name]
+        for node, group in summary["by_node"].items():
+            entry = nodes.setdefault(node, {"node_seconds": [], "calls": 0, "input_tokens": 0,
+                                            "output_tokens": 0, "llm_seconds": 0.0})
+            entry["node_seconds"].append(group.get("node_seconds", 0.0))
+            entry["calls"] += group["calls"]
+            entry["input_tokens"] += group["input_tokens"]
+            entry["output_tokens"] += group["output_tokens"]
+            entry["llm_seconds"] += group["llm_seconds"]
+
+    run_count = max(1, len(results))
+    by_node = {
+        node: {
+            "seconds_mean": round(sum(entry["node_seconds"]) / run_count, 3),
+            "seconds_p50": percentile(entry["node_seconds"], 50),
+            "seconds_p95": percentile(entry["node_seconds"], 95),
+            "calls_per_run": round(entry["calls"] / run_count, 2),
+            "input_tokens_per_run": round(entry["input_tokens"] / run_count, 1),
+            "output_tokens_per_run": round(entry["output_tokens"] / run_count, 1),
+            "llm_seconds_per_run": round(entry["llm_seconds"] / run_count, 3)
+        }
+        for node, entry in nodes.items()
+    }
+    run_seconds = [result["seconds"] for result in completed]
+    return {
+        "concurrency": concurrency,
+        "runs": len(results),
+        "completed": len(completed),
+        "failed": len(results) - len(completed),
+        "errors": sorted({result["error"] for result in results if result.get("error")}),
+        "wall_seconds": round(wall_seconds, 3),
+        "runs_per_minute": round(len(completed) / wall_seconds * 60, 2) if wall_seconds else 0.0,
+        "run_seconds_p50": percentile(run_seconds, 50),
+        "run_seconds_p95": percentile(run_seconds, 95),
+        "llm_calls_per_run": round(totals["calls"] / run_count, 2),
+        "input_tokens_per_run": round(totals["input_tokens"] / run_count, 1),
+        "output_tokens_per_run": round(totals["output_tokens"] / run_count, 1),
+        "retries": totals["retries"],
+        "peak_heap_mb": peak_heap_mb,
+        "peak_rss_mb": peak_rss_mb(),
+        "by_node": by_node
+    }
+
+async def arun_level(services: List[Dict[str, str]], concurrency: int, runs: int,
+                     llm_backend: str = "fake", fake_latency: Optional[float] = None,
+                     max_llm_concurrency: int = 8, warmup: int = 1,
+                     measure_memory: bool = False, work_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    동시 진단 수 하나에 대해 컴파일된 워크플로우로 runs건의 진단을 실행하고 측정
+    (에이전트·가이드라인 인덱스·연결 풀은 측정 전에 한 번만 생성하여 batch_diagnosis와 같은 구성으로 공유)
+
+    Args:
+        services: 진단할 서비스 고정 데이터 (runs가 더 많으면 순환하여 사용)
+        concurrency: 동시에 진행할 진단 수
+        runs: 측정할 진단 수
+        llm_backend: 오프라인 LLM 백엔드 ("fake" 또는 "replay")
+        fake_latency: LLM 호출당 인위적인 지연 시간(초)
+        max_llm_concurrency: 모든 진단을 합친 최대 동시 LLM 요청 수
+        warmup: 측정에서 제외할 사전 실행 수 (지연 로딩·첫 호출 비용 제거)
+        measure_memory: tracemalloc으로 최대 Python 힙 사용량 측정 (측정 중 처리량이 낮아짐)
+        work_dir: 가이드라인 인덱스와 보고서를 저장할 디렉토리
+                  (없으면 임시 디렉토리, 실제 보고서 디렉토리와 가이드라인 인덱스에는 쓰지 않음)
+
+    Returns:
+        summarize_level 결과
+    """
+    if work_dir is None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            return await arun_level(services, concurrency, runs, llm_backend, fake_latency,
+                                    max_llm_concurrency, warmup, measure_memory, temp_dir)
+
+    client_pool = LLMClientPool(LLMRateLimiter(max_llm_concurrency), backend=llm_backend, fake_latency=fake_latency)
+    # 오프라인 백엔드에서는 응답 캐시를 사용하지 않으므로 매 진단이 모든 LLM 호출을 수행
+    agents = create_agents(
+        None, client_pool, "local",
+        guideline_index_dir=os.path.join(work_dir, "guideline_index"),
+        report_dir=os.path.join(work_dir, "reports")
+    )
+    workflow = build_workflow(agents, use_async=True)
+    run_slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def diagnose(service: Dict[str, str]) -> Dict[str, Any]:
+        async with run_slots:
+            run_id = new_run_id()
+            started_at = time.perf_counter()
+            error = None
+            with run_trace(run_id, service["service_name"]) as trace:
+                try:
+                    await workflow.ainvoke(
+                        create_initial_state(service["service_name"], service["domain_info"], service["domain_focus"]),
+                        {"configurable": {"thread_id": run_id}}
+                    )
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+            return {
+                "status": "failed" if error else "completed",
+                "error": error,
+                "seconds": time.perf_counter() - started_at,
+                "trace": trace.summary()
+            }
+
+    try:
+        for index in range(warmup):
+            await diagnose(services[index % len(services)])
+
+        if measure_memory:
+            tracemalloc.start()
+        started_at = time.perf_counter()
+        results = list(await asyncio.gather(*[
+            diagnose(services[index % len(services)]) for index in range(runs)
+        ]))
+        wall_seconds = time.perf_counter() - started_at
+        peak_heap_mb = None
+        if measure_memory:
+            peak_heap_mb = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+            tracemalloc.stop()
+    finally:
+        await client_pool.aclose()
+
+    return summarize_level(concurrency, results, wall_seconds, peak_heap_mb)
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """기준 결과 파일 대비 동시 진단 수별 처리량·진단 시간·토큰 변화"""
+    baseline_levels = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    lines = [f"\n🆚 기준 결과 대비 ({baseline.get('git_revision') or '-'} → {current.get('git_revision') or '-'})"]
+    for level in current["levels"]:
+        previous = baseline_levels.get(level["concurrency"])
+        if previous is None:
+            continue
+        changes = []
+        for key, label in (("runs_per_minute", "처리량"), ("run_seconds_p50", "진단 p50"),
+                           ("input_tokens_per_run", "입력 토큰")):
+            if previous.get(key):
+                changes.append(f"{label} {(level[key] - previous[key]) / previous[key] * 100:+.1f}%")
+        lines.append(f"  동시 {level['concurrency']:>2} | " + " | ".join(changes))
+    return lines
+
+def run(services: List[Dict[str, str]], concurrency_levels: List[int], runs: int,
+        llm_backend: str, fake_latency: Optional[float], max_llm_concurrency: int,
+        warmup: int, measure_memory: bool, verbose: bool,
+        work_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    동시 진단 수별로 측정 (에이전트 출력은 verbose일 때만 표시)
+    가이드라인 인덱스와 보고서는 work_dir(없으면 임시 디렉토리)에 저장하고, 인덱스는 첫 측정에서 한 번만 생성
+    """
+    if work_dir is None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            return run(services, concurrency_levels, runs, llm_backend, fake_latency, max_llm_concurrency,
+                       warmup, measure_memory, verbose, temp_dir)
+
+    levels = []
+    for concurrency in concurrency_levels:
+        level_runs = max(runs, concurrency)
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with output:
+            result = asyncio.run(arun_level(
+                services, concurrency, level_runs, llm_backend, fake_latency,
+                max_llm_concurrency, warmup, measure_memory, work_dir
+            ))
+        levels.append(result)
+        print(f"  동시 {concurrency:>2} | 진단 {result['completed']}/{result['runs']} | "
+              f"{result['runs_per_minute']:8.1f} 건/분 | 진단 p50 {result['run_seconds_p50']:.2f}s "
+              f"p95 {result['run_seconds_p95']:.2f}s | LLM 호출 {result['llm_calls_per_run']:.1f}회/건 | "
+              f"토큰 {result['input_tokens_per_run'] + result['output_tokens_per_run']:,.0f}/건 | "
+              f"RSS {result['peak_rss_mb'] or '-'}MB")
+        for error in result["errors"]:
+            print(f"    ❌ {error}")
+    return levels
+
+def main():
+    parser = argparse.ArgumentParser(description="진단 파이프라인 종단 간 벤치마크 (오프라인 백엔드)")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="진단할 서비스 고정 데이터 (CSV/JSONL)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--runs", type=int, default=16, help="동시 진단 수별 측정 진단 수 (동시 진단 수보다 작으면 동시 진단 수)")
+    parser.add_argument("--llm-backend", choices=OFFLINE_BACKENDS, default="fake")
+    parser.add_argument("--fake-latency", type=float, default=0.05, help="LLM 호출당 인위적인 지연 시간(초)")
+    parser.add_argument("--max-llm-concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--memory", action="store_true", help="tracemalloc으로 최대 Python 힙 사용량 측정")
+    parser.add_argument("--verbose", action="store_true", help="에이전트 진행 출력 표시")
+    parser.add_argument("--work-dir", help="가이드라인 인덱스와 생성된 보고서를 남길 디렉토리 (기본값: 임시 디렉토리)")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    services = load_services(args.fixtures)
+    if not services:
+        print("⚠️ 진단할 서비스가 없습니다.")
+        return
+
+    print(f"📊 진단 파이프라인 벤치마크: 서비스 {len(services)}개, LLM 백엔드 {args.llm_backend} "
+          f"(지연 {args.fake_latency}s), 최대 동시 LLM 요청 {args.max_llm_concurrency}")
+    levels = run(services, args.concurrency, args.runs, args.llm_backend, args.fake_latency,
+                 args.max_llm_concurrency, args.warmup, args.memory, args.verbose, args.work_dir)
+
+    result = {
+        "benchmark": "pipeline",
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "fixtures": args.fixtures,
+            "services": len(services),
+            "runs": args.runs,
+            "llm_backend": args.llm_backend,
+            "fake_latency": args.fake_latency,
+            "max_llm_concurrency": args.max_llm_concurrency,
+            "warmup": args.warmup,
+            "search_backend": "local"
+        },
+        "levels": levels
+    }
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            print("\n".join(compare_results(result, json.load(f))))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#가이드라인 검색(GuidelineRAG) 품질/지연시간 벤치마크 (레이블된 쿼리 기준 recall@k, MRR, 쿼리 지연시간, 인덱스 생성 시간)
+# 실행: python -m benchmarks.retrieval_benchmark --index-types flat hnsw --chunk-sizes 500 1000 2000 --modes hybrid vector keyword
+from typing import Dict, List, Any
+from tools.guideline_rag import GuidelineRAG
+from tools.guideline_index import SearchResultCache, index_type_of
+from tools.embedding_service import LOCAL_EMBEDDINGS_MODEL
+from tools.llm_client_pool import LLMClientPool
+import numpy as np
+import contextlib
+import itertools
+import tempfile
+import argparse
+import datetime
+import json
+import time
+import io
+import os
+
+DEFAULT_QUERIES = "benchmarks/fixtures/retrieval_queries.jsonl"
+DEFAULT_OUTPUT = "benchmarks/results/retrieval_benchmark.json"
+SEARCH_MODES = ("hybrid", "vector", "keyword")
+
+def load_queries(path: str) -> List[Dict[str, Any]]:
+    """
+    레이블된 쿼리 로드 (JSON Lines)
+
+    Args:
+        path: 한 줄에 {"query", "aspect", "relevant": [{"source": 파일 이름, "pages": [페이지]}]} 형식
+              (페이지는 청크 메타데이터와 같은 0부터 시작하는 PDF 페이지 번호이므로 청크 크기와 무관)
+
+    Returns:
+        쿼리 목록 (relevant는 (파일 이름, 페이지) 집합으로 변환)
+    """
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    for row in rows:
+        row["relevant"] = {
+            (label["source"], page) for label in row["relevant"] for page in label["pages"]
+        }
+    return rows
+
+def score_results(results: List[Dict[str, Any]], relevant: set, ks: List[int]) -> Dict[str, Any]:
+    """
+    쿼리 하나의 검색 결과 채점 (같은 페이지의 여러 청크는 한 번만 인정)
+
+    Returns:
+        k별 재현율 (찾은 정답 페이지 수 / 정답 페이지 수), 첫 정답 순위, 역순위
+    """
+    found = set()
+    recall = {}
+    first_rank = None
+    for rank, result in enumerate(results, 1):
+        page = (result["source"], result["page"])
+        if page in relevant:
+            found.add(page)
+            first_rank = first_rank or rank
+        for k in ks:
+            if rank == k:
+                recall[k] = len(found) / len(relevant)
+    for k in ks:
+        recall.setdefault(k, len(found) / len(relevant))
+    return {"recall": recall, "first_rank": first_rank, "reciprocal_rank": 1.0 / first_rank if first_rank else 0.0}
+
+def build_rag(embeddings_model: str, chunk_size: int, chunk_overlap: int, index_type: str,
+              guidelines_dir: str, index_dir: str) -> GuidelineRAG:
+    """
+    벤치마크용 GuidelineRAG 생성 (임시 인덱스 디렉토리에서 처음부터 생성, 임베딩·검색 결과 캐시 미사용)
+    LLM은 검색에 사용되지 않으므로 네트워크 없이 동작하는 fake 백엔드로 생성
+    """
+    return GuidelineRAG(
+        embeddings_model=embeddings_model, guidelines_dir=guidelines_dir, index_dir=index_dir,
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, index_type=index_type,
+        embedding_cache_path=None, persist_search_cache=False,
+        client_pool=LLMClientPool(backend="fake")
+    )
+
+def evaluate(rag: GuidelineRAG, queries: List[Dict[str, Any]], ks: List[int], mode: str,
+             repeats: int = 3) -> Dict[str, Any]:
+    """
+    검색 방식 하나의 품질과 지연시간 측정
+    (반복마다 검색 결과 캐시를 비워 매번 키워드/벡터 검색과 결합을 모두 수행,
+     쿼리 임베딩은 첫 반복 이후 임베딩 서비스의 메모리 캐시를 사용)
+
+    Args:
+        rag: 측정할 GuidelineRAG
+        queries: load_queries 결과
+        ks: 재현율을 계산할 k 목록 (검색은 가장 큰 k로 수행)
+        mode: 검색 방식 ("hybrid", "vector", "keyword")
+        repeats: 지연시간 측정 반복 횟수
+
+    Returns:
+        recall@k, MRR, 쿼리 지연시간 p50/p99(ms), 정답을 찾지 못한 쿼리
+    """
+    n_results = max(ks)
+    latencies = []
+    scores = []
+    for repeat in range(max(1, repeats)):
+        rag.search_cache = SearchResultCache(rag.index_version or "empty")
+        for query in queries:
+            start = time.perf_counter()
+            results = rag.search_local_guidelines(query["query"], n_results=n_results, mode=mode)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if repeat == 0:
+                scores.append(score_results(results, query["relevant"], ks))
+
+    result = {f"recall@{k}": round(float(np.mean([score["recall"][k] for score in scores])), 4) for k in ks}
+    result.update({
+        f"mrr@{n_results}": round(float(np.mean([score["reciprocal_rank"] for score in scores])), 4),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+        "latency_ms_p99": round(float(np.percentile(latencies, 99)), 3),
+        "misses": [query["query"] for query, score in zip(queries, scores) if score["first_rank"] is None]
+    })
+    return result
+
+def run(queries: List[Dict[str, Any]], embedders: List[str], chunk_sizes: List[int], chunk_overlap: int,
+        index_types: List[str], modes: List[str], ks: List[int], repeats: int,
+        guidelines_dir: str, verbose: bool) -> List[Dict[str, Any]]:
+    """임베딩 모델 × 청크 크기 × 인덱스 유형 조합마다 인덱스를 새로 생성하고 검색 방식별로 측정"""
+    results = []
+    for embeddings_model, chunk_size, index_type in itertools.product(embedders, chunk_sizes, index_types):
+        config = {"embeddings_model": embeddings_model, "chunk_size": chunk_size,
+                  "chunk_overlap": chunk_overlap, "index_type": index_type}
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with tempfile.TemporaryDirectory() as index_dir:
+            try:
+                with output:
+                    start = time.perf_counter()
+                    rag = build_rag(embeddings_model, chunk_size, chunk_overlap, index_type,
+                                    guidelines_dir, index_dir)
+                    build_seconds = time.perf_counter() - start
+            except Exception as e:
+                # 네트워크가 필요한 임베딩 모델 등 생성에 실패한 조합은 기록하고 계속 진행
+                print(f"  ❌ {embeddings_model} / chunk {chunk_size} / {index_type}: {type(e).__name__}: {e}")
+                results.append({**config, "error": f"{type(e).__name__}: {e}"})
+                continue
+            if not rag.vector_store:
+                print(f"  ⚠️ {guidelines_dir}에서 가이드라인 청크를 만들지 못했습니다.")
+                return results
+
+            # 코퍼스가 작으면 요청한 유형 대신 다른 유형이 선택될 수 있으므로 실제 유형을 함께 기록
+            config.update({
+                "index_type_used": index_type_of(rag.vector_store.index),
+                "chunk_count": rag.vector_store.index.ntotal,
+                "build_seconds": round(build_seconds, 3)
+            })
+            for mode in modes:
+                result = {**config, "mode": mode, **evaluate(rag, queries, ks, mode, repeats)}
+                results.append(result)
+                recalls = " | ".join(f"recall@{k} {result[f'recall@{k}']:.3f}" for k in ks)
+                print(f"  {embeddings_model:22s} | chunk {chunk_size:5d} | {config['index_type_used']:6s} | "
+                      f"{mode:7s} | 생성 {result['build_seconds']:7.2f}s | {recalls} | "
+                      f"MRR {result[f'mrr@{max(ks)}']:.3f} | p50 {result['latency_ms_p50']:.2f}ms "
+                      f"p99 {result['latency_ms_p99']:.2f}ms")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="가이드라인 검색 품질/지연시간 벤치마크")
+    parser.add_argument("--queries", default=DEFAULT_QUERIES, help="레이블된 쿼리 파일 (JSONL)")
+    parser.add_argument("--guidelines-dir", default="data/guidelines")
+    parser.add_argument("--embedders", nargs="+", default=[LOCAL_EMBEDDINGS_MODEL],
+                        help=f"임베딩 모델 ({LOCAL_EMBEDDINGS_MODEL}는 네트워크 없이 동작, 예: text-embedding-3-small)")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[1000])
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--index-types", nargs="+", default=["flat"], help="auto, flat, hnsw, ivfpq")
+    parser.add_argument("--modes", nargs="+", choices=SEARCH_MODES, default=list(SEARCH_MODES))
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 10], help="재현율을 계산할 k (기본 검색 k=3)")
+    parser.add_argument("--repeats", type=int, default=3, help="지연시간 측정 반복 횟수")
+    parser.add_argument("--verbose", action="store_true", help="인덱스 생성 진행 출력 표시")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    ks = sorted(set(args.k))
+    print(f"📊 가이드라인 검색 벤치마크: 쿼리 {len(queries)}개, k={ks}, 반복 {args.repeats}회")
+    results = run(queries, args.embedders, args.chunk_sizes, args.chunk_overlap, args.index_types,
+                  args.modes, ks, args.repeats, args.guidelines_dir, args.verbose)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "benchmark": "retrieval",
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "queries": args.queries,
+            "query_count": len(queries),
+            "k": ks,
+            "repeats": args.repeats,
+            "results": results
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -171,3 +171,14 @@ FINAL_REPORT_ASSEMBLY_PROMPT = ChatPromptTemplate.from_messages([
               "필요한 경우 연결 문구를 추가하거나 내용을 조정하여 보고서 전체가 "
               "논리적 흐름을 갖도록 해주세요.")
 ])
+
+# 섹션 연결 문장 생성 프롬프트 (로컬 조립 시 선택적으로 사용)
+REPORT_TRANSITIONS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_PROMPT),
+    ("human", "{service_name}에 대한 윤리 리스크 진단 보고서의 섹션들을 자연스럽게 잇는 연결 문장을 작성해주세요.\n\n"
+              "각 섹션의 도입부는 다음과 같습니다:\n\n"
+              "{section_openings}\n\n"
+              "섹션별로 앞 섹션과의 흐름을 잇는 한 문장씩만 작성하여 다음 JSON 형식으로만 응답하세요 "
+              "(키는 위 섹션 이름을 그대로 사용):\n"
+              "{{\"섹션 이름\": \"연결 문장\"}}")
+])
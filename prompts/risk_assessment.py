@@ -35,8 +35,9 @@ DEEP_DIVE_PROMPT = ChatPromptTemplate.from_messages([
               "서비스 정보:\n{service_analysis}\n\n"
               "도메인: {domain_info}\n"
               "현재까지의 분석: {current_assessment}\n\n"
+              "관련 가이드라인 근거:\n{guideline_evidence}\n\n"
               "위 서비스의 {ethical_aspect} 측면에서 구체적인 사례와 증거를 통해 "
-              "리스크를 심층적으로 분석해주세요.")
+              "리스크를 심층적으로 분석해주세요. 가이드라인 근거를 활용한 경우 출처를 함께 밝혀주세요.")
 ])
 
 # 최종 리스크 평가 보고서 프롬프트
@@ -58,10 +59,11 @@ COMPLIANCE_CHECK_PROMPT = ChatPromptTemplate.from_messages([
     ("human", "{service_name}이 주요 AI 윤리 가이드라인을 준수하는지 평가해주세요.\n\n"
               "서비스 정보:\n{service_analysis}\n\n"
               "리스크 평가 결과:\n{risk_assessment}\n\n"
+              "가이드라인 원문 근거:\n{guideline_evidence}\n\n"
               "다음 가이드라인에 대한 준수 여부를 평가해주세요:\n"
               "1. EU AI Act\n"
               "2. OECD AI 원칙\n"
               "3. UNESCO AI 윤리 권고\n\n"
               "각 가이드라인별로 '준수', '부분 준수', '미준수' 중 하나로 평가하고, "
-              "그 이유를 간략히 설명해주세요.")
+              "그 이유를 간략히 설명해주세요. 가능하면 위 원문 근거의 출처를 인용해주세요.")
 ])
@@ -0,0 +1,254 @@
+#진단 실행 체크포인트 저장소 (노드 단위 상태를 SQLite에 저장하여 중단된 진단 재개)
+from typing import Any, Dict, Iterator, AsyncIterator, List, Optional, Sequence, Tuple
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.types import TASKS
+import threading
+import asyncio
+import sqlite3
+import random
+import os
+
+DEFAULT_CHECKPOINT_PATH = "data/checkpoints/runs.sqlite"
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver):
+    """
+    LangGraph 체크포인트를 SQLite 파일에 저장하는 체크포인터
+    - 노드가 끝날 때마다 전체 상태(StateType)가 저장되므로, 실패하거나 중단된 진단은
+      같은 run_id(thread_id)로 다시 실행하면 마지막으로 완료된 노드 다음부터 이어서 진행
+    - 동기 호출(스레드)과 비동기 호출(이벤트 루프)에서 하나의 연결을 잠금으로 공유
+    """
+
+    def __init__(self, db_path: str = DEFAULT_CHECKPOINT_PATH):
+        super().__init__()
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, "
+            "parent_checkpoint_id TEXT, type TEXT, checkpoint BLOB, metadata_type TEXT, metadata BLOB, "
+            "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id));"
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, channel TEXT NOT NULL, version TEXT NOT NULL, "
+            "type TEXT NOT NULL, value BLOB, "
+            "PRIMARY KEY (thread_id, checkpoint_ns, channel, version));"
+            "CREATE TABLE IF NOT EXISTS writes ("
+            "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, "
+            "task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT NOT NULL, type TEXT, value BLOB, "
+            "task_path TEXT NOT NULL DEFAULT '', "
+            "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx));"
+        )
+        self._conn.commit()
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        """채널 버전에 해당하는 채널 값 로드 (잠금 안에서 호출)"""
+        channel_values = {}
+        for channel, version in versions.items():
+            row = self._conn.execute(
+                "SELECT type, value FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version))
+            ).fetchone()
+            if row and row[0] != "empty":
+                channel_values[channel] = self.serde.loads_typed((row[0], row[1]))
+        return channel_values
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                     channel: Optional[str] = None) -> List[Tuple]:
+        """체크포인트에 딸린 중간 쓰기 로드 (잠금 안에서 호출)"""
+        query = ("SELECT task_id, channel, type, value, task_path, idx FROM writes "
+                 "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?")
+        params = [thread_id, checkpoint_ns, checkpoint_id]
+        if channel is not None:
+            query += " AND channel = ?"
+            params.append(channel)
+        return self._conn.execute(query + " ORDER BY task_id, idx", params).fetchall()
+
+    def _to_tuple(self, row: Tuple) -> CheckpointTuple:
+        """checkpoints 테이블의 한 행을 CheckpointTuple로 변환 (잠금 안에서 호출)"""
+        thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type_, blob, metadata_type, metadata = row
+        checkpoint = self.serde.loads_typed((type_, blob))
+        writes = self._load_writes(thread_id, checkpoint_ns, checkpoint_id)
+        sends = []
+        if parent_checkpoint_id:
+            # 부모 체크포인트에서 예약된 Send 작업 복원 (task_path, task_id, idx 순)
+            sends = sorted(
+                self._load_writes(thread_id, checkpoint_ns, parent_checkpoint_id, TASKS),
+                key=lambda w: (w[4], w[0], w[5])
+            )
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id
+            }},
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(thread_id, checkpoint_ns, checkpoint["channel_versions"]),
+                "pending_sends": [self.serde.loads_typed((w[2], w[3])) for w in sends]
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            pending_writes=[(w[0], w[1], self.serde.loads_typed((w[2], w[3]))) for w in writes],
+            parent_config=(
+                {"configurable": {
+                    "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_checkpoint_id
+                }} if parent_checkpoint_id else None
+            )
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """config의 checkpoint_id(없으면 해당 run의 최신) 체크포인트 조회"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = "SELECT * FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        params = [thread_id, checkpoint_ns]
+        if checkpoint_id := get_checkpoint_id(config):
+            query += " AND checkpoint_id = ?"
+            params.append(checkpoint_id)
+        with self._lock:
+            row = self._conn.execute(query + " ORDER BY checkpoint_id DESC LIMIT 1", params).fetchone()
+            return self._to_tuple(row) if row else None
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        """조건에 맞는 체크포인트를 최신순으로 조회"""
+        query = "SELECT * FROM checkpoints WHERE 1 = 1"
+        params = []
+        if config:
+            query += " AND thread_id = ?"
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                query += " AND checkpoint_ns = ?"
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                query += " AND checkpoint_id = ?"
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            query += " AND checkpoint_id < ?"
+            params.append(before_id)
+
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY thread_id, checkpoint_id DESC", params).fetchall()
+            tuples = []
+            for row in rows:
+                if limit is not None and len(tuples) >= limit:
+                    break
+                metadata = self.serde.loads_typed((row[6], row[7]))
+                # 메타데이터 조건은 역직렬화 후 비교
+                if filter and not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+                tuples.append(self._to_tuple(row))
+        yield from tuples
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        """노드 실행 후 체크포인트 저장 (이번에 바뀐 채널 값만 새 버전으로 저장)"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        c = checkpoint.copy()
+        c.pop("pending_sends", None)
+        values = c.pop("channel_values")
+        type_, blob = self.serde.dumps_typed(c)
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        blobs = []
+        for channel, version in new_versions.items():
+            value_type, value = self.serde.dumps_typed(values[channel]) if channel in values else ("empty", b"")
+            blobs.append((thread_id, checkpoint_ns, channel, str(version), value_type, value))
+
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blobs)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                 type_, blob, metadata_type, metadata_blob)
+            )
+            self._conn.commit()
+        return {"configurable": {
+            "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]
+        }}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        """완료된 작업의 중간 쓰기 저장 (같은 단계의 다른 노드가 실패해도 재실행하지 않도록)"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, blob = self.serde.dumps_typed(value)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id,
+                         WRITES_IDX_MAP.get(channel, idx), channel, value_type, blob, task_path))
+        # 오류/인터럽트 같은 특수 채널(음수 idx)은 덮어쓰고, 일반 쓰기는 처음 저장된 값을 유지
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [r for r in rows if r[4] < 0]
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [r for r in rows if r[4] >= 0]
+            )
+            self._conn.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        """run의 모든 체크포인트 삭제"""
+        with self._lock:
+            for table in ("checkpoints", "blobs", "writes"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None,
+                    limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        tuples = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in tuples:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: Any) -> str:
+        """채널의 다음 버전 (앞자리는 정렬 가능한 순번)"""
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    def list_runs(self) -> List[Dict[str, Any]]:
+        """
+        저장된 진단 run 목록 (최근 순)
+
+        Returns:
+            [{"run_id", "checkpoints", "last_checkpoint_id"}, ...]
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT thread_id, COUNT(*), MAX(checkpoint_id) FROM checkpoints "
+                "WHERE checkpoint_ns = '' GROUP BY thread_id ORDER BY MAX(checkpoint_id) DESC"
+            ).fetchall()
+        return [{"run_id": r[0], "checkpoints": r[1], "last_checkpoint_id": r[2]} for r in rows]
@@ -1,6 +1,9 @@
 #도메인 특화 어댑터
-from typing import Dict, List, Any
-from langchain_openai import ChatOpenAI
+from typing import Dict, List, Any, Optional
+from tools.llm_cache import with_cache
+from tools.llm_trace import traced, llm_template
+from tools.llm_client_pool import create_chat_llm
+from tools.prompt_context import render_context
 import json
 import os
 
@@ -9,8 +12,9 @@ class DomainAdapter:
     다양한 도메인(의료, 금융, 교육 등)의 특성을 반영하여 AI 윤리 진단을 특화시키는 도구
     """
 
-    def __init__(self, model_name="gpt-4o-mini"):
-        self.llm = ChatOpenAI(model=model_name, temperature=0.2)
+    def __init__(self, model_name="gpt-4o-mini", llm_cache=None, client_pool=None):
+        # llm_cache가 있으면 같은 프롬프트의 응답을 재사용, 호출마다 토큰·지연 시간 추적
+        self.llm = traced(with_cache(create_chat_llm(model_name, 0.2, client_pool), llm_cache))
         self.domains_info = self._load_domain_info()
         
     def _load_domain_info(self) -> Dict[str, Any]:
@@ -137,6 +141,7 @@ class DomainAdapter:
                 "domain_specific_questions": []
             }
 
+    @llm_template("inline:domain_enhancement")
     def enhance_service_analysis(self, service_analysis: Dict[str, Any], 
                               domain_info: str, domain_focus: str) -> Dict[str, Any]:
         """
@@ -150,6 +155,20 @@ class DomainAdapter:
         Returns:
             강화된 서비스 분석 정보
         """
+        # LLM에 요청
+        response = self.llm.invoke(self._enhancement_messages(service_analysis, domain_info, domain_focus))
+        return self._apply_enhancement(service_analysis, response.content)
+    
+    @llm_template("inline:domain_enhancement")
+    async def aenhance_service_analysis(self, service_analysis: Dict[str, Any],
+                                        domain_info: str, domain_focus: str) -> Dict[str, Any]:
+        """enhance_service_analysis의 비동기 버전"""
+        response = await self.llm.ainvoke(self._enhancement_messages(service_analysis, domain_info, domain_focus))
+        return self._apply_enhancement(service_analysis, response.content)
+    
+    def _enhancement_messages(self, service_analysis: Dict[str, Any],
+                              domain_info: str, domain_focus: str) -> List[Dict[str, str]]:
+        """서비스 분석 강화 요청 메시지 작성"""
         # 도메인 특화 정보 가져오기
         domain_specific = self.get_domain_specific_info(domain_info)
         
@@ -167,28 +186,28 @@ class DomainAdapter:
         
         prompt = f"""
         AI 서비스 분석 정보:
-        {json.dumps(service_analysis, ensure_ascii=False, indent=2)}
+        {render_context(service_analysis)}
         
         도메인: {domain_info}
         중점 분석 요소: {domain_focus}
         
         도메인 특화 정보:
-        {json.dumps(domain_specific, ensure_ascii=False, indent=2)}
+        {render_context(domain_specific)}
         
         위 정보를 바탕으로 {domain_info} 도메인과 {domain_focus} 측면을 고려한 강화된 서비스 분석 정보를 
         JSON 형식으로 제공해주세요. 기존 정보를 유지하되, 'domain_specific_info' 필드에 
         도메인 특화 분석 정보를 추가해주세요.
         """
         
-        # LLM에 요청
-        response = self.llm.invoke([
+        return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": prompt}
-        ])
-        
+        ]
+    
+    def _apply_enhancement(self, service_analysis: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """강화 응답의 도메인 특화 분석 정보를 서비스 분석 정보에 추가"""
         try:
             # JSON 형식 응답 추출 시도
-            content = response.content
             start_idx = content.find("{")
             end_idx = content.rfind("}") + 1
             
@@ -210,7 +229,7 @@ class DomainAdapter:
         except json.JSONDecodeError:
             # JSON 파싱 실패 시
             service_analysis["domain_specific_info"] = {
-                "raw_enhancement": response.content
+                "raw_enhancement": content
             }
             return service_analysis
 
@@ -224,6 +243,33 @@ class DomainAdapter:
         Returns:
             도메인 특화 정보가 반영된 시스템 상태
         """
+        domain_specific = self._prepare_adaptation(state)
+        if domain_specific is None:
+            return state
+        
+        # 서비스 분석 정보 강화
+        enhanced_service_analysis = self.enhance_service_analysis(
+            state["service_analysis"], state.get("domain_info", "일반"), state.get("domain_focus", "모든 측면")
+        )
+        return self._finish_adaptation(state, enhanced_service_analysis, domain_specific)
+    
+    async def aadapt(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """adapt의 비동기 버전 (LangGraph ainvoke용 노드)"""
+        domain_specific = self._prepare_adaptation(state)
+        if domain_specific is None:
+            return state
+        
+        enhanced_service_analysis = await self.aenhance_service_analysis(
+            state["service_analysis"], state.get("domain_info", "일반"), state.get("domain_focus", "모든 측면")
+        )
+        return self._finish_adaptation(state, enhanced_service_analysis, domain_specific)
+    
+    def _prepare_adaptation(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        도메인 특화 정보 조회 및 출력 (LLM 호출 전 단계)
+        Returns:
+            도메인 특화 정보 (서비스 분석 정보가 없으면 None)
+        """
         # 상태에서 필요한 정보 추출
         service_analysis = state.get("service_analysis", {})
         domain_info = state.get("domain_info", "일반")
@@ -231,23 +277,14 @@ class DomainAdapter:
         
         if not service_analysis:
             print("⚠️ 서비스 분석 정보가 없습니다.")
-            return state
-        
+            return None
         
-        #1차 수정..
-        # 도메인 가이드라인 자동 검색
-        # 도메인 특화 정보 가져오기 - 문제가 발생한 부분 수정
+        # 도메인 특화 정보에서 관련 가이드라인(규제) 목록 가져오기
         domain_specific = self.get_domain_specific_info(domain_info)
-         # 수정된 코드: 가이드라인 정보를 도메인 특화 정보에서 가져옴
-        domain_guidelines = domain_specific.get("regulations", [])
-        state["domain_guidelines"] = domain_guidelines
-        
+        state["domain_guidelines"] = domain_specific.get("regulations", [])
         
         print(f"\n🔍 '{domain_info}' 도메인과 '{domain_focus}' 중점 요소를 반영하여 분석 정보 강화 중...")
         
-        # 도메인 특화 정보 가져오기
-        domain_specific = self.get_domain_specific_info(domain_info)
-        
         # 도메인 관련 정보 출력
         print(f"📊 도메인 특화 고려사항:")
         for aspect in domain_specific.get("key_ethical_aspects", [])[:3]:
@@ -257,12 +294,11 @@ class DomainAdapter:
         for reg in domain_specific.get("regulations", [])[:2]:
             print(f"  • {reg}")
         
-        # 서비스 분석 정보 강화
-        enhanced_service_analysis = self.enhance_service_analysis(
-            service_analysis, domain_info, domain_focus
-        )
-        
-        # 상태 업데이트
+        return domain_specific
+    
+    def _finish_adaptation(self, state: Dict[str, Any], enhanced_service_analysis: Dict[str, Any],
+                           domain_specific: Dict[str, Any]) -> Dict[str, Any]:
+        """강화된 분석 정보와 도메인 특화 정보를 상태에 반영"""
         state["service_analysis"] = enhanced_service_analysis
         state["domain_specific"] = domain_specific
         
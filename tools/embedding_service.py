@@ -0,0 +1,192 @@
+#임베딩 서비스 (배치 + 동시 요청 + 디스크 캐시)
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from langchain_core.embeddings import Embeddings
+from tools.lru_cache import LRUCache
+from tools.keyword_index import tokenize
+from array import array
+import threading
+import hashlib
+import sqlite3
+import time
+import math
+import os
+
+# 로컬 결정적 임베딩을 선택하는 모델 이름
+LOCAL_EMBEDDINGS_MODEL = "local-hash"
+
+class EmbeddingCache:
+    """
+    (모델, 텍스트 해시)를 키로 임베딩 벡터를 저장하는 SQLite 디스크 캐시
+    """
+
+    def __init__(self, cache_path: str = "data/embedding_cache/embeddings.sqlite"):
+        self.cache_path = cache_path
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        """모델 이름과 텍스트 해시로 캐시 키 생성"""
+        return f"{model_name}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """여러 키의 벡터를 한 번에 조회"""
+        found = {}
+        with self._lock:
+            # SQLite 변수 개수 제한을 피하기 위해 나누어 조회
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]):
+        """여러 벡터를 한 번에 저장"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("f", vector).tobytes()) for key, vector in items.items()]
+            )
+            self._conn.commit()
+
+
+class EmbeddingService(Embeddings):
+    """
+    임베딩 모델을 감싸 배치 크기, 동시 요청 수, 재시도(지수 백오프), 디스크 캐시를 제어하는 래퍼
+    (재분할·재색인 시 동일한 텍스트는 다시 임베딩하지 않음)
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, batch_size: int = 100,
+                 max_concurrency: int = 4, max_retries: int = 3, backoff_seconds: float = 1.0,
+                 cache: Optional[EmbeddingCache] = None, query_cache_size: int = 256):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.cache = cache
+        # 반복되는 검색 쿼리는 디스크 조회 없이 메모리에서 바로 반환
+        self.query_cache = LRUCache(query_cache_size)
+
+    def _with_retry(self, func, *args):
+        """실패 시 지수 백오프로 재시도"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func(*args)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                wait = self.backoff_seconds * (2 ** attempt)
+                print(f"⚠️ 임베딩 요청 실패, {wait:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries}): {str(e)}")
+                time.sleep(wait)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """캐시에 없는 텍스트만 배치로 나누어 동시에 임베딩"""
+        keys = [EmbeddingCache.make_key(self.model_name, text) for text in texts]
+        vectors = self.cache.get_many(list(set(keys))) if self.cache else {}
+
+        # 캐시에 없는 텍스트 (중복 제거)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing[key] = text
+        missing_keys = list(missing)
+        batches = [missing_keys[i:i + self.batch_size]
+                   for i in range(0, len(missing_keys), self.batch_size)]
+
+        if batches:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(batches)))) as executor:
+                futures = {
+                    executor.submit(self._with_retry, self.embeddings.embed_documents,
+                                    [missing[key] for key in batch]): batch
+                    for batch in batches
+                }
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    new_vectors = dict(zip(batch, future.result()))
+                    if self.cache:
+                        self.cache.put_many(new_vectors)
+                    vectors.update(new_vectors)
+
+        return [vectors[key] for key in keys]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        여러 검색 쿼리를 한 번의 배치 요청으로 임베딩
+        (메모리 LRU에 없는 쿼리만 embed_documents로 요청하고, 결과를 LRU에 넣어 이후 embed_query가 재사용)
+        """
+        keys = [EmbeddingCache.make_key(self.model_name, text) for text in texts]
+        vectors = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            vector = self.query_cache.get(key)
+            if vector is not None:
+                vectors[key] = vector
+            else:
+                missing[key] = text
+
+        if missing:
+            for key, vector in zip(missing, self.embed_documents(list(missing.values()))):
+                self.query_cache.put(key, vector)
+                vectors[key] = vector
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """검색 쿼리 임베딩 (메모리 LRU → 디스크 캐시 → 임베딩 모델 순으로 조회)"""
+        key = EmbeddingCache.make_key(self.model_name, text)
+        vector = self.query_cache.get(key)
+        if vector is not None:
+            return vector
+
+        if self.cache:
+            cached = self.cache.get_many([key])
+            if key in cached:
+                self.query_cache.put(key, cached[key])
+                return cached[key]
+
+        vector = self._with_retry(self.embeddings.embed_query, text)
+        if self.cache:
+            self.cache.put_many({key: vector})
+        self.query_cache.put(key, vector)
+        return vector
+
+
+class LocalHashEmbeddings(Embeddings):
+    """
+    네트워크 없이 사용할 수 있는 결정적(deterministic) 로컬 임베딩
+    (키워드 인덱스와 같은 토큰을 해싱하여 고정 차원 벡터로 변환, 오프라인 테스트·벤치마크용)
+    """
+
+    def __init__(self, dimension: int = 256):
+        self.dimension = dimension
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimension
+        for token in tokenize(text):
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimension
+            sign = 1.0 if digest[4] % 2 == 0 else -1.0
+            vector[index] += sign
+
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
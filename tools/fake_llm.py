@@ -0,0 +1,252 @@
+#오프라인 LLM 백엔드 (프롬프트 템플릿별 고정 응답, 실제 응답 녹화/재생, 인위적 지연 시간)
+from typing import Any, Dict, Optional
+from langchain_core.messages import AIMessage
+from tools.llm_cache import LLMResponseCache, serialize_prompt
+from tools.llm_limiter import estimate_tokens
+from tools.llm_trace import current_template
+import threading
+import hashlib
+import asyncio
+import random
+import json
+import time
+import os
+
+# 기본 녹화 파일 경로
+DEFAULT_RECORDING_PATH = "data/llm_recordings/recordings.jsonl"
+
+ETHICAL_ASPECTS = ["bias", "privacy", "transparency", "accountability"]
+REPORT_SECTIONS = [
+    "executive_summary", "introduction", "service_overview", "risk_assessment_section",
+    "compliance_section", "recommendations_section", "conclusion", "visualization_suggestions"
+]
+
+def _prompt_score(prompt_text: str, salt: str) -> int:
+    """프롬프트 내용으로 결정되는 3~9 사이 점수 (같은 입력이면 항상 같은 점수)"""
+    digest = hashlib.sha256(f"{salt}:{prompt_text}".encode("utf-8")).digest()
+    return 3 + digest[0] % 7
+
+def _recommendation(aspect: str, index: int) -> Dict[str, Any]:
+    return {
+        "title": f"{aspect} 개선 방안 {index}",
+        "description": f"{aspect} 측면의 리스크를 줄이기 위한 절차와 점검 항목을 수립합니다.",
+        "aspect": aspect
+    }
+
+def canned_response(template: Optional[str], prompt_text: str) -> Any:
+    """
+    프롬프트 템플릿별 고정 응답 (JSON을 기대하는 템플릿은 에이전트 스키마를 만족하는 객체, 나머지는 마크다운 텍스트)
+
+    Args:
+        template: llm_template으로 지정된 템플릿 이름 (':repair'가 붙은 복구 요청은 원래 템플릿 응답 사용)
+        prompt_text: 직렬화된 프롬프트 (점수 등 일부 값을 프롬프트에 따라 결정)
+    """
+    template = (template or "").split(":repair")[0]
+    scores = {aspect: _prompt_score(prompt_text, aspect) for aspect in ETHICAL_ASPECTS}
+    risk_areas = {
+        aspect: {
+            "score": scores[aspect],
+            "evidence": [f"{aspect} 관련 근거 1", f"{aspect} 관련 근거 2"],
+            "details": f"{aspect} 측면에서 추가 점검이 필요한 요소가 확인되었습니다."
+        }
+        for aspect in ETHICAL_ASPECTS
+    }
+    priorities = {
+        "high_priority": [_recommendation(aspect, 1) for aspect in ETHICAL_ASPECTS if scores[aspect] >= 7],
+        "medium_priority": [_recommendation(aspect, 2) for aspect in ETHICAL_ASPECTS if 5 <= scores[aspect] < 7],
+        "low_priority": [_recommendation(aspect, 3) for aspect in ETHICAL_ASPECTS if scores[aspect] < 5]
+    }
+    complexity = {aspect: {"complexity": "중간", "period": "3개월"} for aspect in ETHICAL_ASPECTS}
+
+    responses = {
+        "FINAL_ANALYSIS_PROMPT": {
+            "service_provider": "오프라인 테스트 제공업체",
+            "target_functionality": ["자동 의사결정 지원", "개인화 추천"],
+            "data_types": ["사용자 프로필", "이용 기록"],
+            "decision_processes": ["데이터 수집", "모델 추론", "결과 제공"],
+            "technical_architecture": "클라우드 기반 머신러닝 모델",
+            "user_groups": ["일반 사용자", "운영 담당자"],
+            "deployment_context": "상용 서비스"
+        },
+        "inline:domain_enhancement": {
+            "domain_specific_info": {
+                "regulations": ["도메인 관련 규제 1", "도메인 관련 규제 2"],
+                "considerations": ["도메인 특화 고려사항 1", "도메인 특화 고려사항 2"]
+            }
+        },
+        "INITIAL_ASSESSMENT_PROMPT": {"risk_areas": risk_areas},
+        "FINAL_ASSESSMENT_PROMPT": {
+            "risk_areas": risk_areas,
+            "overall_risk_score": round(sum(scores.values()) / len(scores), 1)
+        },
+        "COMPLIANCE_CHECK_PROMPT": {
+            name: {"status": "부분 준수", "reason": f"{name} 요구사항 일부에 대한 근거가 부족합니다."}
+            for name in ("eu_ai_act", "oecd_ai_principles", "unesco_recommendation")
+        },
+        "INITIAL_RECOMMENDATIONS_PROMPT": {
+            aspect: [_recommendation(aspect, 1), _recommendation(aspect, 2)] for aspect in ETHICAL_ASPECTS
+        },
+        "PRIORITIZATION_PROMPT": priorities,
+        "IMPLEMENTATION_COMPLEXITY_PROMPT": {"implementation_complexity": complexity},
+        "FINAL_RECOMMENDATIONS_PROMPT": {
+            **priorities,
+            "implementation_complexity": complexity,
+            "expected_impact": {aspect: "리스크 점수 1~2점 감소 예상" for aspect in ETHICAL_ASPECTS},
+            "best_practices": {aspect: f"{aspect} 모범 사례 요약" for aspect in ETHICAL_ASPECTS},
+            "roadmap": {"단기": ["거버넌스 체계 수립"], "중기": ["정기 감사 도입"], "장기": ["외부 인증 획득"]}
+        },
+        "REPORT_TRANSITIONS_PROMPT": {
+            name: f"다음으로 {name} 내용을 살펴봅니다." for name in REPORT_SECTIONS
+        }
+    }
+    if template in responses:
+        return responses[template]
+    # 텍스트 응답 템플릿 (보고서 섹션, 심층 분석, 모범 사례 등)
+    title = template or "응답"
+    return (
+        f"### {title}\n\n"
+        "오프라인 백엔드가 생성한 고정 응답입니다. 실제 모델 호출 없이 에이전트 흐름과 "
+        "파싱, 동시 실행 구조를 측정하기 위한 내용입니다.\n\n"
+        "- 주요 발견 사항 1\n- 주요 발견 사항 2\n- 주요 발견 사항 3\n"
+    )
+
+
+class RecordingStore:
+    """
+    실제 LLM 응답 녹화 파일 (JSON Lines, 한 줄에 응답 하나)
+    - 키: (모델, 온도, 프롬프트) 해시 (응답 캐시와 같은 키)
+    - 재생 시 키가 정확히 일치하는 응답을 먼저 찾고, 없으면 같은 템플릿의 마지막 응답 사용
+    """
+
+    def __init__(self, path: str = DEFAULT_RECORDING_PATH):
+        self.path = path
+        self._by_key: Dict[str, Dict[str, Any]] = {}
+        self._by_template: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+
+    def _index(self, record: Dict[str, Any]):
+        self._by_key[record["key"]] = record
+        if record.get("template"):
+            self._by_template[record["template"]] = record
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def append(self, record: Dict[str, Any]):
+        """응답 하나를 파일 끝에 추가"""
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._index(record)
+
+    def lookup(self, key: str, template: Optional[str]) -> Optional[Dict[str, Any]]:
+        """녹화된 응답 조회 (정확히 일치하는 프롬프트 → 같은 템플릿 순)"""
+        return self._by_key.get(key) or (self._by_template.get(template) if template else None)
+
+
+class FakeChatModel:
+    """
+    네트워크 없이 동작하는 ChatOpenAI 대체 모델 (invoke/ainvoke 제공)
+    - recordings가 있으면 녹화된 응답을 재생하고, 없는 프롬프트는 템플릿별 고정 응답 사용
+    - latency(초)만큼 지연 후 응답 (jitter는 지연 시간의 ±비율, seed로 재현 가능)
+      latency가 None이면 녹화된 응답의 실제 지연 시간을 재현 (고정 응답은 지연 없음)
+    - 응답에는 추정 토큰 수를 usage_metadata로 포함하여 요청 제한과 호출 추적이 그대로 동작
+    """
+
+    def __init__(self, model_name: str = "gpt-4o-mini", temperature: float = 0.2,
+                 latency: Optional[float] = 0.0, jitter: float = 0.0, seed: int = 0,
+                 recordings: Optional[RecordingStore] = None):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.latency = latency
+        self.jitter = jitter
+        self.recordings = recordings
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _respond(self, prompt: Any) -> tuple:
+        """(응답 메시지, 지연 시간) 생성"""
+        prompt_text = serialize_prompt(prompt)
+        template = current_template()
+        record = None
+        if self.recordings is not None:
+            key = LLMResponseCache.make_key(self.model_name, self.temperature, prompt)
+            record = self.recordings.lookup(key, template)
+
+        if record is not None:
+            content = record["content"]
+            delay = record.get("latency", 0.0) if self.latency is None else self.latency
+        else:
+            canned = canned_response(template, prompt_text)
+            content = canned if isinstance(canned, str) else json.dumps(canned, ensure_ascii=False)
+            delay = self.latency or 0.0
+
+        if self.jitter and delay:
+            with self._lock:
+                delay *= 1 + self._random.uniform(-self.jitter, self.jitter)
+        input_tokens = estimate_tokens(prompt_text)
+        output_tokens = estimate_tokens(content)
+        message = AIMessage(content=content, usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        })
+        return message, max(0.0, delay)
+
+    def invoke(self, prompt: Any, *args, **kwargs):
+        message, delay = self._respond(prompt)
+        if delay:
+            time.sleep(delay)
+        return message
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs):
+        message, delay = self._respond(prompt)
+        if delay:
+            await asyncio.sleep(delay)
+        return message
+
+
+class RecordingLLM:
+    """
+    실제 LLM 클라이언트를 감싸 응답을 녹화 파일에 저장하는 래퍼 (재생 백엔드용 녹화)
+    (그 밖의 속성은 원래 클라이언트로 전달)
+    """
+
+    def __init__(self, llm: Any, recordings: RecordingStore):
+        self.llm = llm
+        self.recordings = recordings
+        self.model_name = getattr(llm, "model_name", None) or getattr(llm, "model", "unknown")
+        self.temperature = getattr(llm, "temperature", None)
+
+    def _record(self, prompt: Any, response: Any, latency: float):
+        self.recordings.append({
+            "key": LLMResponseCache.make_key(self.model_name, self.temperature, prompt),
+            "template": current_template(),
+            "model": self.model_name,
+            "temperature": self.temperature,
+            "latency": round(latency, 3),
+            "content": response.content
+        })
+
+    def invoke(self, prompt: Any, *args, **kwargs):
+        started_at = time.perf_counter()
+        response = self.llm.invoke(prompt, *args, **kwargs)
+        self._record(prompt, response, time.perf_counter() - started_at)
+        return response
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs):
+        started_at = time.perf_counter()
+        response = await self.llm.ainvoke(prompt, *args, **kwargs)
+        self._record(prompt, response, time.perf_counter() - started_at)
+        return response
+
+    def __getattr__(self, name: str):
+        return getattr(self.llm, name)
@@ -0,0 +1,437 @@
+#가이드라인 벡터 인덱스 저장소
+from typing import Dict, List, Any, Optional, Iterator
+from collections.abc import Mapping
+from langchain.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_community.docstore.base import Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from tools.lru_cache import LRUCache
+import numpy as np
+import threading
+import math
+import hashlib
+import sqlite3
+import json
+import os
+
+# 매니페스트 형식 버전 (저장 구조가 바뀌면 올려서 기존 인덱스를 무효화)
+MANIFEST_VERSION = 4
+
+# 지원하는 FAISS 인덱스 유형 (flat: 정확 검색, hnsw/ivfpq: 근사 검색)
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+
+# PQ 코드 비트 수와 코드북 학습에 필요한 최소 벡터 수 (코드북 중심 2**비트개마다 약 39개)
+PQ_NBITS = 8
+PQ_MIN_TRAINING_VECTORS = 39 * 2 ** PQ_NBITS
+
+def choose_index_type(vector_count: int) -> str:
+    """코퍼스 크기에 따라 인덱스 유형 자동 선택"""
+    if vector_count < 20000:
+        # 이 규모에서는 전수 검색도 수 ms 이내이고 재현율 손실이 없음
+        return "flat"
+    if vector_count < 200000:
+        return "hnsw"
+    # 대규모에서는 메모리까지 줄이는 IVF-PQ 사용
+    return "ivfpq"
+
+def resolve_index_type(index_type: str, vector_count: int) -> str:
+    """설정값("auto" 포함)과 코퍼스 크기로 실제 사용할 인덱스 유형 결정"""
+    if index_type == "auto":
+        index_type = choose_index_type(vector_count)
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 인덱스 유형입니다: {index_type} (지원: {', '.join(INDEX_TYPES)})")
+    # 학습 벡터가 부족하면 PQ 코드북이 제대로 학습되지 않아 재현율이 크게 떨어짐
+    if index_type == "ivfpq" and vector_count < PQ_MIN_TRAINING_VECTORS:
+        print(f"⚠️ 벡터 수({vector_count})가 너무 적어 IVF-PQ 대신 flat 인덱스를 사용합니다.")
+        return "flat"
+    return index_type
+
+def index_type_of(index) -> str:
+    """FAISS 인덱스 객체의 유형 이름 반환"""
+    import faiss
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivfpq"
+    return "flat"
+
+def build_faiss_index(index_type: str, vectors: np.ndarray, hnsw_m: int = 32,
+                      ef_construction: int = 80, ef_search: int = 64, nprobe: int = 32):
+    """
+    지정한 유형의 FAISS 인덱스를 생성하고 (필요시 학습 후) 벡터 추가
+    
+    Args:
+        index_type: "flat", "hnsw", "ivfpq"
+        vectors: (N, D) float32 벡터
+        
+    Returns:
+        FAISS 인덱스
+    """
+    import faiss
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    count, dimension = vectors.shape
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, hnsw_m)
+        index.hnsw.efConstruction = ef_construction
+        index.hnsw.efSearch = ef_search
+    elif index_type == "ivfpq":
+        nlist = max(1, min(int(4 * math.sqrt(count)), count // 39))
+        # 서브벡터 하나가 약 8차원이 되도록 서브양자화기 수 결정 (차원의 약수여야 함)
+        pq_m = next(m for m in range(max(1, dimension // 8), 0, -1) if dimension % m == 0)
+        quantizer = faiss.IndexFlatL2(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, PQ_NBITS)
+        index.train(vectors)
+        index.nprobe = min(nprobe, nlist)
+    elif index_type == "flat":
+        index = faiss.IndexFlatL2(dimension)
+    else:
+        raise ValueError(f"지원하지 않는 인덱스 유형입니다: {index_type} (지원: {', '.join(INDEX_TYPES)})")
+
+    index.add(vectors)
+    return index
+
+def search_index(index, query_vector: List[float], k: int,
+                 positions: Optional[set] = None) -> List[tuple]:
+    """
+    FAISS 인덱스 검색 (positions를 지정하면 해당 위치의 벡터만 검색하는 사전 필터링)
+
+    Args:
+        index: FAISS 인덱스
+        query_vector: 쿼리 벡터
+        k: 반환할 결과 수
+        positions: 검색 대상 인덱스 위치 집합 (None이면 전체)
+
+    Returns:
+        (인덱스 위치, 거리) 목록
+    """
+    import faiss
+    vector = np.array([query_vector], dtype=np.float32)
+    if positions is None:
+        distances, labels = index.search(vector, k)
+    else:
+        if not positions:
+            return []
+        # 선택자에 없는 벡터는 거리 계산 자체를 건너뜀
+        selector = faiss.IDSelectorBatch(np.fromiter(positions, dtype=np.int64))
+        if isinstance(index, faiss.IndexHNSW):
+            params = faiss.SearchParametersHNSW(sel=selector, efSearch=max(index.hnsw.efSearch, k))
+        elif isinstance(index, faiss.IndexIVF):
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+        else:
+            params = faiss.SearchParameters(sel=selector)
+        distances, labels = index.search(vector, min(k, len(positions)), params=params)
+    return [(int(label), float(distance)) for label, distance in zip(labels[0], distances[0]) if label >= 0]
+
+class GuidelineIndexStore:
+    """
+    가이드라인 FAISS 인덱스를 디스크에 저장하고 재사용하는 도구
+    (FAISS 인덱스 + 문서 저장소 + 원본 파일 해시/청크 설정/임베딩 모델 매니페스트)
+    """
+
+    MANIFEST_FILE = "manifest.json"
+    INDEX_FILE = "index.faiss"
+    DOCSTORE_FILE = "docstore.sqlite"
+
+    def __init__(self, index_dir: str = "data/guideline_index"):
+        self.index_dir = index_dir
+        self.manifest_path = os.path.join(index_dir, self.MANIFEST_FILE)
+
+    @staticmethod
+    def hash_file(filepath: str) -> str:
+        """파일 내용의 SHA-256 해시 계산"""
+        digest = hashlib.sha256()
+        with open(filepath, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def hash_directory(self, guidelines_dir: str) -> Dict[str, str]:
+        """가이드라인 디렉토리의 PDF/TXT 파일별 해시 계산"""
+        hashes = {}
+        for filename in sorted(os.listdir(guidelines_dir)):
+            if filename.endswith(('.pdf', '.txt')):
+                hashes[filename] = self.hash_file(os.path.join(guidelines_dir, filename))
+        return hashes
+
+    def build_manifest(self, file_hashes: Dict[str, str], embeddings_model: str,
+                       chunk_size: int, chunk_overlap: int) -> Dict[str, Any]:
+        """현재 설정과 원본 파일 상태로 매니페스트 생성"""
+        return {
+            "version": MANIFEST_VERSION,
+            "embeddings_model": embeddings_model,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "files": {name: {"sha256": sha} for name, sha in file_hashes.items()}
+        }
+
+    @staticmethod
+    def index_version(manifest: Dict[str, Any]) -> str:
+        """설정과 원본 파일 해시로 인덱스 버전 계산 (인덱스가 바뀌면 버전도 바뀜)"""
+        version_info = {
+            key: manifest.get(key)
+            for key in ("version", "embeddings_model", "chunk_size", "chunk_overlap")
+        }
+        version_info["files"] = sorted(
+            (name, info.get("sha256")) for name, info in manifest.get("files", {}).items()
+        )
+        return hashlib.sha256(
+            json.dumps(version_info, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+
+    def load_manifest(self) -> Optional[Dict[str, Any]]:
+        """저장된 매니페스트 로드 (없거나 손상된 경우 None)"""
+        if not os.path.exists(self.manifest_path):
+            return None
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def settings_match(self, saved: Optional[Dict[str, Any]], manifest: Dict[str, Any]) -> bool:
+        """저장된 인덱스가 현재 청크 설정 및 임베딩 모델과 같은지 확인"""
+        if not saved:
+            return False
+        return all(saved.get(key) == manifest.get(key)
+                   for key in ("version", "embeddings_model", "chunk_size", "chunk_overlap"))
+
+    def diff(self, saved: Dict[str, Any], manifest: Dict[str, Any]) -> Dict[str, List[str]]:
+        """파일 해시를 비교하여 추가/변경/삭제/유지된 파일 목록 반환"""
+        saved_hashes = {name: info.get("sha256") for name, info in saved.get("files", {}).items()}
+        current_hashes = {name: info["sha256"] for name, info in manifest["files"].items()}
+
+        return {
+            "added": [name for name in current_hashes if name not in saved_hashes],
+            "changed": [name for name, sha in current_hashes.items()
+                        if name in saved_hashes and saved_hashes[name] != sha],
+            "removed": [name for name in saved_hashes if name not in current_hashes],
+            "unchanged": [name for name, sha in current_hashes.items()
+                          if saved_hashes.get(name) == sha]
+        }
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.index_dir, self.INDEX_FILE)
+
+    @property
+    def docstore_path(self) -> str:
+        return os.path.join(self.index_dir, self.DOCSTORE_FILE)
+
+    def load(self, embeddings, read_only: bool = False) -> Optional[FAISS]:
+        """
+        디스크에서 FAISS 인덱스와 문서 저장소 로드
+        
+        Args:
+            embeddings: 쿼리 임베딩에 사용할 임베딩 객체
+            read_only: True이면 인덱스를 메모리 매핑하고 청크는 SQLite에서 필요할 때만 읽음
+                       (여러 워커 프로세스가 페이지 캐시의 한 사본을 공유)
+        """
+        try:
+            if read_only:
+                index = read_index_mmap(self.index_path)
+                docstore = SQLiteDocstore(self.docstore_path)
+                index_to_docstore_id = docstore.position_map()
+            else:
+                import faiss
+                index = faiss.read_index(self.index_path)
+                docstore, index_to_docstore_id = load_docstore(self.docstore_path)
+            return FAISS(
+                embedding_function=embeddings,
+                index=index,
+                docstore=docstore,
+                index_to_docstore_id=index_to_docstore_id
+            )
+        except Exception as e:
+            print(f"⚠️ 저장된 가이드라인 인덱스 로드 실패: {str(e)}")
+            return None
+
+    def save(self, vector_store: FAISS, manifest: Dict[str, Any]):
+        """FAISS 인덱스, 문서 저장소(SQLite), 매니페스트를 디스크에 저장"""
+        import faiss
+        os.makedirs(self.index_dir, exist_ok=True)
+        # 기존 매니페스트를 먼저 제거하여 저장 도중 실패하면 다음 실행에서 재생성되도록 함
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+
+        # 파일을 교체(os.replace)하므로 기존 파일을 메모리 매핑 중인 워커는 이전 버전을 계속 사용
+        faiss.write_index(vector_store.index, self.index_path + ".tmp")
+        os.replace(self.index_path + ".tmp", self.index_path)
+        write_docstore(self.docstore_path, vector_store)
+
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+
+def read_index_mmap(index_path: str):
+    """FAISS 인덱스를 읽기 전용 메모리 매핑으로 로드 (지원하지 않는 유형이면 일반 로드)"""
+    import faiss
+    flag_candidates = []
+    if hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+        flag_candidates.append(faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+    flag_candidates.append(faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+
+    for flags in flag_candidates:
+        try:
+            return faiss.read_index(index_path, flags)
+        except RuntimeError:
+            continue
+    print("⚠️ 이 인덱스 유형은 메모리 매핑을 지원하지 않아 일반 방식으로 로드합니다.")
+    return faiss.read_index(index_path)
+
+def write_docstore(docstore_path: str, vector_store: FAISS):
+    """벡터 스토어의 청크를 인덱스 위치 순서대로 SQLite 파일에 저장"""
+    tmp_path = docstore_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute(
+            "CREATE TABLE chunks (position INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, "
+            "content TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        rows = []
+        for position in range(vector_store.index.ntotal):
+            doc_id = vector_store.index_to_docstore_id[position]
+            doc = vector_store.docstore.search(doc_id)
+            rows.append((position, doc_id, doc.page_content, json.dumps(doc.metadata, ensure_ascii=False)))
+        conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?)", rows)
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, docstore_path)
+
+def load_docstore(docstore_path: str):
+    """SQLite 문서 저장소 전체를 메모리로 로드 (증분 갱신 등 쓰기가 필요한 경우)"""
+    conn = sqlite3.connect(docstore_path)
+    try:
+        rows = conn.execute("SELECT position, id, content, metadata FROM chunks ORDER BY position").fetchall()
+    finally:
+        conn.close()
+
+    documents = {}
+    index_to_docstore_id = {}
+    for position, doc_id, content, metadata in rows:
+        documents[doc_id] = Document(id=doc_id, page_content=content, metadata=json.loads(metadata))
+        index_to_docstore_id[position] = doc_id
+    return InMemoryDocstore(documents), index_to_docstore_id
+
+
+class SQLiteDocstore(Docstore):
+    """
+    청크를 SQLite 파일에서 필요할 때만 읽는 읽기 전용 문서 저장소
+    (워커별로 전체 청크를 메모리에 올리지 않음)
+    """
+
+    def __init__(self, docstore_path: str):
+        self._conn = sqlite3.connect(f"file:{docstore_path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def search(self, search: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, metadata FROM chunks WHERE id = ?", (search,)
+            ).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return Document(id=search, page_content=row[0], metadata=json.loads(row[1]))
+
+    def iter_metadata(self) -> Iterator[tuple]:
+        """(인덱스 위치, 청크 ID, 메타데이터) 목록 (본문은 읽지 않음)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT position, id, metadata FROM chunks ORDER BY position").fetchall()
+        for position, doc_id, metadata in rows:
+            yield position, doc_id, json.loads(metadata)
+
+    def position_map(self) -> "DocstorePositionMap":
+        """인덱스 위치 → 청크 ID 매핑"""
+        return DocstorePositionMap(self._conn, self._lock)
+
+
+class DocstorePositionMap(Mapping):
+    """FAISS 인덱스 위치를 청크 ID로 변환하는 SQLite 기반 지연 조회 매핑"""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock):
+        self._conn = conn
+        self._lock = lock
+
+    def __getitem__(self, position) -> str:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM chunks WHERE position = ?", (int(position),)
+            ).fetchone()
+        if row is None:
+            raise KeyError(position)
+        return row[0]
+
+    def __iter__(self) -> Iterator[int]:
+        with self._lock:
+            positions = [row[0] for row in self._conn.execute("SELECT position FROM chunks ORDER BY position")]
+        return iter(positions)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+
+class SearchResultCache:
+    """
+    (인덱스 버전, 쿼리, k)를 키로 검색 결과를 저장하는 캐시 (메모리 LRU + 선택적 SQLite 영구 저장)
+    인덱스 버전이 바뀌면 이전 버전의 결과는 사용되지 않고 삭제됨
+    """
+
+    def __init__(self, index_version: str, maxsize: int = 512, cache_path: Optional[str] = None):
+        self.index_version = index_version
+        self.memory = LRUCache(maxsize)
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if cache_path:
+            cache_dir = os.path.dirname(cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_results "
+                "(key TEXT PRIMARY KEY, index_version TEXT NOT NULL, results TEXT NOT NULL)"
+            )
+            # 다른 인덱스 버전의 결과는 무효화
+            self._conn.execute(
+                "DELETE FROM search_results WHERE index_version != ?", (index_version,)
+            )
+            self._conn.commit()
+
+    def make_key(self, query: str, k: int, **options) -> str:
+        """인덱스 버전, 쿼리, k, 검색 옵션으로 캐시 키 생성"""
+        raw = json.dumps([query, k, options], ensure_ascii=False, sort_keys=True)
+        return f"{self.index_version}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """캐시된 검색 결과 조회"""
+        results = self.memory.get(key)
+        if results is not None or self._conn is None:
+            return results
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results FROM search_results WHERE key = ?", (key,)
+            ).fetchone()
+        if row:
+            results = json.loads(row[0])
+            self.memory.put(key, results)
+        return results
+
+    def put(self, key: str, results: List[Dict[str, Any]]):
+        """검색 결과 저장"""
+        self.memory.put(key, results)
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_results (key, index_version, results) VALUES (?, ?, ?)",
+                (key, self.index_version, json.dumps(results, ensure_ascii=False))
+            )
+            self._conn.commit()
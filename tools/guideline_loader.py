@@ -0,0 +1,127 @@
+#가이드라인 문서 병렬 로드 및 분할 도구
+from typing import Dict, List, Any, Iterator, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from langchain_core.documents import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.document_loaders import TextLoader
+from tools.guideline_metadata import tag_chunk_metadata
+from pypdf import PdfReader
+import os
+
+def count_pdf_pages(filepath: str) -> int:
+    """PDF 파일의 페이지 수 반환"""
+    return len(PdfReader(filepath).pages)
+
+def load_and_split(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    파일 하나(또는 PDF 페이지 범위)를 로드하고 청크로 분할
+    (프로세스 풀에서 실행되므로 모듈 최상위 함수로 정의)
+
+    Args:
+        task: filepath, filename, start_page, end_page, chunk_size, chunk_overlap 정보
+
+    Returns:
+        작업 정보와 분할된 청크 목록 (청크마다 언어/규제 계열/도메인 태그 포함)
+    """
+    filename = task["filename"]
+
+    if filename.endswith('.pdf'):
+        # PyPDFLoader와 같은 방식으로 페이지별 문서 생성 (지정된 페이지 범위만)
+        reader = PdfReader(task["filepath"])
+        documents = [
+            Document(
+                page_content=reader.pages[page].extract_text(),
+                metadata={"source": filename, "page": page}
+            )
+            for page in range(task["start_page"], task["end_page"])
+        ]
+    else:
+        documents = TextLoader(task["filepath"], encoding="utf-8").load()
+        for doc in documents:
+            doc.metadata["source"] = filename
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=task["chunk_size"],
+        chunk_overlap=task["chunk_overlap"]
+    )
+    chunks = text_splitter.split_documents(documents)
+    for chunk in chunks:
+        chunk.metadata = tag_chunk_metadata(chunk.page_content, chunk.metadata)
+    return {**task, "chunks": chunks}
+
+
+class GuidelineIngestor:
+    """
+    가이드라인 문서를 파일/페이지 범위 단위로 나누어 여러 프로세스에서 병렬로 로드·분할하는 도구
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 100,
+                 max_workers: int = None, pages_per_task: int = 20):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # 큰 PDF도 여러 작업으로 나누어 가장 큰 파일이 전체 시간을 좌우하지 않도록 함
+        self.pages_per_task = pages_per_task
+
+    def plan_tasks(self, guidelines_dir: str, filenames: List[str]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        파일별 로드 작업 계획 수립
+
+        Returns:
+            작업 목록, 파일별 정보(type, pages)
+        """
+        tasks = []
+        files_info = {}
+
+        for filename in filenames:
+            filepath = os.path.join(guidelines_dir, filename)
+            base_task = {
+                "filepath": filepath,
+                "filename": filename,
+                "chunk_size": self.chunk_size,
+                "chunk_overlap": self.chunk_overlap
+            }
+
+            try:
+                if filename.endswith('.pdf'):
+                    page_count = count_pdf_pages(filepath)
+                    files_info[filename] = {"type": "pdf", "pages": page_count}
+                    for start in range(0, page_count, self.pages_per_task):
+                        end = min(start + self.pages_per_task, page_count)
+                        tasks.append({**base_task, "start_page": start, "end_page": end})
+                elif filename.endswith('.txt'):
+                    files_info[filename] = {"type": "text", "pages": 1}
+                    tasks.append({**base_task, "start_page": 0, "end_page": 1})
+            except Exception as e:
+                print(f"⚠️ {filename} 로드 중 오류 발생: {str(e)}")
+
+        return tasks, files_info
+
+    def iter_chunks(self, tasks: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        작업을 병렬 실행하고 완료되는 순서대로 결과를 스트리밍
+        (다음 단계인 임베딩이 전체 로드 완료를 기다리지 않도록 함)
+        """
+        if self.max_workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield from self._run_safely(task)
+            return
+
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+            futures = {executor.submit(load_and_split, task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    yield future.result()
+                except Exception as e:
+                    print(f"⚠️ {task['filename']} ({task['start_page']}-{task['end_page']}쪽) "
+                          f"로드 중 오류 발생: {str(e)}")
+                    yield {**task, "chunks": [], "error": str(e)}
+
+    def _run_safely(self, task: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """단일 프로세스 모드에서 작업 실행"""
+        try:
+            yield load_and_split(task)
+        except Exception as e:
+            print(f"⚠️ {task['filename']} 로드 중 오류 발생: {str(e)}")
+            yield {**task, "chunks": [], "error": str(e)}
@@ -0,0 +1,164 @@
+#가이드라인 청크 메타데이터 태깅 및 필터 도구
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+import re
+
+# 규제/가이드라인 계열별 식별 키워드 (파일명 또는 청크 본문에 등장하면 태깅)
+REGULATION_KEYWORDS = {
+    "eu_ai_act": ["eu ai act", "ai act", "인공지능법", "유럽연합 인공지능"],
+    "gdpr": ["gdpr", "일반개인정보보호규정"],
+    "nist_ai_rmf": ["nist", "ai rmf", "ai_rmf", "위험관리 프레임워크", "risk management framework"],
+    "oecd": ["oecd"],
+    "unesco": ["unesco", "유네스코", "recommendation on the ethics of artificial intelligence"],
+    "korea_ai_ethics": ["국가 인공지능 윤리기준", "인공지능 윤리기준", "한국지능정보사회진흥원",
+                        "과학기술정보통신부", "윤리_가이드"],
+    "hipaa": ["hipaa"]
+}
+
+# 도메인/주제 태그별 키워드 (DomainAdapter의 도메인 키와 같은 이름 사용)
+DOMAIN_KEYWORDS = {
+    "healthcare": ["의료", "환자", "진단", "병원", "헬스케어", "health", "medical", "patient", "clinical"],
+    "finance": ["금융", "신용", "대출", "보험", "finance", "financial", "credit", "loan"],
+    "education": ["교육", "학생", "학습자", "교사", "education", "student", "learner"],
+    "employment": ["채용", "고용", "노동", "근로자", "employment", "hiring", "worker"],
+    "public": ["공공", "행정", "정부", "public sector", "government"],
+    "privacy": ["개인정보", "프라이버시", "사생활", "privacy", "personal data", "data protection"],
+    "fairness": ["공정", "차별", "편향", "형평", "fairness", "bias", "discrimination"],
+    "transparency": ["투명", "설명가능", "설명 가능", "transparency", "explainab"],
+    "safety": ["안전", "보안", "견고", "safety", "security", "robust"],
+    "accountability": ["책임", "accountability", "liability"]
+}
+
+# 태그 키워드가 이 횟수 이상 등장해야 청크에 태깅 (우연한 한 번 언급 제외)
+MIN_KEYWORD_HITS = 2
+
+# 목록 값을 가지는 메타데이터 필드 (하나라도 일치하면 통과)
+LIST_FIELDS = ("regulations", "domains")
+
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+LATIN_PATTERN = re.compile(r"[A-Za-z]")
+
+def detect_language(text: str) -> str:
+    """청크 언어 판별 (한글 비율 기준 'ko' 또는 'en')"""
+    hangul = len(HANGUL_PATTERN.findall(text))
+    latin = len(LATIN_PATTERN.findall(text))
+    # 영문 한 단어는 한글 여러 글자에 해당하므로 한글에 가중치를 둠
+    return "ko" if hangul * 3 >= latin else "en"
+
+def _compile_keywords(keywords: List[str]) -> "re.Pattern":
+    """키워드 목록을 하나의 정규식으로 변환 (영문 키워드는 단어 앞부분에서만 일치: 'nist' ≠ 'administration')"""
+    parts = [
+        rf"(?<![a-z]){re.escape(keyword)}" if keyword.isascii() else re.escape(keyword)
+        for keyword in keywords
+    ]
+    return re.compile("|".join(parts))
+
+REGULATION_PATTERNS = {family: _compile_keywords(keywords) for family, keywords in REGULATION_KEYWORDS.items()}
+DOMAIN_PATTERNS = {domain: _compile_keywords(keywords) for domain, keywords in DOMAIN_KEYWORDS.items()}
+
+def _count_hits(text: str, pattern: "re.Pattern") -> int:
+    return len(pattern.findall(text))
+
+def detect_regulations(text: str, source: str = "") -> List[str]:
+    """파일명과 본문에서 언급된 규제/가이드라인 계열 추출"""
+    source = source.lower()
+    text = text.lower()
+    return [
+        family for family, pattern in REGULATION_PATTERNS.items()
+        if _count_hits(source, pattern) or _count_hits(text, pattern)
+    ]
+
+def detect_domains(text: str) -> List[str]:
+    """본문 키워드로 도메인/주제 태그 추출"""
+    text = text.lower()
+    return [
+        domain for domain, pattern in DOMAIN_PATTERNS.items()
+        if _count_hits(text, pattern) >= MIN_KEYWORD_HITS
+    ]
+
+def tag_chunk_metadata(text: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    청크 메타데이터에 언어, 규제 계열, 도메인 태그 추가
+
+    Args:
+        text: 청크 본문
+        metadata: source, page 등 기존 메타데이터
+
+    Returns:
+        태그가 추가된 메타데이터
+    """
+    source = metadata.get("source", "")
+    return {
+        **metadata,
+        "language": detect_language(text),
+        "regulations": detect_regulations(text, source),
+        "domains": detect_domains(text)
+    }
+
+def domain_tags_for(*texts: str) -> List[str]:
+    """
+    도메인 정보/윤리적 측면 같은 자유 텍스트를 도메인 태그로 변환
+    (예: '의료', '프라이버시' → ['healthcare', 'privacy'])
+    """
+    text = " ".join(texts).lower()
+    return [
+        domain for domain, pattern in DOMAIN_PATTERNS.items()
+        if domain in text or _count_hits(text, pattern)
+    ]
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, set]:
+    """필터 값을 집합으로 정규화 (빈 조건은 제거)"""
+    normalized = {}
+    for field, value in (filters or {}).items():
+        if value is None:
+            continue
+        values = set(value) if isinstance(value, (list, tuple, set)) else {value}
+        if values:
+            normalized[field] = values
+    return normalized
+
+
+class MetadataIndex:
+    """
+    청크 메타데이터 역색인 ((필드, 값) → 인덱스 위치 집합)
+    검색 전에 필터 조건에 맞는 청크 위치를 구해 벡터/키워드 검색 범위를 좁힘
+    """
+
+    def __init__(self):
+        self.postings: Dict[Tuple[str, Any], set] = {}
+        self.ids: Dict[int, str] = {}
+
+    def build(self, chunks: Iterable[Tuple[int, str, Dict[str, Any]]]):
+        """(인덱스 위치, 청크 ID, 메타데이터) 목록으로 역색인 생성"""
+        self.postings, self.ids = {}, {}
+        for position, doc_id, metadata in chunks:
+            self.ids[position] = doc_id
+            for field, value in metadata.items():
+                values = value if field in LIST_FIELDS else [value]
+                for item in values:
+                    self.postings.setdefault((field, item), set()).add(position)
+
+    def select(self, filters: Optional[Dict[str, Any]]) -> Optional[set]:
+        """
+        필터 조건을 만족하는 인덱스 위치 집합 반환
+        (필드 안에서는 값 중 하나라도 일치하면, 필드 간에는 모두 만족해야 통과)
+
+        Returns:
+            위치 집합 (필터가 없으면 None)
+        """
+        normalized = normalize_filters(filters)
+        if not normalized:
+            return None
+
+        selected = None
+        for field, values in normalized.items():
+            positions = set()
+            for value in values:
+                positions |= self.postings.get((field, value), set())
+            selected = positions if selected is None else selected & positions
+            if not selected:
+                break
+        return selected or set()
+
+    def ids_for(self, positions: Iterable[int]) -> set:
+        """인덱스 위치 집합을 청크 ID 집합으로 변환"""
+        return {self.ids[position] for position in positions if position in self.ids}
@@ -2,8 +2,19 @@
 from typing import Dict, List, Any, Optional
 from langchain.vectorstores import FAISS
 from langchain_openai import OpenAIEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.document_loaders import PyPDFLoader, TextLoader
+from tools.llm_client_pool import create_chat_llm
+from tools.llm_trace import traced, llm_template
+from tools.guideline_index import (
+    GuidelineIndexStore, SearchResultCache, SQLiteDocstore,
+    build_faiss_index, resolve_index_type, index_type_of, search_index
+)
+from tools.guideline_metadata import MetadataIndex, domain_tags_for, normalize_filters
+from tools.guideline_loader import GuidelineIngestor
+from tools.keyword_index import KeywordIndex, reciprocal_rank_fusion
+from tools.embedding_service import EmbeddingService, EmbeddingCache, LocalHashEmbeddings, LOCAL_EMBEDDINGS_MODEL
+import numpy as np
+import requests
+import hashlib
 import os
 import json
 
@@ -12,24 +23,74 @@ class GuidelineRAG:
     AI 윤리 가이드라인 정보 검색 도구(로컬문서 + 웹 검색 하이브리드 방식)
     """
 
-    def __init__(self, model_name="gpt-4o-mini", embeddings_model="text-embedding-3-small"):
-        # 임베딩 및 LLM 모델 초기화
-        self.embeddings = OpenAIEmbeddings(model=embeddings_model)
-        self.llm = ChatOpenAI(model=model_name, temperature=0.2)
+    def __init__(self, model_name="gpt-4o-mini", embeddings_model="text-embedding-3-small",
+                 guidelines_dir="data/guidelines", index_dir="data/guideline_index",
+                 chunk_size=1000, chunk_overlap=100, max_workers=None,
+                 embedding_batch_size=100, embedding_concurrency=4,
+                 embedding_cache_path="data/embedding_cache/embeddings.sqlite",
+                 persist_search_cache=True, search_mode="hybrid", index_type="auto",
+                 read_only=False, client_pool=None):
+        # 임베딩 및 LLM 모델 초기화 (client_pool이 있으면 에이전트들과 HTTP 연결 풀·요청 제한 공유)
+        # (embeddings_model="local-hash"이면 네트워크 없이 동작하는 로컬 임베딩 사용)
+        self.embeddings_model = embeddings_model
+        if embeddings_model == LOCAL_EMBEDDINGS_MODEL:
+            base_embeddings = LocalHashEmbeddings()
+        else:
+            base_embeddings = OpenAIEmbeddings(model=embeddings_model)
+        self.embeddings = EmbeddingService(
+            base_embeddings, embeddings_model,
+            batch_size=embedding_batch_size,
+            max_concurrency=embedding_concurrency,
+            cache=EmbeddingCache(embedding_cache_path) if embedding_cache_path else None
+        )
+        self.llm = traced(create_chat_llm(model_name, 0.2, client_pool))
+        
+        # 문서 경로 및 청크 설정
+        self.guidelines_dir = guidelines_dir
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
         
         # 벡터 저장소 및 가이드라인 정보 초기화
         self.vector_store = None
         self.guidelines_info = {}
+        self.index_store = GuidelineIndexStore(index_dir)
+        self.ingestor = GuidelineIngestor(chunk_size, chunk_overlap, max_workers=max_workers)
+        self.index_version = None
+        # FAISS 인덱스 유형: "auto"(코퍼스 크기로 선택), "flat", "hnsw", "ivfpq"
+        self.index_type = index_type
+        # 읽기 전용 모드: 저장된 인덱스를 mmap으로 열고 재색인/저장을 하지 않음
+        # (여러 워커 프로세스가 같은 인덱스 파일을 OS 페이지 캐시로 공유)
+        self.read_only = read_only
+        
+        # 검색 방식: "hybrid"(BM25 + 벡터, RRF 결합), "vector", "keyword"
+        self.search_mode = search_mode
+        self.keyword_index = KeywordIndex()
+        # 청크 메타데이터(출처, 페이지, 언어, 규제 계열, 도메인) 필터용 역색인
+        self.metadata_index = MetadataIndex()
         
-        # 벡터 저장소 초기화 (로컬 PDF/TXT 파일 로드)
+        # 벡터 저장소 초기화 (저장된 인덱스 재사용, 없으면 로컬 PDF/TXT 파일 로드)
         self._initialize_vector_store()
+        self._initialize_keyword_index()
+        self._initialize_metadata_index()
+        
+        # 검색 결과 캐시 (인덱스 버전이 키에 포함되어 인덱스가 바뀌면 자동 무효화)
+        # 읽기 전용 워커는 공유 인덱스 디렉토리에 쓰지 않도록 메모리 캐시만 사용
+        self.search_cache = SearchResultCache(
+            self.index_version or "empty",
+            cache_path=os.path.join(index_dir, "search_cache.sqlite")
+            if persist_search_cache and not read_only else None
+        )
         
         # API 키 설정 (환경 변수에서 로드)
         self.serpapi_key = os.getenv("SERPAPI_KEY")
         
     def _initialize_vector_store(self):
         """윤리 가이드라인 문서를 로드하고 벡터 스토어 초기화"""
-        guidelines_dir = "data/guidelines"
+        if self.read_only:
+            self._load_read_only()
+            return
+        
+        guidelines_dir = self.guidelines_dir
         
         # 디렉토리가 존재하는지 확인 없으면 생성
         if not os.path.exists(guidelines_dir):
@@ -37,49 +98,265 @@ class GuidelineRAG:
             # 기본 가이드라인 파일 생성
             self._create_sample_guidelines(guidelines_dir) #샘플 파일 생성
         
-        # 문서 로드
-        documents = []
+        # 원본 파일 해시로 매니페스트 생성
+        manifest = self.index_store.build_manifest(
+            self.index_store.hash_directory(guidelines_dir),
+            self.embeddings_model, self.chunk_size, self.chunk_overlap
+        )
+        # 설정이 같은 저장 인덱스가 있으면 변경된 파일만 반영, 없으면 전체 생성
+        saved_manifest = self.index_store.load_manifest()
+        vector_store = None
+        if self.index_store.settings_match(saved_manifest, manifest):
+            vector_store = self.index_store.load(self.embeddings)
+        if vector_store is not None:
+            self.vector_store = vector_store
+            self._update_vector_store(saved_manifest, manifest)
+        else:
+            self._build_vector_store(manifest)
+        self.index_version = self._index_version_for(manifest)
+    
+    def _index_version_for(self, manifest: Dict[str, Any]) -> str:
+        """
+        설정·원본 파일 해시와 인덱스 유형으로 인덱스 버전 계산
+        (인덱스 유형이 바뀌면 검색 결과도 달라질 수 있으므로 버전에 포함하되, 설정값("auto" 등)이 아니라
+         실제 구성된 유형을 사용하여 인덱스를 저장한 프로세스와 읽기 전용 워커가 같은 버전을 사용)
+        """
+        index_type = index_type_of(self.vector_store.index) if self.vector_store else self.index_type
+        return f"{self.index_store.index_version(manifest)}-{index_type}"
+    
+    def _load_read_only(self):
+        """저장된 인덱스를 원본 파일 확인 없이 읽기 전용(mmap)으로 로드"""
+        saved_manifest = self.index_store.load_manifest()
+        vector_store = self.index_store.load(self.embeddings, read_only=True) if saved_manifest else None
+        if vector_store is None:
+            print(f"⚠️ 읽기 전용 모드: 저장된 가이드라인 인덱스가 없습니다 ({self.index_store.index_dir})")
+            return
+        
+        self.vector_store = vector_store
+        self.index_type = index_type_of(vector_store.index)
+        self.index_version = self._index_version_for(saved_manifest)
+        self.guidelines_info = {
+            filename: {"type": info.get("type"), "pages": info.get("pages")}
+            for filename, info in saved_manifest["files"].items()
+        }
+        print(f"✅ 읽기 전용 가이드라인 인덱스 로드 완료: {vector_store.index.ntotal}개 청크")
+    
+    def _initialize_keyword_index(self):
+        """벡터 스토어와 같은 청크로 키워드(BM25) 인덱스 로드 또는 생성"""
+        if not self.vector_store:
+            return
         
-        for filename in os.listdir(guidelines_dir):
-            filepath = os.path.join(guidelines_dir, filename)
-            
-            try:
-                #PDF 파일 처리
-                if filename.endswith('.pdf'):
-                    loader = PyPDFLoader(filepath)
-                    file_docs = loader.load()
-                    # 문서 메타데이터에 출처 추가
-                    for doc in file_docs:
-                        doc.metadata["source"] = filename
-                    documents.extend(file_docs)
-                    self.guidelines_info[filename] = {"type": "pdf", "pages": len(file_docs)}
-                #텍스트 파일 처리
-                elif filename.endswith('.txt'):
-                    loader = TextLoader(filepath)
-                    file_docs = loader.load()
-                    # 문서 메타데이터에 출처 추가
-                    for doc in file_docs:
-                        doc.metadata["source"] = filename
-                    documents.extend(file_docs)
-                    self.guidelines_info[filename] = {"type": "text", "pages": len(file_docs)}
+        keyword_index_path = os.path.join(self.index_store.index_dir, "keyword_index.sqlite")
+        if self.keyword_index.load(keyword_index_path, self.index_version, in_memory=not self.read_only):
+            return
+        if self.read_only:
+            print("⚠️ 읽기 전용 모드: 저장된 키워드 인덱스가 없어 벡터 검색만 사용합니다")
+            self.search_mode = "vector"
+            return
+        
+        docstore = self.vector_store.docstore
+        self.keyword_index.build(
+            (doc_id, docstore.search(doc_id).page_content)
+            for doc_id in self.vector_store.index_to_docstore_id.values()
+        )
+        try:
+            self.keyword_index.save(keyword_index_path, self.index_version)
+        except OSError as e:
+            print(f"⚠️ 키워드 인덱스 저장 실패: {str(e)}")
+    
+    def _initialize_metadata_index(self):
+        """벡터 스토어 청크의 메타데이터로 필터용 역색인 생성"""
+        if not self.vector_store:
+            return
+        
+        docstore = self.vector_store.docstore
+        if isinstance(docstore, SQLiteDocstore):
+            # 읽기 전용 모드에서는 본문 없이 메타데이터만 읽음
+            chunks = docstore.iter_metadata()
+        else:
+            chunks = (
+                (position, doc_id, docstore.search(doc_id).metadata)
+                for position, doc_id in self.vector_store.index_to_docstore_id.items()
+            )
+        self.metadata_index.build(chunks)
+    
+    def _ingest_files(self, filenames: List[str], manifest: Dict[str, Any]) -> int:
+        """
+        파일을 병렬로 로드/분할하고, 완료된 청크를 모아 동시 임베딩이 가능한 크기마다 벡터 스토어에 추가
+        (완료 순서가 아닌 작업 계획 순서대로 추가하여 빌드마다 FAISS 위치가 같도록 함)
+        
+        Returns:
+            추가된 청크 수
+        """
+        tasks, files_info = self.ingestor.plan_tasks(self.guidelines_dir, filenames)
+        self.guidelines_info.update(files_info)
+        for order, task in enumerate(tasks):
+            task["order"] = order
+        
+        # 임베딩 서비스가 배치 여러 개를 동시에 요청할 수 있을 만큼 모아서 임베딩
+        flush_size = self.embeddings.batch_size * self.embeddings.max_concurrency
+        completed = {}
+        next_order = 0
+        pending_chunks, pending_ids = [], []
+        chunk_count = 0
+        failed_files = set(filenames) - set(files_info)
+        for result in self.ingestor.iter_chunks(tasks):
+            completed[result["order"]] = result
+            # 앞선 작업이 모두 끝난 결과만 계획 순서대로 꺼냄
+            while next_order in completed:
+                result = completed.pop(next_order)
+                next_order += 1
+                filename = result["filename"]
+                if "error" in result:
+                    failed_files.add(filename)
+                    continue
+                
+                file_info = manifest["files"][filename]
+                chunk_ids = [
+                    f"{self._chunk_id_prefix(filename, file_info['sha256'])}-{result['start_page']}-{i}"
+                    for i in range(len(result["chunks"]))
+                ]
+                file_info.setdefault("chunk_ids", []).extend(chunk_ids)
+                pending_chunks.extend(result["chunks"])
+                pending_ids.extend(chunk_ids)
             
-            except Exception as e:
-                print(f"⚠️ {filename} 로드 중 오류 발생: {str(e)}")
+            if len(pending_chunks) >= flush_size:
+                chunk_count += self._add_chunks(pending_chunks, pending_ids)
+                pending_chunks, pending_ids = [], []
+        chunk_count += self._add_chunks(pending_chunks, pending_ids)
+        
+        # 로드에 실패한 파일은 이미 추가된 청크를 지우고 매니페스트에서 제외하여 다음 실행에서 다시 시도
+        for filename in failed_files:
+            failed_ids = manifest["files"].pop(filename, {}).get("chunk_ids", [])
+            if failed_ids and self.vector_store is not None:
+                self.vector_store.delete(ids=failed_ids)
+                chunk_count -= len(failed_ids)
+            self.guidelines_info.pop(filename, None)
+        
+        for filename, info in files_info.items():
+            if filename in manifest["files"]:
+                manifest["files"][filename].update(info)
+        
+        return chunk_count
+    
+    def _add_chunks(self, chunks: List[Any], chunk_ids: List[str]) -> int:
+        """청크를 임베딩하여 벡터 스토어에 추가 (벡터 스토어가 없으면 생성)"""
+        if not chunks:
+            return 0
+        if self.vector_store is None:
+            self.vector_store = FAISS.from_documents(chunks, self.embeddings, ids=chunk_ids)
+        else:
+            self.vector_store.add_documents(chunks, ids=chunk_ids)
+        return len(chunks)
+    
+    @staticmethod
+    def _chunk_id_prefix(filename: str, sha256: str) -> str:
+        """
+        파일별 청크 ID 접두어 (파일 이름 해시 + 내용 해시)
+        (내용이 같은 파일이 여러 개 있어도 ID가 겹치지 않아, 한 파일을 변경/삭제할 때 다른 파일의 벡터를 지우지 않음)
+        """
+        name_hash = hashlib.sha256(filename.encode("utf-8")).hexdigest()[:8]
+        return f"{name_hash}-{sha256[:16]}"
+    
+    def _build_vector_store(self, manifest: Dict[str, Any]):
+        """모든 가이드라인 문서로 벡터 스토어를 새로 생성"""
+        chunk_count = self._ingest_files(list(manifest["files"]), manifest)
+        
         #문서가 없으면 종료
-        if not documents:
+        if not chunk_count:
             print("⚠️ 가이드라인 문서가 로드되지 않았습니다.")
             return
         
-        # 문서 분할
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000, 
-            chunk_overlap=100
-        )
-        splits = text_splitter.split_documents(documents)
+        # 인덱스 유형 적용 후 다음 실행에서 재사용하도록 디스크에 저장
+        print(f"✅ {chunk_count}개의 윤리 가이드라인 청크가 로드되었습니다.")
+        self._apply_index_type()
+        self._save_vector_store(manifest)
+    
+    def _update_vector_store(self, saved_manifest: Dict[str, Any], manifest: Dict[str, Any]):
+        """추가/변경/삭제된 파일만 증분 반영 (변경 없는 파일은 재임베딩하지 않음)"""
+        changes = self.index_store.diff(saved_manifest, manifest)
+        saved_files = saved_manifest.get("files", {})
         
-        # 벡터 저장소(스토어) 생성 -> 디스크 저장 X 메모리 저장 코드
-        self.vector_store = FAISS.from_documents(splits, self.embeddings)
-        print(f"✅ {len(splits)}개의 윤리 가이드라인 청크가 로드되었습니다.")
+        # 변경 없는 파일은 저장된 청크 ID와 파일 정보를 그대로 사용
+        for filename in changes["unchanged"]:
+            manifest["files"][filename] = saved_files[filename]
+        self.guidelines_info = {
+            name: {"type": info.get("type"), "pages": info.get("pages")}
+            for name, info in saved_files.items() if name in changes["unchanged"]
+        }
+        
+        if not (changes["added"] or changes["changed"] or changes["removed"]):
+            print(f"✅ 저장된 윤리 가이드라인 인덱스를 불러왔습니다. ({self.vector_store.index.ntotal}개 청크)")
+            # 인덱스 유형 설정이 바뀐 경우에만 (재임베딩 없이) 인덱스 재구성 후 저장
+            if self._apply_index_type():
+                self._save_vector_store(manifest)
+            return
+        
+        print(f"🔄 가이드라인 인덱스 증분 갱신 중... (추가 {len(changes['added'])}, "
+              f"변경 {len(changes['changed'])}, 삭제 {len(changes['removed'])})")
+        
+        # 근사 인덱스는 ID 삭제 시 위치가 재정렬되지 않으므로 flat 인덱스로 변환 후 갱신
+        if index_type_of(self.vector_store.index) != "flat":
+            self._convert_index("flat")
+        
+        # 변경/삭제된 파일의 기존 벡터를 ID로 삭제
+        stale_ids = []
+        for filename in changes["changed"] + changes["removed"]:
+            stale_ids.extend(saved_files[filename].get("chunk_ids", []))
+        if stale_ids:
+            self.vector_store.delete(ids=stale_ids)
+        
+        # 추가/변경된 파일만 분할 및 임베딩
+        new_count = self._ingest_files(changes["added"] + changes["changed"], manifest)
+        
+        print(f"✅ {new_count}개 청크 추가, {len(stale_ids)}개 청크 삭제 "
+              f"(총 {self.vector_store.index.ntotal}개 청크)")
+        self._apply_index_type()
+        self._save_vector_store(manifest)
+    
+    def _apply_index_type(self) -> bool:
+        """
+        설정(또는 코퍼스 크기)에 맞는 인덱스 유형으로 변환
+        
+        Returns:
+            인덱스를 재구성했는지 여부
+        """
+        if not self.vector_store:
+            return False
+        
+        target_type = resolve_index_type(self.index_type, self.vector_store.index.ntotal)
+        if index_type_of(self.vector_store.index) == target_type:
+            return False
+        
+        print(f"🔧 가이드라인 인덱스를 '{target_type}' 유형으로 구성 중...")
+        self._convert_index(target_type)
+        return True
+    
+    def _convert_index(self, index_type: str):
+        """현재 벡터로 지정한 유형의 FAISS 인덱스를 다시 구성 (문서 저장소와 ID 매핑은 유지)"""
+        self.vector_store.index = build_faiss_index(index_type, self._all_vectors())
+    
+    def _all_vectors(self) -> np.ndarray:
+        """인덱스 위치 순서대로 모든 청크 벡터 반환"""
+        index = self.vector_store.index
+        if index_type_of(index) != "ivfpq":
+            # flat/HNSW 인덱스는 원본 벡터를 그대로 복원 가능
+            return index.reconstruct_n(0, index.ntotal)
+        
+        # PQ 인덱스는 손실 압축이므로 임베딩 캐시에서 원본 벡터를 다시 가져옴
+        texts = [
+            self.vector_store.docstore.search(self.vector_store.index_to_docstore_id[i]).page_content
+            for i in range(index.ntotal)
+        ]
+        return np.array(self.embeddings.embed_documents(texts), dtype=np.float32)
+    
+    def _save_vector_store(self, manifest: Dict[str, Any]):
+        """현재 벡터 스토어와 매니페스트를 디스크에 저장"""
+        try:
+            self.index_store.save(self.vector_store, manifest)
+            print(f"💾 가이드라인 인덱스를 저장했습니다: {self.index_store.index_dir}")
+        except Exception as e:
+            print(f"⚠️ 가이드라인 인덱스 저장 실패: {str(e)}")
         
     def search_web(self, query: str) -> str:
         """웹 검색을 통해 최신 정보 가져오기"""
@@ -118,8 +395,13 @@ class GuidelineRAG:
         # 쿼리 개선 (도메인과 윤리적 측면 포함)
         enhanced_query = f"{query} {domain_info} {ethical_aspect} AI 윤리"
         
-        # 1. 로컬 가이드라인 검색
-        local_results = self.search_local_guidelines(enhanced_query)
+        # 1. 로컬 가이드라인 검색 (도메인/윤리적 측면에 해당하는 청크만 검색, 결과가 없으면 전체 검색)
+        domain_tags = domain_tags_for(domain_info, ethical_aspect)
+        local_results = []
+        if domain_tags:
+            local_results = self.search_local_guidelines(enhanced_query, filters={"domains": domain_tags})
+        if not local_results:
+            local_results = self.search_local_guidelines(enhanced_query)
         
         # 2. 웹 검색 (선택적)
         web_results = ""
@@ -136,29 +418,127 @@ class GuidelineRAG:
             "combined_analysis": combined_info
         }
     
-    def search_local_guidelines(self, query: str, n_results: int = 3) -> List[Dict[str, Any]]:
-        """로컬 가이드라인 문서에서 관련 정보 검색"""
+    def search_local_guidelines(self, query: str, n_results: int = 3, mode: Optional[str] = None,
+                                filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        로컬 가이드라인 문서에서 관련 정보 검색
+        
+        Args:
+            query: 검색 쿼리
+            n_results: 반환할 결과 수
+            mode: 검색 방식 ("hybrid", "vector", "keyword", 지정하지 않으면 기본 설정)
+            filters: 메타데이터 필터 (예: {"domains": ["healthcare", "privacy"], "language": "ko"})
+                     source, page, language, regulations, domains 필드 지원
+        """
         # 벡터 저장소가 없으면 빈 결과 반환
         if not self.vector_store:
             return []
+        mode = mode or self.search_mode
         
-        # 벡터 유사도 검색 실행
-        results = self.vector_store.similarity_search_with_score(query, k=n_results)
+        # 같은 인덱스 버전에서 이미 검색한 쿼리는 캐시된 결과 반환 (임베딩 요청 생략)
+        cache_key = self._search_cache_key(query, n_results, mode, filters)
+        cached_results = self.search_cache.get(cache_key)
+        if cached_results is not None:
+            return [dict(result) for result in cached_results]
         
-        # 결과 가공
-        formatted_results = []
-        for doc, score in results:
-            # 점수를 관련도로 변환 (낮을수록 관련성 높음)
-            relevance = 1.0 / (1.0 + score)
-            
-            formatted_results.append({
-                "content": doc.page_content,
-                "source": doc.metadata.get("source", "알 수 없음"),
-                "relevance": round(relevance, 3)
-            })
+        # 필터 조건에 맞는 청크 위치를 먼저 구해 검색 범위를 좁힘 (None이면 전체 검색)
+        positions = self.metadata_index.select(filters)
+        if mode == "vector":
+            formatted_results = self._vector_search(query, n_results, positions)
+        else:
+            formatted_results = self._hybrid_search(query, n_results, use_vector=(mode != "keyword"),
+                                                    positions=positions)
         
+        self.search_cache.put(cache_key, formatted_results)
         return formatted_results
     
+    def search_local_guidelines_batch(self, queries: Dict[str, Dict[str, Any]], n_results: int = 3,
+                                      mode: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        여러 쿼리를 한 번에 검색 (캐시되지 않은 쿼리의 임베딩을 하나의 배치 요청으로 처리)
+        
+        Args:
+            queries: 이름 → {"query": 검색 쿼리, "filters": 메타데이터 필터(선택)}
+            n_results: 쿼리별 반환할 결과 수
+            mode: 검색 방식 (지정하지 않으면 기본 설정)
+            
+        Returns:
+            이름 → 검색 결과 목록 (필터 결과가 없으면 필터 없이 검색한 결과)
+        """
+        if not self.vector_store:
+            return {name: [] for name in queries}
+        mode = mode or self.search_mode
+        
+        # 검색 결과 캐시에 없는 쿼리만 모아 임베딩을 미리 배치 요청 (이후 검색은 메모리 LRU에서 벡터 재사용)
+        if mode != "keyword":
+            uncached = list(dict.fromkeys(
+                spec["query"] for spec in queries.values()
+                if self.search_cache.get(self._search_cache_key(
+                    spec["query"], n_results, mode, spec.get("filters"))) is None
+            ))
+            if uncached:
+                self.embeddings.embed_queries(uncached)
+        
+        results = {}
+        for name, spec in queries.items():
+            results[name] = self.search_local_guidelines(spec["query"], n_results, mode, spec.get("filters"))
+            if not results[name] and spec.get("filters"):
+                results[name] = self.search_local_guidelines(spec["query"], n_results, mode)
+        return results
+    
+    def _search_cache_key(self, query: str, n_results: int, mode: str,
+                          filters: Optional[Dict[str, Any]]) -> str:
+        """검색 결과 캐시 키 (필터 값 순서와 무관)"""
+        return self.search_cache.make_key(
+            query, n_results, mode=mode,
+            filters={field: sorted(map(str, values)) for field, values in normalize_filters(filters).items()}
+        )
+    
+    def _search_vectors(self, query: str, k: int, positions: Optional[set] = None) -> List[tuple]:
+        """쿼리 임베딩(캐시 사용) 후 벡터 유사도 검색 ((청크 ID, 거리) 목록)"""
+        query_vector = self.embeddings.embed_query(query)
+        results = search_index(self.vector_store.index, query_vector, k, positions)
+        index_to_docstore_id = self.vector_store.index_to_docstore_id
+        return [(index_to_docstore_id[position], distance) for position, distance in results]
+    
+    def _format_result(self, doc_id: str, relevance: float) -> Dict[str, Any]:
+        """청크를 검색 결과 형식으로 변환"""
+        doc = self.vector_store.docstore.search(doc_id)
+        return {
+            "content": doc.page_content,
+            "source": doc.metadata.get("source", "알 수 없음"),
+            "page": doc.metadata.get("page"),
+            "relevance": round(float(relevance), 3)
+        }
+    
+    def _vector_search(self, query: str, n_results: int,
+                       positions: Optional[set] = None) -> List[Dict[str, Any]]:
+        """벡터 유사도 검색"""
+        # 거리를 관련도로 변환 (낮을수록 관련성 높음)
+        return [
+            self._format_result(doc_id, 1.0 / (1.0 + distance))
+            for doc_id, distance in self._search_vectors(query, n_results, positions)
+        ]
+    
+    def _hybrid_search(self, query: str, n_results: int, use_vector: bool = True,
+                       positions: Optional[set] = None, rrf_k: int = 60) -> List[Dict[str, Any]]:
+        """키워드(BM25) 순위와 벡터 순위를 RRF로 결합한 검색 (추가 네트워크 호출 없음)"""
+        # 결합 전 각 방식에서 넉넉하게 후보 확보
+        candidate_k = max(n_results * 4, 20)
+        allowed_ids = self.metadata_index.ids_for(positions) if positions is not None else None
+        rankings = [[doc_id for doc_id, _ in self.keyword_index.search(query, k=candidate_k, allowed_ids=allowed_ids)]]
+        
+        if use_vector:
+            rankings.append([doc_id for doc_id, _ in self._search_vectors(query, candidate_k, positions)])
+        
+        # 관련도는 모든 순위에서 1위일 때를 1.0으로 정규화한 RRF 점수
+        max_score = len(rankings) / (rrf_k + 1)
+        return [
+            self._format_result(doc_id, score / max_score)
+            for doc_id, score in reciprocal_rank_fusion(rankings, k=rrf_k)[:n_results]
+        ]
+    
+    @llm_template("inline:guideline_synthesis")
     def _combine_and_analyze(self, query: str, local_results: List[Dict[str, Any]], 
                            web_results: str, domain_info: str, ethical_aspect: str) -> str:
         """로컬 가이드라인과 웹 검색 결과를 결합하여 분석"""
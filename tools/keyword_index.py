@@ -0,0 +1,213 @@
+#가이드라인 키워드(BM25) 인덱스
+from typing import Dict, List, Optional, Tuple, Iterable
+from collections import Counter
+import threading
+import sqlite3
+import math
+import json
+import re
+import os
+
+# 한국어 조사/어미 (길이가 긴 것부터 검사)
+KOREAN_SUFFIXES = sorted([
+    "으로써", "로써", "에서는", "에게서", "으로는", "에서", "에게", "으로", "까지", "부터", "처럼",
+    "보다", "이나", "이며", "하는", "하고", "하여", "했다", "한다", "된다", "되는", "되어", "에는",
+    "은", "는", "이", "가", "을", "를", "의", "에", "로", "와", "과", "도", "만", "및", "등", "한", "된"
+], key=len, reverse=True)
+
+# 조항 번호(제10조, 제3항 등)와 영문/숫자, 한글 단어 토큰 패턴
+TOKEN_PATTERN = re.compile(r"제\s*\d+\s*[조항호장절]|[a-z0-9]+(?:[.\-][a-z0-9]+)*|[가-힣]+")
+ARTICLE_PATTERN = re.compile(r"제\d+[조항호장절]")
+
+def strip_korean_suffix(word: str) -> str:
+    """한글 단어 끝의 조사/어미 제거 (어간이 2글자 이상 남는 경우만)"""
+    for suffix in KOREAN_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            return word[:-len(suffix)]
+    return word
+
+def tokenize(text: str) -> List[str]:
+    """
+    한국어 규제 문서용 토크나이저
+    - 조항 번호는 공백을 제거한 하나의 토큰으로 유지 (예: '제 10 조' → '제10조')
+    - 영문/숫자는 소문자 단어 단위 (예: 'EU AI Act' → eu, ai, act)
+    - 한글은 조사를 제거한 단어 + 2글자 단위(bigram)로 분해하여 복합어 부분 일치 지원
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        word = re.sub(r"\s+", "", match.group())
+        if not re.match(r"[가-힣]", word) or ARTICLE_PATTERN.fullmatch(word):
+            tokens.append(word)
+            continue
+
+        stem = strip_korean_suffix(word)
+        tokens.append(stem)
+        if len(stem) > 2:
+            tokens.extend(stem[i:i + 2] for i in range(len(stem) - 1))
+    return tokens
+
+
+class KeywordIndex:
+    """
+    벡터 검색을 보완하는 BM25 역색인
+    (조항 번호, 'EU AI Act', '개인정보' 같은 정확한 용어 일치를 반영)
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[str] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.avg_length = 0.0
+        self.doc_count = 0
+        # 읽기 전용 모드에서는 역색인을 메모리에 올리지 않고 SQLite에서 쿼리 용어만 조회
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def build(self, documents: Iterable[Tuple[str, str]]):
+        """(문서 ID, 텍스트) 목록으로 역색인 생성"""
+        self.doc_ids, self.doc_lengths, self.postings = [], [], {}
+        for doc_id, text in documents:
+            position = len(self.doc_ids)
+            term_counts = Counter(tokenize(text))
+            self.doc_ids.append(doc_id)
+            self.doc_lengths.append(sum(term_counts.values()))
+            for term, count in term_counts.items():
+                self.postings.setdefault(term, {})[position] = count
+        self.doc_count = len(self.doc_ids)
+        self.avg_length = sum(self.doc_lengths) / self.doc_count if self.doc_count else 0.0
+
+    def _get_postings(self, term: str) -> Dict[int, int]:
+        """용어의 (문서 위치 → 빈도) 목록"""
+        if self._conn is None:
+            return self.postings.get(term, {})
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM postings WHERE term = ?", (term,)).fetchone()
+        return {position: tf for position, tf in json.loads(row[0])} if row else {}
+
+    def _get_docs(self, positions: List[int]) -> Dict[int, Tuple[str, int]]:
+        """문서 위치별 (문서 ID, 길이)"""
+        if self._conn is None:
+            return {p: (self.doc_ids[p], self.doc_lengths[p]) for p in positions}
+        found = {}
+        with self._lock:
+            for i in range(0, len(positions), 500):
+                batch = positions[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT position, doc_id, length FROM docs WHERE position IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                found.update({position: (doc_id, length) for position, doc_id, length in rows})
+        return found
+
+    def search(self, query: str, k: int = 10, allowed_ids: Optional[set] = None) -> List[Tuple[str, float]]:
+        """
+        BM25 점수 기준 상위 k개 문서 검색
+
+        Args:
+            query: 검색 쿼리
+            k: 반환할 문서 수
+            allowed_ids: 지정하면 해당 문서 ID만 검색
+
+        Returns:
+            (문서 ID, 점수) 목록
+        """
+        total = self.doc_count
+        if not total:
+            return []
+
+        term_postings = [self._get_postings(term) for term in set(tokenize(query))]
+        term_postings = [postings for postings in term_postings if postings]
+        docs = self._get_docs(sorted({p for postings in term_postings for p in postings}))
+        # 허용된 문서만 점수 계산 (IDF는 전체 코퍼스 기준 유지)
+        if allowed_ids is not None:
+            allowed_positions = {p for p, (doc_id, _) in docs.items() if doc_id in allowed_ids}
+            term_postings = [
+                ({p: tf for p, tf in postings.items() if p in allowed_positions}, len(postings))
+                for postings in term_postings
+            ]
+        else:
+            term_postings = [(postings, len(postings)) for postings in term_postings]
+
+        scores: Dict[int, float] = {}
+        for postings, doc_freq in term_postings:
+            idf = math.log(1 + (total - doc_freq + 0.5) / (doc_freq + 0.5))
+            for position, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * docs[position][1] / (self.avg_length or 1))
+                scores[position] = scores.get(position, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(docs[position][0], score) for position, score in ranked]
+
+    def save(self, path: str, index_version: str):
+        """역색인을 SQLite 파일로 저장"""
+        tmp_path = path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute("CREATE TABLE docs (position INTEGER PRIMARY KEY, doc_id TEXT NOT NULL, length INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE postings (term TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("index_version", index_version),
+                ("doc_count", str(self.doc_count)),
+                ("avg_length", str(self.avg_length))
+            ])
+            conn.executemany("INSERT INTO docs VALUES (?, ?, ?)", [
+                (position, doc_id, length)
+                for position, (doc_id, length) in enumerate(zip(self.doc_ids, self.doc_lengths))
+            ])
+            conn.executemany("INSERT INTO postings VALUES (?, ?)", [
+                (term, json.dumps(list(postings.items())))
+                for term, postings in self.postings.items()
+            ])
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_path, path)
+
+    def load(self, path: str, index_version: str, in_memory: bool = True) -> bool:
+        """
+        저장된 역색인 로드 (인덱스 버전이 다르면 False)
+
+        Args:
+            in_memory: False이면 SQLite 파일을 열어 두고 검색 시 필요한 용어만 조회
+        """
+        if not os.path.exists(path):
+            return False
+        try:
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        except sqlite3.Error:
+            return False
+        if meta.get("index_version") != index_version:
+            conn.close()
+            return False
+
+        self.doc_count = int(meta["doc_count"])
+        self.avg_length = float(meta["avg_length"])
+        if not in_memory:
+            self._conn = conn
+            return True
+
+        rows = conn.execute("SELECT doc_id, length FROM docs ORDER BY position").fetchall()
+        self.doc_ids = [doc_id for doc_id, _ in rows]
+        self.doc_lengths = [length for _, length in rows]
+        self.postings = {
+            term: {position: tf for position, tf in json.loads(data)}
+            for term, data in conn.execute("SELECT term, data FROM postings")
+        }
+        conn.close()
+        return True
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """여러 순위 목록을 RRF(Reciprocal Rank Fusion)로 결합"""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,185 @@
+#LLM 응답 캐시 (메모리 LRU + SQLite 디스크, 모든 에이전트 공유)
+from typing import Any, Optional
+from langchain_core.messages import AIMessage, BaseMessage
+from tools.lru_cache import LRUCache
+import threading
+import hashlib
+import sqlite3
+import json
+import time
+import os
+
+# 기본 보관 기간(초)과 디스크에 보관할 최대 응답 수
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+def serialize_prompt(prompt: Any) -> str:
+    """
+    LLM 입력(문자열, 메시지 딕셔너리 목록, 메시지 객체 목록)을 캐시 키용 문자열로 변환
+    """
+    if isinstance(prompt, str):
+        return prompt
+    if isinstance(prompt, BaseMessage):
+        prompt = [prompt]
+    if isinstance(prompt, (list, tuple)):
+        messages = []
+        for message in prompt:
+            if isinstance(message, BaseMessage):
+                messages.append({"role": message.type, "content": message.content})
+            elif isinstance(message, dict):
+                messages.append({"role": message.get("role"), "content": message.get("content")})
+            else:
+                messages.append({"role": None, "content": str(message)})
+        return json.dumps(messages, ensure_ascii=False, sort_keys=True)
+    return str(prompt)
+
+
+class LLMResponseCache:
+    """
+    (모델, 온도, 완성된 프롬프트)의 해시를 키로 LLM 응답을 저장하는 캐시
+    - 메모리 LRU에서 먼저 조회하고, 없으면 SQLite 파일에서 조회
+    - ttl_seconds가 지난 응답은 사용하지 않고 삭제
+    - 디스크 응답 수가 max_entries를 넘으면 가장 오래 사용되지 않은 응답부터 삭제
+    """
+
+    def __init__(self, cache_path: Optional[str] = "data/llm_cache/responses.sqlite",
+                 ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, memory_size: int = 256):
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # 메모리 LRU에는 (저장 시각, 응답)을 보관
+        self.memory = LRUCache(memory_size)
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = None
+        if cache_path:
+            cache_dir = os.path.dirname(cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, content TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used_at)")
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, temperature: Any, prompt: Any) -> str:
+        """모델 이름, 온도, 프롬프트 전체 내용으로 캐시 키 생성"""
+        payload = json.dumps([model_name, temperature, serialize_prompt(prompt)], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시된 응답 조회 (없거나 만료되었으면 None)"""
+        cached = self.memory.get(key)
+        if cached is not None:
+            created_at, content = cached
+            if not self._expired(created_at):
+                self.hits += 1
+                return content
+            self.memory.pop(key)
+
+        if self._conn is not None:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and self._expired(row[1]):
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    row = None
+                elif row:
+                    self._conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (time.time(), key))
+                    self._conn.commit()
+            if row:
+                self.memory.put(key, (row[1], row[0]))
+                self.hits += 1
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, model_name: str, content: str):
+        """응답 저장 (디스크 응답 수가 한도를 넘으면 오래 사용되지 않은 응답 삭제)"""
+        now = time.time()
+        self.memory.put(key, (now, content))
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model_name, content, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """만료된 응답과 한도를 넘는 오래된 응답 삭제 (잠금 안에서 호출)"""
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        """모든 캐시 삭제"""
+        self.memory.clear()
+        if self._conn is not None:
+            with self._lock:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+
+class CachedLLM:
+    """
+    LLM 클라이언트를 감싸 같은 (모델, 온도, 프롬프트) 요청은 캐시된 응답을 반환하는 래퍼
+    (캐시 적중 시 API를 호출하지 않고 response_metadata에 cache_hit를 표시하며, 그 밖의 속성은 원래 클라이언트로 전달)
+    """
+
+    def __init__(self, llm: Any, cache: LLMResponseCache):
+        self.llm = llm
+        self.cache = cache
+        self.model_name = getattr(llm, "model_name", None) or getattr(llm, "model", "unknown")
+        self.temperature = getattr(llm, "temperature", None)
+
+    def _key(self, prompt: Any) -> str:
+        return LLMResponseCache.make_key(self.model_name, self.temperature, prompt)
+
+    def invoke(self, prompt: Any, *args, **kwargs):
+        key = self._key(prompt)
+        content = self.cache.get(key)
+        if content is not None:
+            return AIMessage(content=content, response_metadata={"cache_hit": True})
+        response = self.llm.invoke(prompt, *args, **kwargs)
+        self.cache.put(key, self.model_name, response.content)
+        return response
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs):
+        key = self._key(prompt)
+        content = self.cache.get(key)
+        if content is not None:
+            return AIMessage(content=content, response_metadata={"cache_hit": True})
+        response = await self.llm.ainvoke(prompt, *args, **kwargs)
+        self.cache.put(key, self.model_name, response.content)
+        return response
+
+    def __getattr__(self, name: str):
+        return getattr(self.llm, name)
+
+
+def with_cache(llm: Any, cache: Optional[LLMResponseCache]):
+    """캐시가 지정된 경우에만 LLM 클라이언트를 캐시 래퍼로 감쌈"""
+    return CachedLLM(llm, cache) if cache is not None else llm
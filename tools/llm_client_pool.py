@@ -0,0 +1,131 @@
+#공유 LLM 클라이언트 풀 (모든 에이전트가 하나의 keep-alive HTTP 연결 풀과 요청 제한을 공유)
+from typing import Any, Dict, Optional, Tuple
+from langchain_openai import ChatOpenAI
+from tools.llm_limiter import LLMRateLimiter, RateLimitedLLM
+from tools.llm_trace import note_http_request
+from tools.fake_llm import FakeChatModel, RecordingLLM, RecordingStore, DEFAULT_RECORDING_PATH
+import threading
+import httpx
+import os
+
+# 모델 백엔드
+# - "openai": 실제 OpenAI API 호출
+# - "record": 실제 API를 호출하면서 응답을 녹화 파일에 저장
+# - "replay": 녹화된 응답을 재생 (녹화에 없는 프롬프트는 템플릿별 고정 응답)
+# - "fake": 네트워크 없이 템플릿별 고정 응답 (지연 시간 설정 가능)
+LLM_BACKENDS = ("openai", "record", "replay", "fake")
+# 네트워크 없이 동작하는 백엔드
+OFFLINE_BACKENDS = ("replay", "fake")
+
+class LLMClientPool:
+    """
+    에이전트별 ChatOpenAI 클라이언트를 만드는 공유 팩토리
+    - 모든 클라이언트가 하나의 httpx 연결 풀(동기/비동기 각각)을 사용하여
+      에이전트·진단마다 새 TLS 연결을 맺지 않고 keep-alive 연결을 재사용
+    - 온도는 에이전트마다 다르게 지정하고, 같은 (모델, 온도) 클라이언트는 재사용
+    - limiter가 있으면 모든 클라이언트가 같은 전역 요청/토큰 제한을 공유
+    - HTTP 요청마다 추적 기록에 요청 횟수를 남겨 OpenAI 클라이언트의 재시도 수를 집계
+    - backend로 모델 백엔드 선택 (지정하지 않으면 LLM_BACKEND 환경 변수, 기본값 "openai")
+      오프라인 백엔드의 지연 시간은 fake_latency(초, 기본값 FAKE_LLM_LATENCY 환경 변수 또는 0)로 지정
+      ("replay"에서 None이면 녹화된 실제 지연 시간 재현)
+    비동기 연결 풀은 처음 사용한 이벤트 루프에 묶이므로, 한 프로세스에서 asyncio.run을
+    여러 번 호출할 때는 실행마다 풀을 새로 만들어야 함
+    """
+
+    def __init__(self, limiter: Optional[LLMRateLimiter] = None, max_connections: int = 32,
+                 max_keepalive_connections: int = 16, keepalive_expiry: float = 60.0,
+                 timeout: float = 120.0, max_retries: int = 2, backend: Optional[str] = None,
+                 fake_latency: Optional[float] = None, fake_jitter: float = 0.0,
+                 recording_path: Optional[str] = None):
+        self.backend = backend or os.getenv("LLM_BACKEND", "openai")
+        if self.backend not in LLM_BACKENDS:
+            raise ValueError(f"지원하지 않는 LLM 백엔드입니다: {self.backend} (지원: {', '.join(LLM_BACKENDS)})")
+        if fake_latency is None and os.getenv("FAKE_LLM_LATENCY"):
+            fake_latency = float(os.getenv("FAKE_LLM_LATENCY"))
+        if fake_latency is None and self.backend == "fake":
+            fake_latency = 0.0
+        self.fake_latency = fake_latency
+        self.fake_jitter = fake_jitter
+        self.recordings = None
+        if self.backend in ("record", "replay"):
+            self.recordings = RecordingStore(recording_path or os.getenv("LLM_RECORDING_PATH", DEFAULT_RECORDING_PATH))
+            if self.backend == "replay":
+                print(f"📼 녹화된 LLM 응답 {len(self.recordings)}개를 재생합니다: {self.recordings.path}")
+        self.limiter = limiter
+        self.max_retries = max_retries
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http_client = httpx.Client(
+            limits=limits, timeout=timeout, event_hooks={"request": [self._on_request]}
+        )
+        self.http_async_client = httpx.AsyncClient(
+            limits=limits, timeout=timeout, event_hooks={"request": [self._aon_request]}
+        )
+        self._clients: Dict[Tuple[str, float], Any] = {}
+        self._lock = threading.Lock()
+
+    def _on_request(self, request: httpx.Request):
+        note_http_request()
+
+    async def _aon_request(self, request: httpx.Request):
+        note_http_request()
+
+    def chat(self, model_name: str = "gpt-4o-mini", temperature: float = 0.2) -> Any:
+        """
+        (모델, 온도)별 LLM 클라이언트 반환 (공유 연결 풀 사용, 요청 제한 적용)
+
+        Args:
+            model_name: 모델 이름
+            temperature: 에이전트별 온도
+
+        Returns:
+            invoke/ainvoke를 제공하는 LLM 클라이언트
+        """
+        key = (model_name, temperature)
+        with self._lock:
+            if key not in self._clients:
+                llm = self._create_llm(model_name, temperature)
+                self._clients[key] = RateLimitedLLM(llm, self.limiter) if self.limiter else llm
+            return self._clients[key]
+
+    @property
+    def offline(self) -> bool:
+        """네트워크 없이 동작하는 백엔드인지 여부"""
+        return self.backend in OFFLINE_BACKENDS
+
+    def _create_llm(self, model_name: str, temperature: float) -> Any:
+        """백엔드에 맞는 LLM 클라이언트 생성"""
+        if self.offline:
+            return FakeChatModel(
+                model_name, temperature, latency=self.fake_latency, jitter=self.fake_jitter,
+                recordings=self.recordings
+            )
+        llm = ChatOpenAI(
+            model=model_name,
+            temperature=temperature,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
+            max_retries=self.max_retries
+        )
+        return RecordingLLM(llm, self.recordings) if self.backend == "record" else llm
+
+    def close(self):
+        """동기 연결 풀 종료"""
+        self.http_client.close()
+
+    async def aclose(self):
+        """동기/비동기 연결 풀 종료"""
+        self.http_client.close()
+        await self.http_async_client.aclose()
+
+
+def create_chat_llm(model_name: str, temperature: float, client_pool: Optional[LLMClientPool] = None) -> Any:
+    """
+    에이전트용 LLM 클라이언트 생성 (공유 풀이 있으면 풀에서, 없으면 개별 ChatOpenAI)
+    """
+    if client_pool is not None:
+        return client_pool.chat(model_name, temperature)
+    return ChatOpenAI(model=model_name, temperature=temperature)
@@ -0,0 +1,166 @@
+#LLM 요청 제한 도구 (여러 진단이 공유하는 동시 요청 수/분당 요청 수/분당 토큰 수 제한)
+from typing import Any, Optional
+from tools.llm_cache import serialize_prompt
+import threading
+import asyncio
+import time
+
+def estimate_tokens(prompt: Any) -> int:
+    """
+    프롬프트 토큰 수 추정 (토크나이저 없이 사용하는 근사값)
+    영문/숫자는 약 4자당 1토큰, 한글 등 비ASCII 문자는 약 1자당 1토큰으로 계산
+    """
+    text = serialize_prompt(prompt)
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return max(1, ascii_chars // 4 + (len(text) - ascii_chars))
+
+
+class TokenBucket:
+    """
+    분당 한도로 채워지는 토큰 버킷 (잠금은 LLMRateLimiter가 관리)
+    - capacity만큼 몰아서 사용할 수 있고, 이후에는 분당 한도 속도로 다시 채워짐
+    - 남은 양보다 많이 예약하면 잔량이 음수가 되고, 다시 0이 될 때까지 기다려야 함
+      (한 번의 요청이 capacity보다 커도 대기 후 진행)
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        # 기본 버스트 크기: 10초 분량
+        self.capacity = capacity or max(1.0, per_minute / 6.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """amount만큼 예약하고 기다려야 할 시간(초) 반환"""
+        self._refill()
+        self.tokens -= amount
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def adjust(self, amount: float):
+        """예약량 보정 (실제 사용량이 추정보다 많으면 양수, 적으면 음수)"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class LLMRateLimiter:
+    """
+    모든 에이전트와 모든 진단이 공유하는 전역 LLM 요청 제한
+    - 동시에 진행 중인 요청 수 제한 (max_concurrency)
+    - 분당 요청 수 제한 (requests_per_minute, 토큰 버킷)
+    - 분당 토큰 수 제한 (tokens_per_minute, 프롬프트 추정 토큰 + 예상 응답 토큰으로 예약하고
+      응답의 실제 사용량으로 보정)
+    동기 호출(스레드)과 비동기 호출(이벤트 루프)에서 같은 한도를 공유
+    """
+
+    def __init__(self, max_concurrency: int = 8, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, expected_completion_tokens: int = 800):
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.expected_completion_tokens = expected_completion_tokens
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._active = 0
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+
+    def _reserve_start(self, tokens: int = 0) -> float:
+        """요청 1건과 토큰을 예약 (잠금 안에서 호출), 기다려야 할 시간(초) 반환"""
+        delay = 0.0
+        if self._requests is not None:
+            delay = self._requests.reserve(1)
+        if self._tokens is not None and tokens:
+            delay = max(delay, self._tokens.reserve(tokens))
+        return delay
+
+    def estimate(self, prompt: Any) -> int:
+        """요청 한 건이 사용할 토큰 수 추정 (분당 토큰 제한이 없으면 0)"""
+        if self._tokens is None:
+            return 0
+        return estimate_tokens(prompt) + self.expected_completion_tokens
+
+    def record_usage(self, estimated: int, actual: Optional[int]):
+        """응답의 실제 토큰 사용량으로 예약량 보정"""
+        if self._tokens is None or not estimated or actual is None:
+            return
+        with self._lock:
+            self._tokens.adjust(actual - estimated)
+
+    def _try_acquire(self) -> bool:
+        """동시 요청 슬롯을 바로 얻을 수 있으면 얻음 (잠금 안에서 호출)"""
+        if self._active < self.max_concurrency:
+            self._active += 1
+            return True
+        return False
+
+    def acquire(self, tokens: int = 0):
+        """동기 호출용 슬롯 획득 (슬롯과 요청/토큰 한도가 허용될 때까지 대기)"""
+        with self._lock:
+            while not self._try_acquire():
+                self._released.wait()
+            delay = self._reserve_start(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: int = 0):
+        """비동기 호출용 슬롯 획득 (이벤트 루프를 막지 않고 대기)"""
+        while True:
+            with self._lock:
+                if self._try_acquire():
+                    delay = self._reserve_start(tokens)
+                    break
+            # 슬롯이 빌 때까지 짧게 양보 (동기 호출과 같은 카운터를 공유하므로 폴링)
+            await asyncio.sleep(0.01)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def release(self):
+        """슬롯 반환"""
+        with self._lock:
+            self._active -= 1
+            self._released.notify()
+
+
+def _total_tokens(response: Any) -> Optional[int]:
+    """응답 메시지의 실제 토큰 사용량 (제공되지 않으면 None)"""
+    usage = getattr(response, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+
+class RateLimitedLLM:
+    """
+    LLM 클라이언트를 감싸 invoke/ainvoke 호출이 공유 제한을 지키도록 하는 래퍼
+    (그 밖의 속성은 원래 클라이언트로 전달)
+    """
+
+    def __init__(self, llm: Any, limiter: LLMRateLimiter):
+        self.llm = llm
+        self.limiter = limiter
+
+    def invoke(self, prompt: Any, *args, **kwargs):
+        tokens = self.limiter.estimate(prompt)
+        self.limiter.acquire(tokens)
+        try:
+            response = self.llm.invoke(prompt, *args, **kwargs)
+        finally:
+            self.limiter.release()
+        self.limiter.record_usage(tokens, _total_tokens(response))
+        return response
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs):
+        tokens = self.limiter.estimate(prompt)
+        await self.limiter.aacquire(tokens)
+        try:
+            response = await self.llm.ainvoke(prompt, *args, **kwargs)
+        finally:
+            self.limiter.release()
+        self.limiter.record_usage(tokens, _total_tokens(response))
+        return response
+
+    def __getattr__(self, name: str):
+        return getattr(self.llm, name)
@@ -0,0 +1,354 @@
+#LLM 호출 추적 도구 (호출별 토큰·지연 시간·캐시 적중·재시도 기록, 노드/실행 단위 집계)
+from typing import Any, Dict, List, Optional
+from contextvars import ContextVar
+from contextlib import contextmanager
+from tools.llm_limiter import estimate_tokens
+from tools.llm_cache import CachedLLM, serialize_prompt
+import functools
+import threading
+import asyncio
+import json
+import time
+import os
+
+# 현재 진단 실행, 그래프 노드, 프롬프트 템플릿, 진행 중인 LLM 호출 기록
+# (비동기 작업과 작업 그래프 스레드에 자동 전달되므로 에이전트 코드에서 따로 넘길 필요 없음)
+_current_run: ContextVar[Optional["RunTrace"]] = ContextVar("llm_trace_run", default=None)
+_current_node: ContextVar[Optional[str]] = ContextVar("llm_trace_node", default=None)
+_current_template: ContextVar[Optional[str]] = ContextVar("llm_trace_template", default=None)
+_current_call: ContextVar[Optional[Dict[str, Any]]] = ContextVar("llm_trace_call", default=None)
+
+
+class RunTrace:
+    """
+    진단 한 건의 LLM 호출 기록
+    - calls: 호출별 (노드, 템플릿, 입력/출력 토큰, 지연 시간, 캐시 적중, 재시도 수)
+    - nodes: 노드별 실행 시간
+    토큰 합계는 실제로 API를 호출한 요청만 포함 (캐시 적중은 호출 수만 집계)
+    """
+
+    def __init__(self, run_id: str, service_name: Optional[str] = None):
+        self.run_id = run_id
+        self.service_name = service_name
+        self.started_at = time.time()
+        self.elapsed_seconds: Optional[float] = None
+        self.calls: List[Dict[str, Any]] = []
+        self.nodes: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add_call(self, record: Dict[str, Any]):
+        with self._lock:
+            self.calls.append(record)
+
+    def add_node(self, node: str, seconds: float, error: Optional[Exception] = None):
+        with self._lock:
+            self.nodes.append({
+                "node": node,
+                "seconds": round(seconds, 3),
+                "status": "failed" if error else "completed",
+                **({"error": f"{type(error).__name__}: {error}"} if error else {})
+            })
+
+    def _aggregate(self, key: str) -> Dict[str, Dict[str, Any]]:
+        """호출 기록을 key(node 또는 template)별로 집계"""
+        groups: Dict[str, Dict[str, Any]] = {}
+        for call in self.calls:
+            group = groups.setdefault(call.get(key) or "-", {
+                "calls": 0, "cache_hits": 0, "retries": 0, "errors": 0,
+                "input_tokens": 0, "output_tokens": 0, "llm_seconds": 0.0, "max_latency": 0.0
+            })
+            group["calls"] += 1
+            group["retries"] += call.get("retries") or 0
+            group["llm_seconds"] += call["latency"]
+            group["max_latency"] = max(group["max_latency"], call["latency"])
+            if call.get("error"):
+                group["errors"] += 1
+            if call.get("cache") == "hit":
+                group["cache_hits"] += 1
+            else:
+                group["input_tokens"] += call.get("input_tokens") or 0
+                group["output_tokens"] += call.get("output_tokens") or 0
+        for group in groups.values():
+            group["llm_seconds"] = round(group["llm_seconds"], 3)
+            group["max_latency"] = round(group["max_latency"], 3)
+        return groups
+
+    def summary(self) -> Dict[str, Any]:
+        """노드별·템플릿별·전체 집계"""
+        by_node = self._aggregate("node")
+        for node in self.nodes:
+            by_node.setdefault(node["node"], {"calls": 0, "cache_hits": 0, "retries": 0, "errors": 0,
+                                              "input_tokens": 0, "output_tokens": 0,
+                                              "llm_seconds": 0.0, "max_latency": 0.0})
+            # 피드백 루프로 같은 노드가 여러 번 실행될 수 있으므로 누적
+            by_node[node["node"]]["node_seconds"] = round(
+                by_node[node["node"]].get("node_seconds", 0.0) + node["seconds"], 3
+            )
+        by_template = self._aggregate("template")
+        totals = {
+            name: sum(group[name] for group in by_template.values())
+            for name in ("calls", "cache_hits", "retries", "errors", "input_tokens", "output_tokens")
+        }
+        totals["llm_seconds"] = round(sum(call["latency"] for call in self.calls), 3)
+        totals["wall_seconds"] = round(self.elapsed_seconds if self.elapsed_seconds is not None
+                                       else time.time() - self.started_at, 3)
+        return {"by_node": by_node, "by_template": by_template, "totals": totals}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "service_name": self.service_name,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "summary": self.summary(),
+            "nodes": self.nodes,
+            "calls": self.calls
+        }
+
+    def save(self, path: str) -> str:
+        """추적 결과를 JSON 파일로 저장"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def format_table(self) -> str:
+        """노드별·템플릿별 요약 표 (마크다운)"""
+        summary = self.summary()
+        header = "| {} | 호출 | 캐시 적중 | 재시도 | 입력 토큰 | 출력 토큰 | LLM 시간(초) | 최대 지연(초) |"
+        lines = []
+        for title, key in (("노드", "by_node"), ("템플릿", "by_template")):
+            groups = summary[key]
+            # 노드 표에는 노드 실행 시간(병렬 호출이 겹친 실제 소요 시간)을 함께 표시
+            with_node_time = key == "by_node"
+            lines.append(header.format(title) + (" 노드 시간(초) |" if with_node_time else ""))
+            lines.append("|---|---:|---:|---:|---:|---:|---:|---:|" + ("---:|" if with_node_time else ""))
+            # 토큰을 가장 많이 사용한 항목부터 표시
+            for name, group in sorted(groups.items(), key=lambda item: -(item[1]["input_tokens"] + item[1]["output_tokens"])):
+                line = (
+                    f"| {name} | {group['calls']} | {group['cache_hits']} | {group['retries']} | "
+                    f"{group['input_tokens']:,} | {group['output_tokens']:,} | "
+                    f"{group['llm_seconds']:.1f} | {group['max_latency']:.1f} |"
+                )
+                if with_node_time:
+                    line += f" {group.get('node_seconds', 0.0):.1f} |"
+                lines.append(line)
+            lines.append("")
+        totals = summary["totals"]
+        lines.append(
+            f"합계: 호출 {totals['calls']}회 (캐시 적중 {totals['cache_hits']}회, 재시도 {totals['retries']}회), "
+            f"입력 {totals['input_tokens']:,} / 출력 {totals['output_tokens']:,} 토큰, "
+            f"LLM 시간 {totals['llm_seconds']:.1f}초 / 전체 {totals['wall_seconds']:.1f}초"
+        )
+        return "\n".join(lines)
+
+
+@contextmanager
+def run_trace(run_id: str, service_name: Optional[str] = None):
+    """
+    진단 한 건의 추적 범위 (이 안에서 실행되는 모든 LLM 호출과 노드를 기록)
+
+    Yields:
+        RunTrace
+    """
+    trace = RunTrace(run_id, service_name)
+    token = _current_run.set(trace)
+    started_at = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        trace.elapsed_seconds = time.perf_counter() - started_at
+        _current_run.reset(token)
+
+def trace_path_for(report_filepath: str) -> str:
+    """보고서 파일 옆에 저장할 추적 파일 경로 (report.md → report.trace.json)"""
+    return os.path.splitext(report_filepath)[0] + ".trace.json"
+
+
+class llm_template:
+    """
+    이후 LLM 호출에 프롬프트 템플릿 이름을 지정 (함수 데코레이터 또는 with 문으로 사용)
+
+    사용 예:
+        @llm_template("DEEP_DIVE_PROMPT")
+        def deep_dive_analysis(...): ...
+
+        with llm_template("FINAL_ANALYSIS_PROMPT"):
+            response = self.llm.invoke(prompt)
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tokens = []
+
+    def __enter__(self):
+        self._tokens.append(_current_template.set(self.name))
+        return self
+
+    def __exit__(self, *exc_info):
+        _current_template.reset(self._tokens.pop())
+        return False
+
+    def __call__(self, func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                token = _current_template.set(self.name)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _current_template.reset(token)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            token = _current_template.set(self.name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _current_template.reset(token)
+        return wrapper
+
+def current_template() -> Optional[str]:
+    """현재 지정된 프롬프트 템플릿 이름"""
+    return _current_template.get()
+
+def traced_node(name: str, func):
+    """그래프 노드 함수를 감싸 노드 이름을 지정하고 실행 시간을 기록 (동기/비동기 모두 지원)"""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(state):
+            token = _current_node.set(name)
+            started_at = time.perf_counter()
+            error = None
+            try:
+                return await func(state)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                _current_node.reset(token)
+                trace = _current_run.get()
+                if trace is not None:
+                    trace.add_node(name, time.perf_counter() - started_at, error)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(state):
+        token = _current_node.set(name)
+        started_at = time.perf_counter()
+        error = None
+        try:
+            return func(state)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            _current_node.reset(token)
+            trace = _current_run.get()
+            if trace is not None:
+                trace.add_node(name, time.perf_counter() - started_at, error)
+    return wrapper
+
+
+def note_http_request():
+    """
+    진행 중인 호출의 HTTP 요청 횟수 기록 (공유 연결 풀의 요청 이벤트에서 호출)
+    같은 호출의 두 번째 요청부터는 OpenAI 클라이언트의 재시도
+    """
+    call = _current_call.get()
+    if call is not None:
+        call["http_requests"] = call.get("http_requests", 0) + 1
+
+
+class TracedLLM:
+    """
+    LLM 클라이언트를 감싸 호출마다 토큰 수·지연 시간·캐시 적중·재시도 수를 현재 실행 추적에 기록하는 래퍼
+    (추적 중인 실행이 없으면 그대로 전달, 그 밖의 속성은 원래 클라이언트로 전달)
+    - 토큰 수는 응답의 usage_metadata를 사용하고, 없으면(캐시 적중 등) 문자 수로 추정
+    - 캐시 적중은 CachedLLM이 응답의 response_metadata에 남긴 표시로 판단
+    - 재시도 수는 공유 연결 풀(LLMClientPool)을 사용할 때만 기록 (그 밖에는 None)
+    """
+
+    def __init__(self, llm: Any):
+        self.llm = llm
+        self.model_name = getattr(llm, "model_name", None) or getattr(llm, "model", "unknown")
+        self.temperature = getattr(llm, "temperature", None)
+
+    def _start(self, prompt: Any) -> Optional[Dict[str, Any]]:
+        if _current_run.get() is None:
+            return None
+        return {
+            "node": _current_node.get(),
+            "template": _current_template.get(),
+            "model": self.model_name,
+            "started_at": round(time.time() - _current_run.get().started_at, 3),
+            "prompt_chars": len(serialize_prompt(prompt))
+        }
+
+    def _finish(self, call: Dict[str, Any], prompt: Any, response: Any, started_at: float,
+                error: Optional[Exception] = None):
+        call["latency"] = round(time.perf_counter() - started_at, 3)
+        if response is not None and getattr(response, "response_metadata", {}).get("cache_hit"):
+            call["cache"] = "hit"
+        else:
+            call["cache"] = "miss" if isinstance(self.llm, CachedLLM) else None
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage:
+            call["input_tokens"] = usage.get("input_tokens", 0)
+            call["output_tokens"] = usage.get("output_tokens", 0)
+            call["token_source"] = "usage"
+        else:
+            call["input_tokens"] = estimate_tokens(serialize_prompt(prompt))
+            call["output_tokens"] = estimate_tokens(response.content) if response is not None else 0
+            call["token_source"] = "estimate"
+        requests = call.pop("http_requests", None)
+        call["retries"] = max(0, requests - 1) if requests is not None else None
+        if error is not None:
+            call["error"] = f"{type(error).__name__}: {error}"
+        _current_run.get().add_call(call)
+
+    def invoke(self, prompt: Any, *args, **kwargs):
+        call = self._start(prompt)
+        if call is None:
+            return self.llm.invoke(prompt, *args, **kwargs)
+        token = _current_call.set(call)
+        started_at = time.perf_counter()
+        response = None
+        error = None
+        try:
+            response = self.llm.invoke(prompt, *args, **kwargs)
+            return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            _current_call.reset(token)
+            self._finish(call, prompt, response, started_at, error)
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs):
+        call = self._start(prompt)
+        if call is None:
+            return await self.llm.ainvoke(prompt, *args, **kwargs)
+        token = _current_call.set(call)
+        started_at = time.perf_counter()
+        response = None
+        error = None
+        try:
+            response = await self.llm.ainvoke(prompt, *args, **kwargs)
+            return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            _current_call.reset(token)
+            self._finish(call, prompt, response, started_at, error)
+
+    def __getattr__(self, name: str):
+        return getattr(self.llm, name)
+
+
+def traced(llm: Any) -> TracedLLM:
+    """LLM 클라이언트를 추적 래퍼로 감쌈 (캐시 적중도 기록되도록 가장 바깥에 적용)"""
+    return TracedLLM(llm)
@@ -0,0 +1,45 @@
+#메모리 LRU 캐시
+from typing import Any, Optional
+from collections import OrderedDict
+import threading
+
+class LRUCache:
+    """
+    최근에 사용된 항목만 정해진 개수까지 유지하는 스레드 안전 메모리 캐시
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """항목 조회 (없으면 None), 조회된 항목은 가장 최근 사용으로 이동"""
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key: str, value: Any):
+        """항목 저장, 최대 개수를 넘으면 가장 오래된 항목 제거"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def pop(self, key: str):
+        """항목 제거"""
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        """모든 항목 제거"""
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,129 @@
+#프롬프트 컨텍스트 도구 (상태 조각을 단계별로 한 번만 간결하게 직렬화하고 프롬프트별 토큰 예산 적용)
+from typing import Any, Dict, Optional, Sequence, Tuple
+from contextvars import ContextVar
+from tools.llm_limiter import estimate_tokens
+import functools
+import asyncio
+import json
+
+# 프롬프트 하나에 넣을 상태 조각 하나의 기본 토큰 예산
+DEFAULT_TOKEN_BUDGET = 1500
+
+# 상태 조각별로 프롬프트에 자주 넣는 요약 필드
+# (도메인 어댑터가 추가한 domain_specific_info, 심층 분석 원문, 가이드라인 검색 근거처럼 큰 필드는 제외)
+SERVICE_SUMMARY_FIELDS = (
+    "service_name", "service_provider", "target_functionality", "data_types",
+    "decision_processes", "technical_architecture", "user_groups", "deployment_context"
+)
+RISK_SUMMARY_FIELDS = ("risk_areas", "overall_risk_score")
+RECOMMENDATION_SUMMARY_FIELDS = ("high_priority", "medium_priority", "low_priority")
+
+# 예산을 넘을 때 차례로 적용할 축약 단계 (문자열 최대 길이, 목록 최대 항목 수)
+SHRINK_STEPS = ((600, 10), (300, 6), (150, 4), (80, 2))
+
+def compact_json(value: Any) -> str:
+    """들여쓰기·공백 없이 직렬화 (indent=2 대비 토큰 수 절감)"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+def select_fields(value: Any, fields: Optional[Sequence[str]]) -> Any:
+    """딕셔너리에서 프롬프트에 필요한 필드만 선택 (fields가 없으면 전체)"""
+    if fields is None or not isinstance(value, dict):
+        return value
+    return {key: value[key] for key in fields if key in value}
+
+def _shrink(value: Any, max_chars: int, max_items: int) -> Any:
+    """긴 문자열과 목록을 잘라 축약 (잘린 부분은 '…'로 표시)"""
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else value[:max_chars] + "…"
+    if isinstance(value, list):
+        items = [_shrink(item, max_chars, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"…외 {len(value) - max_items}개")
+        return items
+    if isinstance(value, dict):
+        return {key: _shrink(item, max_chars, max_items) for key, item in value.items()}
+    return value
+
+def fit_to_budget(value: Any, max_tokens: Optional[int] = DEFAULT_TOKEN_BUDGET) -> str:
+    """
+    토큰 예산 안에 들어오도록 직렬화
+
+    Args:
+        value: 직렬화할 값
+        max_tokens: 최대 토큰 수 (없으면 제한 없음)
+
+    Returns:
+        간결한 JSON 문자열 (예산을 넘으면 문자열/목록을 단계적으로 축약하고, 그래도 넘으면 뒷부분을 잘라냄)
+    """
+    text = compact_json(value)
+    if max_tokens is None or estimate_tokens(text) <= max_tokens:
+        return text
+    for max_chars, max_items in SHRINK_STEPS:
+        text = compact_json(_shrink(value, max_chars, max_items))
+        if estimate_tokens(text) <= max_tokens:
+            return text
+    # 축약으로도 부족하면 예산 비율만큼 앞부분만 사용
+    while estimate_tokens(text) > max_tokens:
+        text = text[:int(len(text) * max_tokens / estimate_tokens(text) * 0.95)]
+    return text + "…"
+
+
+class PromptContext:
+    """
+    한 단계(노드 실행) 동안 상태 조각의 직렬화 결과를 재사용하는 저장소
+    (같은 객체·필드·예산 조합은 한 번만 직렬화, 객체 참조를 함께 보관하여 id 재사용 방지)
+    """
+
+    def __init__(self):
+        self._rendered: Dict[Tuple, Tuple[Any, str]] = {}
+
+    def render(self, value: Any, fields: Optional[Sequence[str]] = None,
+               max_tokens: Optional[int] = DEFAULT_TOKEN_BUDGET) -> str:
+        key = (id(value), tuple(fields) if fields is not None else None, max_tokens)
+        cached = self._rendered.get(key)
+        if cached is not None and cached[0] is value:
+            return cached[1]
+        text = fit_to_budget(select_fields(value, fields), max_tokens)
+        self._rendered[key] = (value, text)
+        return text
+
+
+# 현재 실행 중인 단계의 컨텍스트 (비동기 작업과 작업 그래프 스레드에 자동 전달)
+_current_context: ContextVar[Optional[PromptContext]] = ContextVar("prompt_context", default=None)
+
+def render_context(value: Any, fields: Optional[Sequence[str]] = None,
+                   max_tokens: Optional[int] = DEFAULT_TOKEN_BUDGET) -> str:
+    """
+    프롬프트용 상태 조각 직렬화 (필요한 필드만, 간결한 JSON, 토큰 예산 적용)
+    prompt_stage로 감싼 단계 안에서는 같은 조각을 한 번만 직렬화
+
+    Args:
+        value: 상태 조각 (service_analysis, risk_assessment 등)
+        fields: 프롬프트에 필요한 필드 (없으면 전체)
+        max_tokens: 토큰 예산 (없으면 제한 없음)
+    """
+    context = _current_context.get()
+    if context is None:
+        return fit_to_budget(select_fields(value, fields), max_tokens)
+    return context.render(value, fields, max_tokens)
+
+def prompt_stage(func):
+    """에이전트 단계(노드) 함수를 감싸 실행 동안 하나의 PromptContext를 사용 (동기/비동기 모두 지원)"""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            token = _current_context.set(PromptContext())
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _current_context.reset(token)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current_context.set(PromptContext())
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_context.reset(token)
+    return wrapper
@@ -32,7 +32,8 @@ class ReportFormatter:
 
 **생성일시**: {date}  
 **분석 도메인**: {domain_info}  
-**중점 분석 요소**: {domain_focus}
+**중점 분석 요소**: {domain_focus}  
+**종합 리스크 점수**: {overall_risk_score}/10
 
 ## SUMMARY
 
@@ -90,6 +91,10 @@ class ReportFormatter:
 
 {conclusion}
 
+## 부록. 시각화 제안
+
+{visualization_suggestions}
+
 ---
 *본 보고서는 자동화된 AI 윤리성 리스크 진단 시스템에 의해 생성되었습니다.*
 """
@@ -102,3 +107,138 @@ class ReportFormatter:
                 print(f"⚠️ 템플릿 파일 로드 오류: {str(e)}")
                 # 기본 템플릿 사용
                 markdown_template = "# {service_name} 윤리성 리스크 진단 보고서\n"
+        
+        # 템플릿에 없는 값은 빈 문자열로 채워 사용자 템플릿의 누락 항목에도 실패하지 않도록 함
+        report = markdown_template.format_map(_DefaultDict(content))
+        # 빈 항목으로 생긴 연속 빈 줄 정리
+        return re.sub(r"\n{3,}", "\n\n", report).strip() + "\n"
+
+    def build_report_content(self, service_name: str, domain_info: str, domain_focus: str,
+                             sections: Dict[str, str], risk_assessment: Dict[str, Any],
+                             recommendations: Dict[str, Any],
+                             transitions: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        작성된 섹션과 평가/권고안 데이터를 템플릿 항목으로 변환
+        
+        Args:
+            service_name: 서비스 이름
+            domain_info: 도메인 정보
+            domain_focus: 중점 분석 요소
+            sections: 섹션 이름 → LLM이 작성한 섹션 본문
+                      (executive_summary, introduction, service_overview, risk_assessment_section,
+                       compliance_section, recommendations_section, conclusion, visualization_suggestions)
+            risk_assessment: 윤리 리스크 평가 결과
+            recommendations: 개선 권고안
+            transitions: 섹션 이름 → 섹션 앞에 넣을 연결 문장 (선택)
+            
+        Returns:
+            format_markdown에 전달할 보고서 내용
+        """
+        transitions = transitions or {}
+        
+        def section(name: str, base_level: int = 3) -> str:
+            body = self.normalize_section(sections.get(name, ""), base_level)
+            transition = transitions.get(name, "").strip()
+            return f"{transition}\n\n{body}" if transition else body
+        
+        risk_areas = risk_assessment.get("risk_areas", {})
+        scores = [area.get("score", 0) for area in risk_areas.values() if isinstance(area, dict)]
+        overall_score = risk_assessment.get("overall_risk_score") or (
+            round(sum(scores) / len(scores), 1) if scores else "N/A"
+        )
+        
+        content = {
+            "service_name": service_name,
+            "date": datetime.now().strftime("%Y년 %m월 %d일 %H:%M"),
+            "domain_info": domain_info,
+            "domain_focus": domain_focus,
+            "overall_risk_score": overall_score,
+            "executive_summary": section("executive_summary"),
+            "introduction": section("introduction"),
+            "service_overview": section("service_overview"),
+            # 템플릿의 3.x/5.x 하위 절과 겹치지 않도록 두 섹션의 소제목은 한 단계 더 내림
+            "risk_assessment": section("risk_assessment_section", base_level=4),
+            "compliance_section": section("compliance_section"),
+            "recommendations_section": section("recommendations_section", base_level=4),
+            "conclusion": section("conclusion"),
+            "visualization_suggestions": section("visualization_suggestions")
+        }
+        
+        # 윤리적 측면별 점수와 근거
+        for aspect in ["bias", "privacy", "transparency", "accountability"]:
+            area = risk_areas.get(aspect, {})
+            content[f"{aspect}_score"] = area.get("score", "N/A")
+            content[f"{aspect}_assessment"] = self._format_risk_area(area)
+        
+        # 우선순위별 권고안 목록
+        complexity = recommendations.get("implementation_complexity", {})
+        for priority in ["high", "medium", "low"]:
+            content[f"{priority}_priority_recommendations"] = self._format_recommendations(
+                recommendations.get(f"{priority}_priority", []), complexity
+            )
+        
+        return content
+
+    @staticmethod
+    def normalize_section(text: str, base_level: int = 3) -> str:
+        """
+        LLM이 작성한 섹션 본문을 템플릿에 맞게 정리
+        (템플릿이 이미 섹션 제목을 가지므로 맨 앞 제목 줄은 제거하고, 하위 제목은 base_level 이하로 조정)
+        """
+        lines = (text or "").strip().splitlines()
+        if lines and re.match(r"#{1,6}\s", lines[0]):
+            lines = lines[1:]
+        
+        # 코드 블록 밖의 제목 수준 확인
+        in_code = False
+        heading_lines = []
+        for i, line in enumerate(lines):
+            if line.lstrip().startswith("```"):
+                in_code = not in_code
+            elif not in_code and re.match(r"#{1,6}\s", line):
+                heading_lines.append(i)
+        
+        if heading_lines:
+            min_level = min(len(lines[i]) - len(lines[i].lstrip("#")) for i in heading_lines)
+            shift = max(0, base_level - min_level)
+            for i in heading_lines:
+                level = len(lines[i]) - len(lines[i].lstrip("#"))
+                lines[i] = "#" * min(level + shift, 6) + lines[i][level:]
+        
+        return "\n".join(lines).strip()
+
+    def _format_risk_area(self, area: Dict[str, Any]) -> str:
+        """리스크 영역의 상세 설명과 근거를 마크다운으로 변환"""
+        parts = []
+        if area.get("details"):
+            parts.append(str(area["details"]))
+        evidence = area.get("evidence", [])
+        if isinstance(evidence, str):
+            evidence = [evidence]
+        if evidence:
+            parts.append("**근거:**\n" + "\n".join(f"- {item}" for item in evidence))
+        return "\n\n".join(parts) or "상세 평가 정보 없음"
+
+    def _format_recommendations(self, items: List[Any], complexity: Dict[str, Any]) -> str:
+        """권고안 목록을 마크다운 목록으로 변환 (구현 복잡도가 있으면 함께 표시)"""
+        if not items:
+            return "해당 없음"
+        
+        lines = []
+        for item in items:
+            if isinstance(item, dict):
+                text = item.get("recommendation") or item.get("title") or json.dumps(item, ensure_ascii=False)
+            else:
+                text = str(item)
+            level = complexity.get(text) if isinstance(complexity, dict) else None
+            if isinstance(level, dict):
+                level = level.get("complexity") or level.get("level")
+            lines.append(f"- {text}" + (f" (구현 복잡도: {level})" if level else ""))
+        return "\n".join(lines)
+
+
+class _DefaultDict(dict):
+    """템플릿에 없는 키를 빈 문자열로 채우는 딕셔너리"""
+
+    def __missing__(self, key):
+        return ""
@@ -0,0 +1,214 @@
+#구조화 출력 도구 (JSON 모드 요청, 스키마 검증, 잘못된 부분만 다시 요청하는 복구)
+from typing import Any, Dict, List, Optional, Tuple
+from tools.llm_trace import llm_template, current_template
+import json
+import re
+
+# OpenAI JSON 모드 (응답이 항상 하나의 JSON 객체가 되도록 요청)
+JSON_MODE = {"type": "json_object"}
+
+# 스키마 타입 → 프롬프트에 보여줄 자리표시자
+TYPE_LABELS = {str: "문자열", int: "숫자", float: "숫자", list: "목록", dict: "객체", bool: "true/false"}
+
+def extract_json(content: str) -> Optional[Dict[str, Any]]:
+    """
+    응답 텍스트에서 첫 번째 JSON 객체 추출
+    (코드 블록 표시를 제거하고, 앞뒤 설명 문장이 있어도 '{' 위치마다 디코딩을 시도)
+
+    Returns:
+        JSON 객체 (찾지 못하면 None)
+    """
+    text = re.sub(r"```(?:json)?", "", content or "").strip()
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"\{", text):
+        try:
+            result, _ = decoder.raw_decode(text, match.start())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(result, dict):
+            return result
+    return None
+
+def _get_path(data: Any, path: Tuple[str, ...]) -> Any:
+    """중첩 딕셔너리에서 경로의 값 조회 (없으면 None)"""
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+def _set_path(data: Dict[str, Any], path: Tuple[str, ...], value: Any):
+    """중첩 딕셔너리의 경로에 값 설정 (중간 항목이 없거나 객체가 아니면 새로 만듦)"""
+    for key in path[:-1]:
+        if not isinstance(data.get(key), dict):
+            data[key] = {}
+        else:
+            data[key] = dict(data[key])
+        data = data[key]
+    data[path[-1]] = value
+
+def describe_schema(schema: Any) -> Any:
+    """스키마를 LLM에 보여줄 예시 구조로 변환"""
+    if isinstance(schema, dict):
+        return {key: describe_schema(value) for key, value in schema.items()}
+    types = schema if isinstance(schema, tuple) else (schema,)
+    return " 또는 ".join(dict.fromkeys(TYPE_LABELS.get(t, t.__name__) for t in types))
+
+def validate(data: Any, schema: Any, path: str = "") -> List[str]:
+    """
+    스키마 검증
+
+    Args:
+        data: 검증할 값
+        schema: 타입, 타입 튜플, 또는 {키: 하위 스키마} 딕셔너리 (딕셔너리의 키는 모두 필수)
+
+    Returns:
+        문제 목록 ("경로: 설명"), 문제가 없으면 빈 목록
+    """
+    if isinstance(schema, dict):
+        if not isinstance(data, dict):
+            return [f"{path or '응답'}: 객체가 필요합니다"]
+        problems = []
+        for key, sub_schema in schema.items():
+            key_path = f"{path}.{key}" if path else key
+            if key not in data:
+                problems.append(f"{key_path}: 항목이 없습니다")
+            else:
+                problems.extend(validate(data[key], sub_schema, key_path))
+        return problems
+
+    types = schema if isinstance(schema, tuple) else (schema,)
+    # bool은 int의 하위 타입이므로 숫자 항목에서는 제외
+    if (isinstance(data, bool) and bool not in types) or not isinstance(data, types):
+        return [f"{path}: {describe_schema(schema)} 형식이어야 합니다"]
+    return []
+
+
+class StructuredOutput:
+    """
+    스키마를 지정한 JSON 응답 요청기
+    - 프롬프트 끝에 응답 구조를 덧붙이고 JSON 모드로 요청
+    - 검증에 실패하면 전체를 다시 생성하지 않고, 문제가 있는 항목만 다시 요청하여 병합
+      (예: risk_areas.accountability만 잘못되었으면 해당 측면만 다시 요청,
+       JSON을 전혀 찾지 못한 경우에는 원래 응답을 형식만 JSON으로 바꾸도록 요청)
+    - 복구 요청은 최대 max_repairs회 (호출 추적에는 원래 템플릿 이름 뒤에 ':repair'를 붙여 기록)
+    """
+
+    def __init__(self, schema: Dict[str, Any], max_repairs: int = 1):
+        self.schema = schema
+        self.max_repairs = max_repairs
+
+    def _schema_text(self, paths: Optional[List[Tuple[str, ...]]] = None) -> str:
+        """응답 구조 설명 (paths가 있으면 해당 항목만 포함한 구조)"""
+        if paths is None:
+            return json.dumps(describe_schema(self.schema), ensure_ascii=False, indent=2)
+        partial = {}
+        for path in paths:
+            schema = self.schema
+            for key in path:
+                schema = schema[key]
+            _set_path(partial, path, describe_schema(schema))
+        return json.dumps(partial, ensure_ascii=False, indent=2)
+
+    def prompt(self, prompt: str) -> str:
+        """원래 프롬프트에 응답 구조 지시를 덧붙임"""
+        return (
+            f"{prompt}\n\n"
+            "응답은 설명 문장 없이 다음 구조를 따르는 JSON 객체 하나로만 작성하세요 "
+            "(필요하면 항목을 더 추가해도 됩니다):\n"
+            f"{self._schema_text()}"
+        )
+
+    def _repair_unit(self, data: Dict[str, Any], problem: str) -> Tuple[str, ...]:
+        """
+        문제 경로에서 다시 요청할 단위 결정
+        (하위 구조가 있는 항목은 한 단계 아래까지 좁힘: risk_areas.accountability.score → risk_areas.accountability)
+        """
+        keys = problem.split(":")[0].split(".")
+        unit = (keys[0],)
+        if len(keys) > 2 and isinstance(self.schema.get(keys[0]), dict) and isinstance(data.get(keys[0]), dict):
+            unit = (keys[0], keys[1])
+        return unit
+
+    def _check(self, data: Optional[Dict[str, Any]]) -> Tuple[List[str], List[Tuple[str, ...]]]:
+        """(문제 목록, 다시 요청할 항목 경로 목록) 반환"""
+        if data is None:
+            return ["응답에서 JSON 객체를 찾을 수 없습니다"], []
+        problems = validate(data, self.schema)
+        return problems, list(dict.fromkeys(self._repair_unit(data, problem) for problem in problems))
+
+    def _repair_prompt(self, content: str, data: Optional[Dict[str, Any]], problems: List[str],
+                       invalid_paths: List[Tuple[str, ...]]) -> str:
+        """복구 요청 프롬프트 (JSON이 없으면 형식 변환, 있으면 잘못된 항목만 재작성)"""
+        if data is None:
+            return (
+                "다음 응답을 내용은 바꾸지 말고 아래 구조의 JSON 객체로만 변환하세요.\n\n"
+                f"## 응답:\n{content}\n\n"
+                f"## 구조:\n{self._schema_text()}"
+            )
+        current = {}
+        for path in invalid_paths:
+            _set_path(current, path, _get_path(data, path))
+        return (
+            "이전 JSON 응답에서 다음 항목이 없거나 형식이 잘못되었습니다:\n"
+            + "\n".join(f"- {problem}" for problem in problems)
+            + "\n\n## 현재 값:\n"
+            + json.dumps(current, ensure_ascii=False, indent=2)
+            + "\n\n아래 구조에 맞게 이 항목들만 포함한 JSON 객체로 다시 작성하세요:\n"
+            + self._schema_text(invalid_paths)
+        )
+
+    def _merge(self, data: Optional[Dict[str, Any]], invalid_paths: List[Tuple[str, ...]],
+               repaired: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """복구 응답을 기존 결과에 병합 (잘못된 항목만 교체)"""
+        if repaired is None:
+            return data
+        if data is None:
+            return repaired
+        merged = dict(data)
+        for path in invalid_paths:
+            value = _get_path(repaired, path)
+            if value is not None:
+                _set_path(merged, path, value)
+        return merged
+
+    def invoke(self, llm: Any, prompt: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        구조화 응답 요청
+
+        Args:
+            llm: invoke를 제공하는 LLM 클라이언트
+            prompt: 원래 프롬프트
+
+        Returns:
+            (JSON 객체 또는 None, 첫 응답 텍스트)
+        """
+        content = llm.invoke(self.prompt(prompt), response_format=JSON_MODE).content
+        data = extract_json(content)
+        for _ in range(self.max_repairs):
+            problems, invalid_paths = self._check(data)
+            if not problems:
+                break
+            print(f"🔧 구조화 응답 복구 요청: {', '.join('.'.join(path) for path in invalid_paths) or '전체 형식'}")
+            with llm_template(f"{current_template() or '-'}:repair"):
+                response = llm.invoke(
+                    self._repair_prompt(content, data, problems, invalid_paths), response_format=JSON_MODE
+                )
+            data = self._merge(data, invalid_paths, extract_json(response.content))
+        return data, content
+
+    async def ainvoke(self, llm: Any, prompt: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """invoke의 비동기 버전"""
+        content = (await llm.ainvoke(self.prompt(prompt), response_format=JSON_MODE)).content
+        data = extract_json(content)
+        for _ in range(self.max_repairs):
+            problems, invalid_paths = self._check(data)
+            if not problems:
+                break
+            print(f"🔧 구조화 응답 복구 요청: {', '.join('.'.join(path) for path in invalid_paths) or '전체 형식'}")
+            with llm_template(f"{current_template() or '-'}:repair"):
+                response = await llm.ainvoke(
+                    self._repair_prompt(content, data, problems, invalid_paths), response_format=JSON_MODE
+                )
+            data = self._merge(data, invalid_paths, extract_json(response.content))
+        return data, content
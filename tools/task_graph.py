@@ -0,0 +1,151 @@
+#의존성 그래프 기반 병렬 작업 실행 도구
+from typing import Dict, List, Any, Callable, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import contextvars
+import asyncio
+import time
+
+# 작업 정의: 이름 → (실행 함수, 선행 작업 이름 목록)
+# 실행 함수는 지금까지 완료된 작업 결과(이름 → 결과)를 인자로 받음
+TaskSpec = Tuple[Callable[[Dict[str, Any]], Any], List[str]]
+
+def _validate_tasks(tasks: Dict[str, TaskSpec]):
+    """선행 작업 이름이 모두 정의되어 있는지 확인"""
+    for name, (_, dependencies) in tasks.items():
+        unknown = [dep for dep in dependencies if dep not in tasks]
+        if unknown:
+            raise ValueError(f"'{name}' 작업의 선행 작업이 정의되지 않았습니다: {', '.join(unknown)}")
+
+def run_task_graph(tasks: Dict[str, TaskSpec], max_workers: int = 4, timeout: Optional[float] = None,
+                   on_error: Optional[Callable[[str, Exception], Any]] = None) -> Dict[str, Any]:
+    """
+    선행 작업이 끝난 작업부터 스레드 풀에서 동시에 실행
+    (LLM 호출처럼 I/O 대기가 대부분인 작업의 전체 소요 시간을 가장 긴 경로 수준으로 줄임)
+
+    Args:
+        tasks: 이름 → (실행 함수, 선행 작업 이름 목록)
+        max_workers: 동시에 실행할 최대 작업 수
+        timeout: 작업별 최대 실행 시간(초, 작업이 실제로 시작된 시점부터 측정)
+        on_error: 작업이 실패하거나 시간을 초과했을 때 (작업 이름, 예외)로 대체 결과를 만드는 함수
+                  (없으면 예외를 그대로 전달)
+
+    Returns:
+        이름 → 작업 결과
+
+    Raises:
+        ValueError: 존재하지 않는 선행 작업이나 순환 의존성이 있는 경우
+        TimeoutError: on_error 없이 작업이 시간을 초과한 경우
+    """
+    _validate_tasks(tasks)
+
+    results: Dict[str, Any] = {}
+    pending = dict(tasks)
+    running = {}
+    started_at: Dict[str, float] = {}
+
+    def start_and_run(name: str, func, completed: Dict[str, Any]):
+        started_at[name] = time.monotonic()
+        return func(completed)
+
+    def finish(name: str, error: Exception):
+        if on_error is None:
+            raise error
+        results[name] = on_error(name, error)
+
+    # 시간을 초과한 스레드는 중단할 수 없으므로 기다리지 않고 종료 (결과는 버림)
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        while pending or running:
+            # 선행 작업이 모두 끝난 작업 제출
+            ready = [name for name, (_, dependencies) in pending.items()
+                     if all(dep in results for dep in dependencies)]
+            for name in ready:
+                func, _ = pending.pop(name)
+                # 현재 컨텍스트(단계별 프롬프트 컨텍스트 등)를 복사하여 작업 스레드에서도 사용
+                context = contextvars.copy_context()
+                running[executor.submit(context.run, start_and_run, name, func, dict(results))] = name
+
+            if not running:
+                raise ValueError(f"순환 의존성이 있는 작업이 있습니다: {', '.join(pending)}")
+
+            # 가장 먼저 마감되는 작업의 남은 시간만큼만 대기
+            wait_timeout = None
+            if timeout is not None:
+                deadlines = [started_at[name] + timeout for name in running.values() if name in started_at]
+                wait_timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else timeout
+            done, _ = wait(running, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    finish(name, e)
+
+            if timeout is not None:
+                now = time.monotonic()
+                expired = [future for future, name in running.items()
+                           if name in started_at and now - started_at[name] >= timeout]
+                for future in expired:
+                    name = running.pop(future)
+                    future.cancel()
+                    finish(name, TimeoutError(f"'{name}' 작업이 {timeout}초 안에 끝나지 않았습니다"))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+async def arun_task_graph(tasks: Dict[str, TaskSpec], max_workers: int = 4, timeout: Optional[float] = None,
+                          on_error: Optional[Callable[[str, Exception], Any]] = None) -> Dict[str, Any]:
+    """
+    run_task_graph의 비동기 버전 (실행 함수가 코루틴 함수이며, 스레드 없이 하나의 이벤트 루프에서 실행)
+    시간을 초과한 작업은 실제로 취소됨
+
+    Args:
+        tasks: 이름 → (코루틴 함수, 선행 작업 이름 목록)
+        max_workers: 동시에 실행할 최대 작업 수
+        timeout: 작업별 최대 실행 시간(초, 동시 실행 슬롯을 얻은 시점부터 측정)
+        on_error: 작업이 실패하거나 시간을 초과했을 때 (작업 이름, 예외)로 대체 결과를 만드는 함수
+
+    Returns:
+        이름 → 작업 결과
+    """
+    _validate_tasks(tasks)
+
+    results: Dict[str, Any] = {}
+    pending = dict(tasks)
+    running = {}
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    async def run(name: str, func, completed: Dict[str, Any]):
+        async with semaphore:
+            if timeout is None:
+                return await func(completed)
+            try:
+                return await asyncio.wait_for(func(completed), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"'{name}' 작업이 {timeout}초 안에 끝나지 않았습니다")
+
+    try:
+        while pending or running:
+            ready = [name for name, (_, dependencies) in pending.items()
+                     if all(dep in results for dep in dependencies)]
+            for name in ready:
+                func, _ = pending.pop(name)
+                running[asyncio.ensure_future(run(name, func, dict(results)))] = name
+
+            if not running:
+                raise ValueError(f"순환 의존성이 있는 작업이 있습니다: {', '.join(pending)}")
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    results[name] = on_error(name, e)
+    finally:
+        for future in running:
+            future.cancel()
+    return results
@@ -1,9 +1,17 @@
 #웹 검색 기능 Tool
 # tools/web_search.py
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import requests
+import json
+import time
 import os
 
+# 검색 백엔드
+# - "web": SerpAPI 검색 (API 키가 없으면 모의 결과)
+# - "local": 로컬 고정 데이터 검색 (네트워크 없이 항상 같은 결과, 벤치마크/CI용)
+SEARCH_BACKENDS = ("web", "local")
+DEFAULT_FIXTURE_PATH = "data/search_fixtures/services.json"
+
 class WebSearchTool:
     """웹 검색을 통해 AI 서비스 정보를 수집하는 도구"""
     
@@ -53,3 +61,63 @@ class WebSearchTool:
         - 데이터 보안 및 프라이버시 보호 기능 내장
         - 클라우드 기반으로 구축되어 다양한 기기에서 접근 가능
         """
+
+
+class LocalSearchTool:
+    """
+    네트워크 없이 로컬 고정 데이터에서 서비스 정보를 찾는 WebSearchTool 대체 도구
+    - 서비스 이름이 고정 데이터의 항목 이름을 포함하거나 그 반대이면 해당 결과 사용
+    - 일치하는 항목이 없으면 서비스 이름과 도메인으로 만든 일정한 결과 반환
+    - latency(초)만큼 지연하여 실제 검색 대기 시간을 흉내 낼 수 있음
+    """
+    
+    def __init__(self, fixture_path: str = DEFAULT_FIXTURE_PATH, latency: float = 0.0):
+        self.fixture_path = fixture_path
+        self.latency = latency
+        self.fixtures: Dict[str, List[Dict[str, str]]] = {}
+        if os.path.exists(fixture_path):
+            with open(fixture_path, encoding="utf-8") as f:
+                self.fixtures = json.load(f)
+    
+    def _find(self, service_name: str) -> Optional[List[Dict[str, str]]]:
+        """서비스 이름으로 고정 검색 결과 조회 (대소문자 무시, 부분 일치 허용)"""
+        name = service_name.lower()
+        for key, results in self.fixtures.items():
+            if key.lower() in name or name in key.lower():
+                return results
+        return None
+    
+    def search_service_info(self, service_name: str, domain_info: str) -> str:
+        """서비스에 대한 정보 검색 (WebSearchTool과 같은 형식의 텍스트 반환)"""
+        if self.latency:
+            time.sleep(self.latency)
+        results = self._find(service_name) or [
+            {"title": f"{service_name} 개요",
+             "snippet": f"{domain_info} 분야에서 머신러닝으로 의사결정을 지원하는 AI 서비스입니다.",
+             "link": "https://example.org/search"},
+            {"title": f"{service_name} 데이터 활용",
+             "snippet": "사용자 데이터와 이용 기록을 분석하여 개인화된 결과를 제공합니다.",
+             "link": "https://example.org/search/data"}
+        ]
+        return "\n".join(
+            f"제목: {result['title']}\n설명: {result['snippet']}\nURL: {result['link']}\n"
+            for result in results
+        )
+
+
+def create_search_tool(backend: Optional[str] = None, latency: Optional[float] = None) -> Any:
+    """
+    검색 백엔드에 맞는 검색 도구 생성
+    
+    Args:
+        backend: "web" 또는 "local" (지정하지 않으면 SEARCH_BACKEND 환경 변수, 기본값 "web")
+        latency: 로컬 검색의 인위적 지연 시간(초) (지정하지 않으면 SEARCH_LATENCY 환경 변수 또는 0)
+    """
+    backend = backend or os.getenv("SEARCH_BACKEND", "web")
+    if backend not in SEARCH_BACKENDS:
+        raise ValueError(f"지원하지 않는 검색 백엔드입니다: {backend} (지원: {', '.join(SEARCH_BACKENDS)})")
+    if backend == "local":
+        if latency is None:
+            latency = float(os.getenv("SEARCH_LATENCY", "0"))
+        return LocalSearchTool(latency=latency)
+    return WebSearchTool()